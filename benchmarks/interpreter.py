@@ -0,0 +1,45 @@
+"""
+Comparing the vectorized evaluator against evaluating an expression once per point.
+
+Run with `pipenv run python -m benchmarks.interpreter`.
+"""
+
+import functools
+import math
+import timeit
+
+import numpy as np
+
+from xythrion.utils.DSL.interpreter import build_tree, calculate
+from xythrion.utils.DSL.tokenizer import parse
+
+EXPRESSION = "sin(x)^2 + 3x/(x-1) - sqrt(abs(x))"
+PYTHON_EXPRESSION = "math.sin(x)**2 + 3*x/(x-1) - math.sqrt(abs(x))"
+SAMPLE_COUNTS = (1_000, 10_000, 100_000)
+
+
+def per_point(numbers: np.ndarray) -> list:
+    """Evaluating the expression one value at a time, as `eval`-based plotters do."""
+    code = compile(PYTHON_EXPRESSION, "<expression>", "eval")
+
+    return [eval(code, {"math": math}, {"x": x}) for x in numbers.tolist()]
+
+
+def main() -> None:
+    """Times both approaches over domains of increasing size."""
+    tree = build_tree(parse(EXPRESSION))
+
+    print(f"{'samples':>8} {'per point (ms)':>15} {'vectorized (ms)':>16} {'speedup':>8}")
+
+    for count in SAMPLE_COUNTS:
+        # None of these counts land exactly on the pole at x = 1, which would raise in plain Python.
+        numbers = np.linspace(-10, 10, count)
+
+        loop = min(timeit.repeat(functools.partial(per_point, numbers), number=1, repeat=3))
+        vectorized = min(timeit.repeat(functools.partial(calculate, tree, numbers), number=1, repeat=3))
+
+        print(f"{count:>8} {loop * 1000:>15.3f} {vectorized * 1000:>16.3f} {loop / vectorized:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Timing searches through the trigram index against fuzzy scoring every text.
+
+Run with `pipenv run python -m benchmarks.searching`.
+"""
+
+import random
+import string
+import time
+
+from fuzzywuzzy import fuzz
+
+from xythrion.utils.searching import TrigramIndex
+
+SIZES = (1_000, 10_000, 100_000)
+VOCABULARY = 5_000
+WORDS_PER_TEXT = 40
+QUERIES = 50
+
+
+def percentile(times: list, q: float) -> float:
+    """The time at a percentile of sorted times, in milliseconds."""
+    return sorted(times)[int(q * (len(times) - 1))] * 1000
+
+
+def main() -> None:
+    """Times searches over indexes of increasing size, made of random words."""
+    rng = random.Random(0)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(VOCABULARY)]
+    queries = [" ".join(rng.choices(words, k=2)) for _ in range(QUERIES)]
+
+    print(f"{'texts':>8} {'p50 (ms)':>9} {'p90 (ms)':>9} {'scan one (ms)':>14}")
+
+    for size in SIZES:
+        index = TrigramIndex()
+
+        for key in range(size):
+            index.add(key, " ".join(rng.choices(words, k=WORDS_PER_TEXT)))
+
+        times = []
+
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query)
+            times.append(time.perf_counter() - start)
+
+        # Scoring every text is far too slow to repeat, so one query is timed.
+        start = time.perf_counter()
+        [fuzz.partial_ratio(queries[0], text) for text in index.texts.values()]
+        scan = time.perf_counter() - start
+
+        print(f"{size:>8} {percentile(times, 0.5):>9.2f} {percentile(times, 0.9):>9.2f} {scan * 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
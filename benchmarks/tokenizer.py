@@ -0,0 +1,83 @@
+"""
+Comparing the single-pass tokenizer against the previous implementation.
+
+Run with `pipenv run python -m benchmarks.tokenizer`.
+"""
+
+import functools
+import re
+import timeit
+from collections import OrderedDict
+from typing import List, Tuple
+
+from xythrion.utils.DSL.errors import TokenizationError
+from xythrion.utils.DSL.tokenizer import parse
+
+LEGACY_TOKEN_TYPES = OrderedDict(
+    (
+        ("OPEN_PAREN", r"^\(|\["),
+        ("CLOSE_PAREN", r"^\)|\]"),
+        ("ADD", r"^\+"),
+        ("SUBTRACT", r"^-"),
+        ("MULTIPLY", r"^\*"),
+        ("DIVIDE", r"^\/"),
+        ("EXPONENTIAL", r"^\^"),
+        ("NUMBER", r"^-?\d+\.?\d*"),
+        ("VARIABLE", r"^[a-zA-Z_]+"),
+    )
+)
+
+SIZES = (100, 1_000, 5_000, 10_000)
+TERM = "(x^2+3.5*sin(x))/2-"
+
+
+def legacy_parse(expression: str) -> List[Tuple[str, str]]:
+    """The tokenizer as it was before the single-pass scanner, kept for comparison."""
+    ex = re.sub(re.compile(r"\s+"), "", expression)
+
+    tokens = []
+
+    while ex:
+        for name, pattern in LEGACY_TOKEN_TYPES.items():
+            m = re.match(pattern, ex)
+            if m is not None:
+                tokens.append((name, m.group(0)))
+                index = len(m.group(0))
+                ex = ex[index:]
+                break
+
+        else:
+            raise TokenizationError("Input string could be not tokenized correctly.")
+
+    return tokens
+
+
+def build_expression(size: int) -> str:
+    """Repeats a term until the expression is `size` characters long."""
+    expression = (TERM * (size // len(TERM) + 1))[: size - 1]
+
+    return f"{expression.rstrip('-+*/^(')}1"
+
+
+def main() -> None:
+    """Times both tokenizers over expressions of increasing length."""
+    print(f"{'chars':>8} {'tokens':>8} {'legacy (ms)':>12} {'scanner (ms)':>13} {'speedup':>8}")
+
+    for size in SIZES:
+        expression = build_expression(size)
+
+        assert legacy_parse(expression) == parse(expression)
+
+        number = max(1, 20_000 // size)
+        legacy = timeit.repeat(functools.partial(legacy_parse, expression), number=number, repeat=3)
+        scanner = timeit.repeat(functools.partial(parse, expression), number=number, repeat=3)
+        legacy, scanner = min(legacy) / number, min(scanner) / number
+
+        print(
+            f"{len(expression):>8} {len(parse(expression)):>8} {legacy * 1000:>12.3f} "
+            f"{scanner * 1000:>13.3f} {legacy / scanner:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
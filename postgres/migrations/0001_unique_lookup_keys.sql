@@ -0,0 +1,14 @@
+-- Blocking the same user or guild twice, or creating two dates with the same name, used to insert duplicates.
+-- The oldest row of every duplicate is kept, so the unique indexes below can be built.
+DELETE FROM Blocked_Users a USING Blocked_Users b
+WHERE a.user_id = b.user_id AND a.identification > b.identification;
+
+DELETE FROM Blocked_Guilds a USING Blocked_Guilds b
+WHERE a.guild_id = b.guild_id AND a.identification > b.identification;
+
+DELETE FROM Dates a USING Dates b
+WHERE a.id = b.id AND a.name = b.name AND a.identification > b.identification;
+
+CREATE UNIQUE INDEX IF NOT EXISTS blocked_users_user_id ON Blocked_Users(user_id);
+CREATE UNIQUE INDEX IF NOT EXISTS blocked_guilds_guild_id ON Blocked_Guilds(guild_id);
+CREATE UNIQUE INDEX IF NOT EXISTS dates_id_name ON Dates(id, name);
@@ -0,0 +1,34 @@
+-- Notes kept every line in one array, so changing any line rewrote all of them. Every line is now its own row.
+ALTER TABLE Notes RENAME TO Notes_Legacy;
+
+CREATE TABLE Notes(
+    id serial PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    name TEXT NOT NULL,
+    -- The position of the last item, so an append never has to count the items before it.
+    items INT NOT NULL DEFAULT 0,
+    UNIQUE (user_id, name)
+);
+
+CREATE TABLE Note_Items(
+    note_id INT NOT NULL REFERENCES Notes(id) ON DELETE CASCADE,
+    position INT NOT NULL,
+    content TEXT NOT NULL,
+    completed BOOLEAN NOT NULL DEFAULT FALSE,
+    PRIMARY KEY (note_id, position)
+);
+
+-- Old notes had no names, so they're named after the row they came from.
+INSERT INTO Notes(user_id, name, items)
+SELECT user_id, 'note_' || identification, COALESCE(array_length(content, 1), 0)
+FROM Notes_Legacy
+WHERE user_id IS NOT NULL;
+
+INSERT INTO Note_Items(note_id, position, content)
+SELECT n.id, item.position, item.content
+FROM Notes_Legacy l
+JOIN Notes n ON n.user_id = l.user_id AND n.name = 'note_' || l.identification
+CROSS JOIN LATERAL unnest(l.content) WITH ORDINALITY AS item(content, position)
+WHERE item.content IS NOT NULL;
+
+DROP TABLE Notes_Legacy;
@@ -0,0 +1,8 @@
+CREATE TABLE IF NOT EXISTS Snippets(
+    id serial PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    name TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+    UNIQUE (user_id, name)
+);
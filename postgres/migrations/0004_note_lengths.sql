@@ -0,0 +1,4 @@
+-- Names and items are limited in length so a page of them fits in an embed.
+-- Rows from before the limits are left as they are, and shortened when they're shown.
+ALTER TABLE Notes ADD CONSTRAINT notes_name_length CHECK (char_length(name) <= 100) NOT VALID;
+ALTER TABLE Note_Items ADD CONSTRAINT note_items_content_length CHECK (char_length(content) <= 1500) NOT VALID;
@@ -0,0 +1,100 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+import pytest
+
+from xythrion import databasing
+from xythrion.databasing import BLOCKLIST_CHANNEL, Database
+
+
+class FakeListener:
+    """Stands in for the connection listening for changes, which only needs its listeners registered."""
+
+    def __init__(self) -> None:
+        self.listeners: list = []
+
+    async def add_listener(self, channel: str, callback) -> None:
+        self.listeners.append((channel, callback))
+
+    def add_termination_listener(self, callback) -> None:
+        pass
+
+
+def load(
+    monkeypatch: pytest.MonkeyPatch,
+    snapshot: Dict[str, List[int]],
+    during: List[str],
+    blocklist: Optional[Dict[str, set]] = None,
+) -> Database:
+    """Loads a snapshot of the blocklist, while the given `kind:action:id` changes are broadcast."""
+
+    async def connect(**kwargs) -> FakeListener:
+        return FakeListener()
+
+    @asynccontextmanager
+    async def connection(self: Database, conn: object = None) -> AsyncIterator[None]:
+        yield None
+
+    async def fetch(self: Database, name: str, *args, conn: object = None) -> list:
+        # Changes are heard after the snapshot was taken, but before it's been applied.
+        for payload in during:
+            self._on_blocklist_notification(None, 0, BLOCKLIST_CHANNEL, payload)
+
+        during.clear()
+
+        return [(_id,) for _id in snapshot[name.split(".")[1][:-1]]]
+
+    monkeypatch.setattr(databasing.asyncpg, "connect", connect)
+    monkeypatch.setattr(Database, "connection", connection)
+    monkeypatch.setattr(Database, "fetch", fetch)
+
+    async def run() -> Database:
+        database = Database(asyncio.get_running_loop())
+
+        if blocklist is not None:
+            database.blocklist = blocklist
+
+        await database.load_blocklist()
+
+        return database
+
+    return asyncio.run(run())
+
+
+def test_snapshot_is_loaded(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Every blocked user and guild is in memory after loading."""
+    database = load(monkeypatch, {"user": [1, 2], "guild": [3]}, [])
+
+    assert database.is_user_blocked(1) and database.is_user_blocked(2)
+    assert database.is_guild_blocked(3)
+    assert not database.is_guild_blocked(None)
+    assert database.changes_while_loading is None
+
+
+def test_unblocked_while_not_listening(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Loading again replaces what's in memory, so anything unblocked meanwhile is dropped."""
+    database = load(monkeypatch, {"user": [1], "guild": []}, [], blocklist={"user": {1, 2}, "guild": {3}})
+
+    assert database.blocklist == {"user": {1}, "guild": set()}
+
+
+def test_blocked_while_loading(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A block heard while loading stays, even though the snapshot was taken before it."""
+    database = load(monkeypatch, {"user": [1], "guild": []}, ["user:add:5", "guild:add:6"])
+
+    assert database.blocklist == {"user": {1, 5}, "guild": {6}}
+
+
+def test_unblocked_while_loading(monkeypatch: pytest.MonkeyPatch) -> None:
+    """An unblock heard while loading stays, even though the snapshot still had it blocked."""
+    database = load(monkeypatch, {"user": [1, 2], "guild": []}, ["user:remove:2"])
+
+    assert database.blocklist == {"user": {1}, "guild": set()}
+
+
+def test_changes_are_applied_in_order(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Blocking then unblocking while loading ends up unblocked."""
+    database = load(monkeypatch, {"user": [], "guild": []}, ["user:add:7", "user:remove:7"])
+
+    assert not database.is_user_blocked(7)
@@ -0,0 +1,269 @@
+import asyncio
+import gc
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from xythrion import caching
+from xythrion.caching import CACHES, DiskCache, LRUCache, SingleFlight, TTLCache, cache_control_ttl
+from xythrion.rendering import GraphSpec, Subplot, spec_digest
+
+
+def test_least_recently_used_is_evicted() -> None:
+    """When full, the item used longest ago goes first, where getting an item counts as using it."""
+    cache = LRUCache("test_lru", 2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert cache.evictions == 1
+
+
+def test_evicts_by_weight() -> None:
+    """With a weigh function, the cache is bounded by total weight instead of the amount of items."""
+    cache = LRUCache("test_lru_bytes", 10, weigh=len)
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    cache.set("c", b"1234")
+
+    assert "a" not in cache
+    assert cache.weight == 8
+
+    # One big item can push out several small ones.
+    cache.set("d", b"123456789")
+
+    assert len(cache) == 1
+    assert cache.weight == 9
+
+
+def test_replacing_updates_weight() -> None:
+    """Setting a key again counts only the new value's weight."""
+    cache = LRUCache("test_lru_replace", 10, weigh=len)
+    cache.set("a", b"12345678")
+    cache.set("a", b"12")
+
+    assert cache.weight == 2
+    assert cache.get("a") == b"12"
+
+
+def test_too_heavy_is_not_cached() -> None:
+    """Something heavier than the whole cache isn't cached, and doesn't flush everything else."""
+    cache = LRUCache("test_lru_heavy", 4, weigh=len)
+    cache.set("a", b"12")
+    cache.set("b", b"12345")
+
+    assert "b" not in cache
+    assert cache.get("a") == b"12"
+
+
+def test_counters() -> None:
+    """Hits and misses are counted, and clearing keeps the counters."""
+    cache = LRUCache("test_lru_counters", 2)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    cache.clear()
+
+    assert (cache.hits, cache.misses, len(cache), cache.weight) == (1, 1, 0, 0)
+    assert cache.stats()["hit rate"] == "50.0%"
+    assert CACHES["test_lru_counters"] is cache
+
+
+def test_disk_cache_round_trip(tmp_path: Path) -> None:
+    """Bytes written under a key are read back, and a missing key is a miss."""
+    cache = DiskCache("test_disk", tmp_path, ttl=60, suffix=".png")
+    cache.set("key", b"image")
+
+    assert cache.get("key") == b"image"
+    assert cache.get("missing") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert [path.name for path in tmp_path.iterdir()] == ["key.png"]
+
+
+def test_disk_cache_expires(tmp_path: Path) -> None:
+    """Files older than the time to live are deleted when read, or when expired files are evicted."""
+    cache = DiskCache("test_disk_expiry", tmp_path, ttl=60)
+    cache.set("old", b"1")
+    cache.set("older", b"2")
+    cache.set("new", b"3")
+
+    past = time.time() - 120
+
+    for key in ("old", "older"):
+        os.utime(tmp_path / key, (past, past))
+
+    assert cache.get("old") is None
+    assert not (tmp_path / "old").exists()
+
+    assert cache.evict_expired() == 1
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["new"]
+    assert cache.evictions == 2
+
+
+def test_disk_cache_failed_write(tmp_path: Path) -> None:
+    """A write that fails is logged instead of raised, and leaves nothing behind."""
+    cache = DiskCache("test_disk_failure", tmp_path, ttl=60)
+    (tmp_path / "key").mkdir()
+
+    cache.set("key", b"image")
+
+    assert [path.name for path in tmp_path.iterdir()] == ["key"]
+
+
+def test_spec_digest() -> None:
+    """Graphs that look the same share a digest, and any change to the data or options changes it."""
+    spec = GraphSpec((Subplot([1.0, 2.0], x=[0, 1], title="a"),))
+
+    assert spec_digest(spec) == spec_digest(GraphSpec((Subplot((1, 2), x=(0.0, 1.0), title="a"),)))
+
+    for other in (
+        GraphSpec((Subplot([1.0, 2.5], x=[0, 1], title="a"),)),
+        GraphSpec((Subplot([1.0, 2.0], title="a"),)),
+        GraphSpec((Subplot([1.0, 2.0], x=[0, 1], title="b"),)),
+        GraphSpec((Subplot([1.0, 2.0], x=[0, 1], title="a"),), ncols=2),
+    ):
+        assert spec_digest(other) != spec_digest(spec)
+
+
+def test_ttl_cache_expires(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Items are there until their own time to live runs out, and then count as misses."""
+    now = [100.0]
+    monkeypatch.setattr(caching.time, "monotonic", lambda: now[0])
+
+    cache = TTLCache("test_ttl", 10, weigh=len)
+    cache.set("short", b"12", ttl=5)
+    cache.set("long", b"123", ttl=50)
+
+    assert cache.get("short") == b"12"
+
+    now[0] += 10
+
+    assert cache.get("short") is None
+    assert cache.get("long") == b"123"
+    assert "short" not in cache
+    assert (cache.hits, cache.misses, cache.weight) == (2, 1, 3)
+
+
+def test_ttl_cache_zero_ttl() -> None:
+    """Something that may not be cached at all isn't stored."""
+    cache = TTLCache("test_ttl_zero", 10)
+    cache.set("key", 1, ttl=0)
+
+    assert "key" not in cache
+
+
+def test_single_flight_coalesces() -> None:
+    """Concurrent calls with the same key do the work once and all get its result."""
+    flight = SingleFlight()
+    calls = []
+
+    async def work() -> int:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 42
+
+    async def run() -> list:
+        results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)), flight.do("other", work))
+
+        assert len(flight) == 0
+
+        return results
+
+    assert asyncio.run(run()) == [42] * 6
+    assert len(calls) == 2
+
+
+def test_single_flight_shares_errors() -> None:
+    """An error in the work is raised to every caller, and the next call does the work again."""
+    flight = SingleFlight()
+    calls = []
+
+    async def work() -> None:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("failed")
+
+    async def run() -> list:
+        first = await asyncio.gather(flight.do("key", work), flight.do("key", work), return_exceptions=True)
+        second = await asyncio.gather(flight.do("key", work), return_exceptions=True)
+
+        return first + second
+
+    assert all(isinstance(result, ValueError) for result in asyncio.run(run()))
+    assert len(calls) == 2
+
+
+def test_single_flight_cancelled_caller() -> None:
+    """One caller being cancelled doesn't cancel the work for the others."""
+    flight = SingleFlight()
+
+    async def work() -> int:
+        await asyncio.sleep(0.02)
+        return 42
+
+    async def run() -> int:
+        cancelled = asyncio.ensure_future(flight.do("key", work))
+        waiting = asyncio.ensure_future(flight.do("key", work))
+
+        await asyncio.sleep(0)
+        cancelled.cancel()
+
+        return await waiting
+
+    assert asyncio.run(run()) == 42
+
+
+def test_single_flight_every_caller_cancelled() -> None:
+    """When every caller gives up and the work then fails, the error isn't reported as never retrieved."""
+    flight = SingleFlight()
+    unhandled = []
+
+    async def work() -> None:
+        await asyncio.sleep(0.01)
+        raise ValueError("failed")
+
+    async def run() -> None:
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: unhandled.append(context))
+
+        caller = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        caller.cancel()
+
+        await asyncio.sleep(0.05)
+        gc.collect()
+
+        assert len(flight) == 0
+
+    asyncio.run(run())
+
+    assert unhandled == []
+
+
+@pytest.mark.parametrize(
+    ("header", "ttl"),
+    (
+        (None, None),
+        ("", None),
+        ("public", None),
+        ("max-age=60", 60),
+        ("public, max-age=60, s-maxage=300", 300),
+        ('max-age="120"', 120),
+        ("MAX-AGE=30", 30),
+        ("no-store", 0),
+        ("private, max-age=60", 0),
+        ("no-cache", 0),
+    ),
+)
+def test_cache_control_ttl(header: Optional[str], ttl: Optional[float]) -> None:
+    """How long a response may be cached comes from its Cache-Control header."""
+    headers = {} if header is None else {"Cache-Control": header}
+
+    assert cache_control_ttl(headers) == ttl
@@ -0,0 +1,104 @@
+import re
+
+import numpy as np
+import pytest
+
+from xythrion.utils.datasets import MAX_LINE_LENGTH, DatasetError, PointReader
+
+
+def read(*chunks: bytes, width: int = 100) -> tuple:
+    """Feeds chunks to a reader, giving back the points and how many rows were read."""
+    reader = PointReader(width)
+
+    for chunk in chunks:
+        reader.feed(chunk)
+
+    x, y = reader.finish()
+
+    return x.tolist(), y.tolist(), reader.rows
+
+
+@pytest.mark.parametrize(
+    "data",
+    (
+        b"1,2\n3,4\n5,6\n",
+        b"1\t2\n3\t4\n5\t6",
+        b"1;2\n3;4\n5;6\n",
+        b"1 2\n3   4\n 5 6 \n",
+        b"1,2\r\n3,4\r\n5,6\r\n",
+        b"x,y\n1,2\n3,4\n5,6\n",
+        b"1,2\n\n3,4\n  \n5,6\n\n",
+    ),
+)
+def test_delimiters_headers_and_line_endings(data: bytes) -> None:
+    """Tabs, commas, semicolons and spaces are read the same, with headers, CRLF and blank lines skipped."""
+    assert read(data) == ([1, 3, 5], [2, 4, 6], 3)
+
+
+def test_one_column_is_y() -> None:
+    """A single column is read as y values, numbered from zero."""
+    assert read(b"value\n5\n7\n9\n") == ([0, 1, 2], [5, 7, 9], 3)
+
+
+def test_extra_columns_are_ignored() -> None:
+    """Columns past the first two are left out."""
+    assert read(b"1,2,9\n3,4,9\n") == ([1, 3], [2, 4], 2)
+
+
+def test_lines_split_across_chunks() -> None:
+    """A line cut off at the end of a chunk is finished by the next one."""
+    assert read(b"1,2\n3,", b"4\n5", b",6") == ([1, 3, 5], [2, 4, 6], 3)
+
+
+def test_non_finite_points_are_dropped() -> None:
+    """Points that can't be drawn are left out."""
+    assert read(b"1,2\n3,nan\n5,inf\n7,8\n") == ([1, 7], [2, 8], 4)
+
+
+@pytest.mark.parametrize(
+    ("data", "message"),
+    (
+        (b"1,2,3\n4\n5,6\n", "Row 2 has 1 column(s) instead of 3"),
+        (b"1,2\n3,4,5\n", "Row 2 has 3 column(s) instead of 2"),
+        (b"1,2,3\n1,,2\n", "rows 1-2"),
+        (b"1,2\n3,four\n", "rows 1-2"),
+        (b"x,y\n", "no points"),
+        (b"", "no points"),
+    ),
+)
+def test_ragged_and_invalid_rows(data: bytes, message: str) -> None:
+    """Rows that don't line up, or hold something other than numbers, are rejected instead of re-paired."""
+    with pytest.raises(DatasetError, match=re.escape(message)):
+        read(data)
+
+
+def test_row_numbers_continue_across_chunks() -> None:
+    """Errors count rows from the start of the file, not the chunk."""
+    with pytest.raises(DatasetError, match="Row 4 has"):
+        read(b"1,2\n3,4\n", b"5,6\n7\n")
+
+
+def test_line_too_long() -> None:
+    """A file without line breaks is rejected instead of being held in memory."""
+    reader = PointReader(100)
+
+    with pytest.raises(DatasetError, match="longer than"):
+        reader.feed(b"1," * MAX_LINE_LENGTH)
+
+
+def test_large_files_are_downsampled() -> None:
+    """Any amount of rows comes out as the width, spanning the whole file and keeping its peak."""
+    n = 200_000
+    x = np.arange(n, dtype=np.float64)
+    y = np.sin(x / 1000)
+    y[123_456] = 50
+
+    data = "".join(f"{a:g},{b:.6f}\n" for a, b in zip(x, y)).encode()
+    chunks = [data[i : i + 65536] for i in range(0, len(data), 65536)]
+
+    points_x, points_y, rows = read(*chunks, width=640)
+
+    assert rows == n
+    assert len(points_x) == 640
+    assert points_x[0] < n * 0.01 and points_x[-1] > n * 0.99
+    assert max(points_y) == 50
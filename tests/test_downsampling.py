@@ -0,0 +1,53 @@
+import numpy as np
+
+from xythrion.utils.downsampling import lttb, min_max_buckets
+
+
+def test_lttb_keeps_ends_and_order() -> None:
+    """The first and last points are kept, and the rest come out in order."""
+    x = np.arange(1000, dtype=np.float64)
+    y = np.random.default_rng(0).normal(size=1000)
+
+    sampled_x, sampled_y = lttb(x, y, 50)
+
+    assert len(sampled_x) == 50
+    assert (sampled_x[0], sampled_x[-1]) == (0, 999)
+    assert np.all(np.diff(sampled_x) > 0)
+    np.testing.assert_array_equal(sampled_y, y[sampled_x.astype(int)])
+
+
+def test_lttb_keeps_spikes() -> None:
+    """A single spike makes the largest triangle in its bucket, so it survives."""
+    x = np.arange(1000, dtype=np.float64)
+    y = np.zeros(1000)
+    y[500] = 10
+
+    assert 10 in lttb(x, y, 20)[1]
+
+
+def test_lttb_small_inputs_are_unchanged() -> None:
+    """Nothing is dropped when there are already few enough points."""
+    x, y = np.arange(5.0), np.arange(5.0)
+
+    for threshold in (2, 5, 10):
+        assert lttb(x, y, threshold)[0] is x
+
+
+def test_min_max_buckets() -> None:
+    """Each bucket keeps its lowest and highest point, in order."""
+    x = np.arange(12, dtype=np.float64)
+    y = np.array([0, 5, 1, 2, -3, 2, 9, 1, 1, 0, 4, 7], dtype=np.float64)
+
+    kept_x, kept_y = min_max_buckets(x, y, 3)
+
+    assert kept_x.tolist() == [0, 1, 4, 6, 9, 11]
+    assert kept_y.tolist() == [0, 5, -3, 9, 0, 7]
+
+
+def test_min_max_buckets_uneven() -> None:
+    """Points that don't fill the last bucket are still looked at."""
+    x = np.arange(11, dtype=np.float64)
+    y = np.zeros(11)
+    y[10] = 1
+
+    assert 1 in min_max_buckets(x, y, 2)[1]
@@ -0,0 +1,205 @@
+import asyncio
+from email.utils import formatdate
+from typing import List, Tuple
+
+import pytest
+from aiohttp import web
+
+from xythrion import http_client
+from xythrion.constants import HTTP
+from xythrion.http_client import CircuitBreaker, HTTPClient, HTTPError, retry_after
+
+
+class Clock:
+    """Stands in for time.monotonic, only moving when told to."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    """Makes the circuit breakers use a clock the test moves."""
+    clock = Clock()
+    monkeypatch.setattr(http_client.time, "monotonic", clock)
+
+    return clock
+
+
+def test_breaker_opens_after_threshold(clock: Clock) -> None:
+    """Failures in a row open the circuit, and a success before then resets the count."""
+    breaker = CircuitBreaker(threshold=3, reset_timeout=30)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+
+    assert breaker.state == "closed" and breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == "open" and not breaker.allow()
+    assert breaker.retry_after() == pytest.approx(30)
+
+
+def test_breaker_half_open_then_closed(clock: Clock) -> None:
+    """After the reset timeout one request tests the host, and its success closes the circuit."""
+    breaker = CircuitBreaker(threshold=1, reset_timeout=30)
+    breaker.record_failure()
+
+    clock.now += 30
+
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+
+    # Only the one request tests the host.
+    assert not breaker.allow()
+
+    breaker.record_success()
+
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_breaker_half_open_then_open(clock: Clock) -> None:
+    """A failed test keeps the circuit open for another timeout."""
+    breaker = CircuitBreaker(threshold=1, reset_timeout=30)
+    breaker.record_failure()
+
+    clock.now += 30
+    breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+
+    clock.now += 29
+
+    assert not breaker.allow()
+
+
+@pytest.mark.parametrize(
+    ("headers", "seconds"),
+    (
+        ({}, None),
+        ({"Retry-After": "12"}, 12),
+        ({"Retry-After": "-5"}, 0),
+        ({"Retry-After": "soon"}, None),
+    ),
+)
+def test_retry_after(headers: dict, seconds: float) -> None:
+    """Retry-After is read as seconds when it's a number."""
+    assert retry_after(headers) == seconds
+
+
+def test_retry_after_date() -> None:
+    """Retry-After is read as seconds from now when it's a date."""
+    assert retry_after({"Retry-After": formatdate(usegmt=True)}) == pytest.approx(0, abs=1)
+
+
+def test_backoff_is_bounded() -> None:
+    """Backoff grows with each attempt but never past the maximum."""
+    for attempt in range(20):
+        assert 0 <= HTTPClient._backoff(attempt) <= min(HTTP.MAX_BACKOFF, HTTP.BACKOFF_BASE * 2 ** attempt)
+
+
+def serve(responses: List[Tuple[int, dict]], method: str, retries: int = 3) -> Tuple[object, int]:
+    """
+    Sends one request to a local server answering with the given statuses and headers in turn.
+
+    Gives back what the request gave back or raised, and how many requests the server saw.
+    """
+    seen = []
+
+    async def handler(request: web.Request) -> web.Response:
+        status, headers = responses[min(len(seen), len(responses) - 1)]
+        seen.append(request.method)
+
+        return web.Response(status=status, headers=headers, text="body")
+
+    async def run() -> object:
+        app = web.Application()
+        app.router.add_route("*", "/", handler)
+
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+
+        port = site._server.sockets[0].getsockname()[1]
+        client = HTTPClient()
+
+        try:
+            return await client.request(method, f"http://127.0.0.1:{port}/", retries=retries)
+
+        except HTTPError as e:
+            return e
+
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    return asyncio.run(run()), len(seen)
+
+
+@pytest.fixture()
+def no_backoff(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Retries straight away."""
+    monkeypatch.setattr(HTTPClient, "_backoff", staticmethod(lambda attempt: 0))
+
+
+@pytest.mark.usefixtures("no_backoff")
+def test_retries_idempotent_requests() -> None:
+    """A GET failing with a 503 is retried until it works."""
+    result, requests = serve([(503, {}), (503, {}), (200, {})], "GET")
+
+    assert result.status == 200 and result.text() == "body"
+    assert requests == 3
+
+
+@pytest.mark.usefixtures("no_backoff")
+def test_gives_up_after_retries() -> None:
+    """After every retry fails, the last status is raised."""
+    result, requests = serve([(502, {})], "GET", retries=2)
+
+    assert isinstance(result, HTTPError) and result.status == 502
+    assert requests == 3
+
+
+@pytest.mark.usefixtures("no_backoff")
+def test_post_is_not_retried_on_server_errors() -> None:
+    """A POST may have been partly handled, so a 503 isn't retried."""
+    result, requests = serve([(503, {}), (200, {})], "POST")
+
+    assert isinstance(result, HTTPError) and result.status == 503
+    assert requests == 1
+
+
+@pytest.mark.usefixtures("no_backoff")
+def test_post_is_retried_on_too_many_requests() -> None:
+    """A 429 means nothing was handled, so even a POST is retried."""
+    result, requests = serve([(429, {"Retry-After": "0"}), (200, {})], "POST")
+
+    assert result.status == 200
+    assert requests == 2
+
+
+@pytest.mark.usefixtures("no_backoff")
+def test_client_errors_are_not_retried() -> None:
+    """A 404 won't change by asking again."""
+    result, requests = serve([(404, {}), (200, {})], "GET")
+
+    assert isinstance(result, HTTPError) and result.status == 404
+    assert requests == 1
+
+
+@pytest.mark.usefixtures("no_backoff")
+def test_long_retry_after_is_not_waited_for() -> None:
+    """A Retry-After longer than the maximum is raised instead of waited on."""
+    result, requests = serve([(503, {"Retry-After": str(HTTP.MAX_RETRY_AFTER + 1)}), (200, {})], "GET")
+
+    assert isinstance(result, HTTPError) and result.status == 503
+    assert requests == 1
@@ -0,0 +1,139 @@
+import re
+
+import numpy as np
+import pytest
+
+from xythrion.utils.DSL.errors import ParsingError
+from xythrion.utils.DSL.interpreter import (
+    EXPRESSION_CACHE,
+    MAX_NESTING,
+    Chain,
+    build_tree,
+    calculate,
+    compile_expression,
+    sample_domain,
+)
+from xythrion.utils.DSL.tokenizer import parse
+
+X = np.array([-2.0, -0.5, 0.0, 1.0, 3.0])
+
+
+@pytest.mark.parametrize(
+    ("expression", "expected"),
+    (
+        ("1+2*3", 7),
+        ("(1+2)*3", 9),
+        ("2^3^2", 512),
+        ("-2^2", -4),
+        ("(-2)^2", 4),
+        ("8/2/2", 2),
+        ("10-4-3", 3),
+        ("2*3^2", 18),
+        ("--3", 3),
+        ("+3", 3),
+        (".5*4", 2),
+        ("2(3+1)", 8),
+        ("(1+1)(2+1)", 6),
+    ),
+)
+def test_precedence(expression: str, expected: float) -> None:
+    """Operators bind and associate the way they do in math."""
+    assert calculate(expression, np.zeros(1))[0] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize(
+    ("expression", "function"),
+    (
+        ("x^2", lambda x: x ** 2),
+        ("2x+1", lambda x: 2 * x + 1),
+        ("x(x-1)", lambda x: x * (x - 1)),
+        ("sin(x)^2+cos(x)^2", lambda x: np.ones_like(x)),
+        ("abs(x)*pi", lambda x: np.abs(x) * np.pi),
+        ("log2(abs(x)+1)", lambda x: np.log2(np.abs(x) + 1)),
+    ),
+)
+def test_over_domain(expression: str, function) -> None:
+    """Expressions are evaluated over every number of the domain at once."""
+    np.testing.assert_allclose(calculate(expression, X), function(X))
+
+
+def test_constant_is_broadcast() -> None:
+    """An expression without the variable still gives back one value per number."""
+    np.testing.assert_array_equal(calculate("pi", X), np.full(X.shape, np.pi))
+
+
+def test_poles_become_infinite() -> None:
+    """Dividing by zero gives inf instead of raising."""
+    assert np.isinf(calculate("1/x", np.array([0.0])))[0]
+
+
+def test_long_sums_stay_flat() -> None:
+    """Runs of the same precedence are one flat node, however long they are."""
+    tree = build_tree(parse("+".join(["x"] * 5000)))
+
+    assert isinstance(tree, Chain)
+    assert len(tree.rest) == 4999
+    np.testing.assert_array_equal(calculate(tree, X), X * 5000)
+
+
+@pytest.mark.parametrize(
+    "expression",
+    (
+        "(" * (MAX_NESTING + 1) + "x" + ")" * (MAX_NESTING + 1),
+        "x^" * (MAX_NESTING + 1) + "x",
+        "-" * (MAX_NESTING + 1) + "x",
+        "sin(" * (MAX_NESTING + 1) + "x" + ")" * (MAX_NESTING + 1),
+        "(" * 1000 + "x" + ")" * 1000,
+    ),
+)
+def test_nesting_limit(expression: str) -> None:
+    """Nesting past the limit is a parsing error instead of running out of stack."""
+    with pytest.raises(ParsingError, match="nested too deeply"):
+        build_tree(parse(expression))
+
+
+def test_nesting_up_to_the_limit() -> None:
+    """Nesting right up to the limit is fine."""
+    depth = MAX_NESTING - 1
+
+    assert calculate("(" * depth + "x" + ")" * depth, X) == pytest.approx(X)
+
+
+@pytest.mark.parametrize(
+    ("expression", "message"),
+    (
+        ("", "empty"),
+        ("x+", "ended unexpectedly"),
+        ("(x+1", "ended unexpectedly"),
+        ("x+1)", 'Unexpected ")"'),
+        ("3 4", 'Unexpected "4"'),
+        ("sin x", "must be followed by parentheses"),
+        ("y", "Unknown name 'y'"),
+        ("sinx", "Unknown name 'sinx'"),
+        ("x*foo", "Unknown name 'foo'"),
+    ),
+)
+def test_invalid_expressions(expression: str, message: str) -> None:
+    """Expressions that don't make sense raise ParsingError saying why."""
+    with pytest.raises(ParsingError, match=re.escape(message)):
+        build_tree(parse(expression))
+
+
+def test_same_tokens_share_a_tree() -> None:
+    """Expressions that only differ by whitespace are compiled once."""
+    tree = compile_expression("x ^ 2 + 17")
+    hits = EXPRESSION_CACHE.hits
+
+    assert compile_expression("x^2+17") is tree
+    assert EXPRESSION_CACHE.hits == hits + 1
+
+
+def test_domains_are_shared_and_read_only() -> None:
+    """The same domain gives back the same array, which can't be changed by whoever uses it."""
+    numbers = sample_domain(-3, 3, 7)
+
+    assert sample_domain(-3.0, 3.0, 7) is numbers
+    assert numbers.tolist() == [-3, -2, -1, 0, 1, 2, 3]
+
+    with pytest.raises(ValueError):
+        numbers[0] = 1
@@ -0,0 +1,99 @@
+import zlib
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from xythrion.utils.inventories import Inventory, InventoryError
+
+HEADER = (
+    b"# Sphinx inventory version 2\n"
+    b"# Project: Example\n"
+    b"# Version: 1.0\n"
+    b"# The remainder of this file is compressed using zlib.\n"
+)
+
+ENTRIES = (
+    b"asyncio.gather py:function 1 library/asyncio-task.html#$ -\n"
+    b"asyncio.sleep py:function 1 library/asyncio-task.html#$ -\n"
+    b"json py:module 0 library/json.html#module-$ -\n"
+    b"json.dumps py:function 1 library/json.html#$ -\n"
+    b"json.JSONDecoder py:class 1 library/json.html#$ -\n"
+    b"os.path.join py:function 1 library/os.path.html#$ -\n"
+    b"Json std:label -1 glossary.html#term-json JSON in the glossary\n"
+    b"not an entry\n"
+)
+
+
+def write(path: Path, data: bytes) -> Path:
+    """Writes an inventory file."""
+    path.write_bytes(data)
+
+    return path
+
+
+@pytest.fixture()
+def inventory(tmp_path: Path) -> Iterator[Inventory]:
+    """An inventory of a few entries, some differing only by case."""
+    inventory = Inventory.load(
+        "example", write(tmp_path / "example.inv", HEADER + zlib.compress(ENTRIES)), "u/"
+    )
+
+    yield inventory
+
+    inventory.close()
+
+
+def test_entries_are_read(inventory: Inventory) -> None:
+    """Every entry is read, with `$` in the URI meaning the name and `-` meaning no display name."""
+    assert len(inventory) == 7
+
+    (entry,) = inventory.exact("json.dumps")
+
+    assert entry.name == "json.dumps"
+    assert entry.role == "py:function"
+    assert entry.url == "u/library/json.html#json.dumps"
+    assert entry.display == "json.dumps"
+
+
+def test_exact_ignores_case(inventory: Inventory) -> None:
+    """Exact lookups find every entry with the name, whatever its case."""
+    entries = inventory.exact("JSON")
+
+    assert sorted(entry.role for entry in entries) == ["py:module", "std:label"]
+    assert {entry.display for entry in entries} == {"json", "JSON in the glossary"}
+    assert inventory.exact("json.loads") == []
+
+
+def test_prefix(inventory: Inventory) -> None:
+    """Prefix lookups give back names starting with the prefix in order, up to the limit."""
+    assert [entry.name for entry in inventory.prefix("asyncio.")] == ["asyncio.gather", "asyncio.sleep"]
+    assert [entry.name for entry in inventory.prefix("json.", limit=1)] == ["json.dumps"]
+    assert inventory.prefix("zzz") == []
+
+
+def test_fuzzy(inventory: Inventory) -> None:
+    """Fuzzy lookups find names despite typos, best first."""
+    matches = inventory.fuzzy("asyncio.gathr")
+
+    assert matches[0][0].name == "asyncio.gather"
+    assert matches[0][1] > 80
+    assert inventory.fuzzy("qqqqqq") == []
+
+
+def test_postings_are_arrays(inventory: Inventory) -> None:
+    """The postings hold entry numbers, rather than the names themselves."""
+    assert all(posting.typecode == "I" for posting in inventory.postings.values())
+    assert set().union(*inventory.postings.values()) == set(range(len(inventory)))
+
+
+def test_not_an_inventory(tmp_path: Path) -> None:
+    """Files that aren't version 2 inventories are rejected."""
+    with pytest.raises(InventoryError, match="not a version 2"):
+        Inventory.load("bad", write(tmp_path / "bad.inv", b"# Sphinx inventory version 1\n\n\n\n"), "")
+
+
+def test_empty_inventory(tmp_path: Path) -> None:
+    """An inventory without entries is rejected."""
+    with pytest.raises(InventoryError, match="no entries"):
+        Inventory.load("empty", write(tmp_path / "empty.inv", HEADER + zlib.compress(b"")), "")
@@ -0,0 +1,92 @@
+import pytest
+
+from xythrion.utils.rate_limiting import RateLimit, RateLimiter
+
+
+class Clock:
+    """A clock that only moves when told to."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock() -> Clock:
+    """A clock starting at zero."""
+    return Clock()
+
+
+def test_burst_then_refused(clock: Clock) -> None:
+    """A full bucket allows a burst of its capacity, then says how long until the next token."""
+    limiter = RateLimiter(clock)
+    keys = [("user", RateLimit(3, 6))]
+
+    assert [limiter.hit(keys) for _ in range(3)] == [None, None, None]
+    assert limiter.hit(keys) == pytest.approx(2)
+
+
+def test_tokens_refill(clock: Clock) -> None:
+    """Tokens come back at capacity per period, up to the capacity."""
+    limiter = RateLimiter(clock)
+    keys = [("user", RateLimit(2, 10))]
+
+    limiter.hit(keys)
+    limiter.hit(keys)
+
+    clock.now = 5
+    assert limiter.hit(keys) is None
+    assert limiter.hit(keys) == pytest.approx(5)
+
+    # A long wait refills the bucket, but never past its capacity.
+    clock.now = 1000
+    assert [limiter.hit(keys) for _ in range(3)][2] == pytest.approx(5)
+
+
+def test_every_level_has_to_allow(clock: Clock) -> None:
+    """A use is refused if any level is empty, and takes nothing from the levels that had tokens."""
+    limiter = RateLimiter(clock)
+    guild = ("guild", RateLimit(2, 10))
+
+    assert limiter.hit([("user:1", RateLimit(5, 10)), guild]) is None
+    assert limiter.hit([("user:2", RateLimit(5, 10)), guild]) is None
+
+    # The guild is out of tokens for both users.
+    assert limiter.hit([("user:3", RateLimit(5, 10)), guild]) == pytest.approx(5)
+
+    # The refused use didn't take a token from the user's own bucket.
+    assert limiter.buckets["user:3"][1].tokens == pytest.approx(5)
+
+
+def test_retry_after_is_longest_wait(clock: Clock) -> None:
+    """When several levels are empty, the wait is until all of them have a token."""
+    limiter = RateLimiter(clock)
+    keys = [("a", RateLimit(1, 2)), ("b", RateLimit(1, 8))]
+
+    limiter.hit(keys)
+
+    assert limiter.hit(keys) == pytest.approx(8)
+
+
+def test_changed_limit_starts_full(clock: Clock) -> None:
+    """Changing the limit of a key gives it a new, full bucket."""
+    limiter = RateLimiter(clock)
+
+    limiter.hit([("user", RateLimit(1, 10))])
+
+    assert limiter.hit([("user", RateLimit(2, 10))]) is None
+
+
+def test_sweep_drops_full_buckets(clock: Clock) -> None:
+    """Buckets that have refilled completely are dropped, the rest are kept."""
+    limiter = RateLimiter(clock)
+
+    limiter.hit([("idle", RateLimit(1, 1))])
+    limiter.hit([("busy", RateLimit(1, 100))])
+
+    clock.now = 10
+
+    assert limiter.sweep() == 1
+    assert list(limiter.buckets) == ["busy"]
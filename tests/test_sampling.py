@@ -0,0 +1,73 @@
+import numpy as np
+
+from xythrion.utils.DSL.interpreter import compile_expression
+from xythrion.utils.DSL.sampling import INITIAL_POINTS, MAX_POINTS, adaptive_sample, visible_range
+
+
+def sample(expression: str, start: float = -10, stop: float = 10, max_points: int = MAX_POINTS) -> tuple:
+    """Samples an expression over a domain."""
+    return adaptive_sample(compile_expression(expression), start, stop, max_points)
+
+
+def test_lines_are_not_refined() -> None:
+    """A straight line needs nothing more than the first pass."""
+    x, y, limits = sample("2x+1", -1, 1)
+
+    assert len(x) == INITIAL_POINTS
+    np.testing.assert_allclose(y, 2 * x + 1)
+    assert limits[0] < -1 and limits[1] > 3
+
+
+def test_curves_are_refined() -> None:
+    """Points are added where the function curves, in order, without going over the budget."""
+    x, y, _ = sample("sin(10x)")
+
+    assert INITIAL_POINTS < len(x) <= MAX_POINTS
+    assert np.all(np.diff(x) > 0)
+    np.testing.assert_allclose(y, np.sin(10 * x))
+
+
+def test_budget() -> None:
+    """However much a function curves, no more points than allowed are sampled."""
+    x, _, _ = sample("sin(100x)", max_points=400)
+
+    assert len(x) <= 400
+
+
+def test_pole_is_broken() -> None:
+    """The jump across a pole has NaN put into it, so the line isn't drawn from one side to the other."""
+    x, y, limits = sample("1/x", -1, 1)
+
+    gaps = np.flatnonzero(np.isnan(y))
+
+    assert len(gaps) == 1
+    assert np.isnan(x[gaps[0]])
+    assert y[gaps[0] - 1] < limits[0] and y[gaps[0] + 1] > limits[1]
+
+    # The visible range isn't squashed by the values shooting off near the pole.
+    assert limits[1] < 100
+
+
+def test_edge_of_domain_is_found() -> None:
+    """Points are added towards where the function stops being defined."""
+    x, y, _ = sample("sqrt(x)", -1, 1)
+
+    defined = x[np.isfinite(y)]
+
+    assert defined.min() < 1e-3
+    assert len(x) > INITIAL_POINTS
+
+
+def test_undefined_everywhere() -> None:
+    """A function undefined over the whole domain has no visible range."""
+    _, y, limits = sample("sqrt(0-1-x^2)", -1, 1)
+
+    assert limits is None
+    assert np.isnan(y).all()
+
+
+def test_visible_range_of_constant() -> None:
+    """A flat line still gets a range with some room around it."""
+    low, high = visible_range(np.full(10, 5.0))
+
+    assert low < 5 < high
@@ -0,0 +1,95 @@
+import random
+import string
+
+from xythrion.utils.searching import MAX_CANDIDATES, TrigramIndex, pick_candidates, trigrams
+
+
+def test_trigrams_are_padded_and_lowercased() -> None:
+    """Short words still have trigrams, and case and repeated whitespace don't matter."""
+    assert trigrams("ab") == {"  a", " ab", "ab "}
+    assert trigrams("Foo  Bar") == trigrams("foo bar")
+
+
+def build(texts: dict) -> TrigramIndex:
+    """Indexes texts by their keys."""
+    index = TrigramIndex()
+
+    for key, text in texts.items():
+        index.add(key, text)
+
+    return index
+
+
+def test_search_with_typos() -> None:
+    """Texts are found even when the query is misspelled, best match first."""
+    index = build(
+        {
+            1: "binary search over a sorted list",
+            2: "quicksort in place",
+            3: "dijkstra shortest paths",
+            4: "breadth first search",
+        }
+    )
+
+    matches = index.search("binray serch", cutoff=0)
+
+    assert matches[0][0] == 1
+    assert all(0 <= score <= 100 for _, score in matches)
+
+
+def test_search_is_case_insensitive() -> None:
+    """Neither the texts nor the query's case matters."""
+    index = build({1: "Merge Sort", 2: "heap"})
+
+    assert index.search("MERGE")[0] == (1, 100)
+
+
+def test_cutoff() -> None:
+    """Matches scoring below the cutoff are left out."""
+    index = build({1: "completely unrelated"})
+
+    assert index.search("zebra", cutoff=90) == []
+
+
+def test_remove_and_replace() -> None:
+    """Removed texts aren't found anymore, and adding under a key again replaces its text."""
+    index = build({1: "red apple", 2: "green pear"})
+
+    index.remove(1)
+    index.add(2, "yellow banana")
+
+    assert len(index) == 1
+    assert index.search("apple", cutoff=80) == []
+    assert index.search("pear", cutoff=80) == []
+    assert index.search("banana")[0][0] == 2
+
+    # Nothing is left behind of the texts that were removed.
+    assert all(keys == {2} for keys in index.postings.values())
+
+
+def test_recall_over_many_texts() -> None:
+    """Texts are found by a few words of them among thousands of others, however many share trigrams."""
+    rng = random.Random(0)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))) for _ in range(2000)]
+    texts = {key: " ".join(rng.choices(words, k=20)) for key in range(5000)}
+
+    index = build(texts)
+
+    found = 0
+
+    for key in rng.sample(list(texts), 100):
+        query = " ".join(texts[key].split()[5:7])
+
+        if key in [match for match, _ in index.search(query, limit=10)]:
+            found += 1
+
+    assert found >= 95
+
+
+def test_pick_candidates() -> None:
+    """Keys found under the most of the rarest trigrams come first, and common trigrams are skipped."""
+    common = set(range(100))
+
+    assert pick_candidates([common, {1, 2}, {2, 3}], 100)[0] == 2
+    assert len(pick_candidates([common], 100)) == MAX_CANDIDATES
+    assert pick_candidates([], 100) == []
@@ -0,0 +1,63 @@
+import pytest
+
+from xythrion.utils.DSL.errors import TokenizationError
+from xythrion.utils.DSL.tokenizer import parse
+
+
+def test_tokens_in_order() -> None:
+    """Every kind of token is recognized, in the order it appears."""
+    assert parse("(x+1)*[2-x]/3^x") == [
+        ("OPEN_PAREN", "("),
+        ("VARIABLE", "x"),
+        ("ADD", "+"),
+        ("NUMBER", "1"),
+        ("CLOSE_PAREN", ")"),
+        ("MULTIPLY", "*"),
+        ("OPEN_PAREN", "["),
+        ("NUMBER", "2"),
+        ("SUBTRACT", "-"),
+        ("VARIABLE", "x"),
+        ("CLOSE_PAREN", "]"),
+        ("DIVIDE", "/"),
+        ("NUMBER", "3"),
+        ("EXPONENTIAL", "^"),
+        ("VARIABLE", "x"),
+    ]
+
+
+def test_whitespace_is_skipped() -> None:
+    """Whitespace between tokens doesn't change the tokens."""
+    assert parse("  x ^\t2 \n+ 1 ") == parse("x^2+1")
+
+
+def test_empty_expression() -> None:
+    """An empty expression has no tokens."""
+    assert parse("") == []
+
+
+@pytest.mark.parametrize("name", ("log2", "log10"))
+def test_function_names_ending_in_digits(name: str) -> None:
+    """Names of functions ending in digits are one token."""
+    assert parse(f"{name}(x)")[0] == ("VARIABLE", name)
+
+
+def test_variable_followed_by_digits() -> None:
+    """Other names followed by digits are split from them."""
+    assert parse("x2") == [("VARIABLE", "x"), ("NUMBER", "2")]
+
+
+@pytest.mark.parametrize(
+    ("expression", "column"),
+    (
+        ("!", 1),
+        ("x + $", 5),
+        ("sin(x) # 2", 8),
+    ),
+)
+def test_error_column(expression: str, column: int) -> None:
+    """Failing to tokenize reports the one-based column of the character that failed."""
+    with pytest.raises(TokenizationError) as error:
+        parse(expression)
+
+    assert error.value.column == column
+    assert f"column {column}" in str(error.value)
@@ -1,12 +1,17 @@
 import asyncio
 import logging
+import multiprocessing
 import os
 import sys
+import time
 from logging import handlers
 from pathlib import Path
 
 import coloredlogs
 
+# Starting up is timed from when the package is imported, which is before anything heavy is.
+STARTED = time.perf_counter()
+
 logging.TRACE = 15
 logging.addLevelName(logging.TRACE, "TRACE")
 
@@ -24,27 +29,30 @@ LOG_FORMAT = "%(asctime)s | %(name)s | %(levelname)s | %(message)s"
 
 log_formatter = logging.Formatter(LOG_FORMAT)
 
-log_file = Path.cwd() / "logs" / "bot.log"
-log_file.parent.mkdir(exist_ok=True)
+root_logger = logging.getLogger()
+root_logger.setLevel(LOG_LEVEL)
+
+# Rendering workers import the package too, and only the bot itself should write to and rotate the log file.
+if multiprocessing.parent_process() is None:
+    log_file = Path.cwd() / "logs" / "bot.log"
+    log_file.parent.mkdir(exist_ok=True)
 
-file_handler = handlers.RotatingFileHandler(log_file, maxBytes=8388608, backupCount=7, encoding="utf-8")
+    file_handler = handlers.RotatingFileHandler(log_file, maxBytes=8388608, backupCount=7, encoding="utf-8")
 
-file_handler.setFormatter(log_formatter)
+    file_handler.setFormatter(log_formatter)
 
-root_logger = logging.getLogger()
-root_logger.setLevel(LOG_LEVEL)
-root_logger.addHandler(file_handler)
+    root_logger.addHandler(file_handler)
 
-coloredlogs.DEFAULT_LEVEL_STYLES = {
-    **coloredlogs.DEFAULT_LEVEL_STYLES,
-    "trace": {"color": 246},
-    "critical": {"background": "red"},
-    "debug": coloredlogs.DEFAULT_LEVEL_STYLES["info"],
-}
+    coloredlogs.DEFAULT_LEVEL_STYLES = {
+        **coloredlogs.DEFAULT_LEVEL_STYLES,
+        "trace": {"color": 246},
+        "critical": {"background": "red"},
+        "debug": coloredlogs.DEFAULT_LEVEL_STYLES["info"],
+    }
 
-coloredlogs.DEFAULT_LOG_FORMAT = LOG_FORMAT
+    coloredlogs.DEFAULT_LOG_FORMAT = LOG_FORMAT
 
-coloredlogs.install(logger=root_logger, stream=sys.stdout, level=logging.TRACE)
+    coloredlogs.install(logger=root_logger, stream=sys.stdout, level=logging.TRACE)
 
 log = logging.getLogger(__name__)
 log.setLevel(LOG_LEVEL)
@@ -1,13 +1,17 @@
 import logging
+import time
 
 from discord import AllowedMentions
 
+from xythrion import STARTED
 from xythrion.bot import Xythrion
 from xythrion.constants import Config
 from xythrion.extensions import EXTENSIONS
 
 log = logging.getLogger(__name__)
 
+imported = time.perf_counter()
+
 bot = Xythrion(
     command_prefix="\\",
     case_insensitive=True,
@@ -15,8 +19,12 @@ bot = Xythrion(
     allowed_mentions=AllowedMentions(everyone=False),
 )
 
+bot.startup.record("imports", STARTED, imported)
+
 for extension in EXTENSIONS:
-    bot.load_extension(extension)
+    with bot.startup.measure(f"extension {extension}"):
+        bot.load_extension(extension)
+
     log.trace(f'Loaded extension "{extension}"')
 
 bot.run(Config.TOKEN, bot=True, reconnect=True)
@@ -1,14 +1,32 @@
 import asyncio
+import importlib
 import logging
+import time
 from datetime import datetime
+from typing import Awaitable, Dict, Optional
 
-import aiohttp
+import asyncpg
 from discord.ext.commands import Bot
 
+from xythrion import STARTED
 from xythrion.databasing import Database
+from xythrion.http_client import HTTPClient
+from xythrion.metrics import MetricsServer
+from xythrion.rendering import RenderService
+from xythrion.timing import StartupTimer
+from xythrion.watchdog import LoopWatchdog
 
 log = logging.getLogger(__name__)
 
+# Commands import scientific modules on first use, and these are warmed up once the bot is ready.
+WARM_IMPORTS = (
+    "numpy",
+    "xythrion.utils.unit_conversion",
+    "xythrion.utils.datasets",
+    "xythrion.utils.DSL.interpreter",
+    "xythrion.utils.DSL.sampling",
+)
+
 
 class Xythrion(Bot):
     """A subclass where important tasks and connections are created."""
@@ -17,27 +35,90 @@ class Xythrion(Bot):
         """Creating import attributes."""
         super().__init__(*args, **kwargs)
 
+        # Timing every phase of starting up, which is reported once the bot is ready.
+        self.startup = StartupTimer(STARTED)
+        setup_start = time.perf_counter()
+
         # Setting the loop.
         self.loop = asyncio.get_event_loop()
 
-        # Creating session for web requests.
-        self.http_session = aiohttp.ClientSession()
+        # Creating the client every web request goes through.
+        self.http_client = HTTPClient()
 
         # Setting when the bot started up.
         self.startup_time = datetime.now()
 
-        # Setting up the database.
+        # What the source of every extension was when it was last loaded, so unchanged ones aren't reloaded.
+        self.extension_digests: Dict[str, str] = {}
+
+        # Setting up the database, which connects while logging in.
         self.database = Database(self.loop)
-        self.pool = self.database.pool
+
+        # Setting up the worker processes that render graphs.
+        self.renderer = RenderService(self.loop)
+
+        # Watching for anything blocking the loop, once it's running.
+        self.watchdog = LoopWatchdog(self.loop)
+
+        # Serving metrics about everything above, which docker-compose exposes.
+        self.metrics = MetricsServer(self.loop)
+        self.metrics.add_collector(self.watchdog.metrics)
+        self.metrics.add_collector(self.http_client.latency.expose)
+        self.metrics.add_collector(self.database.metrics)
+        self.metrics.add_collector(self.renderer.metrics)
+
+        self.startup.record("setup", setup_start, time.perf_counter())
+
+    @property
+    def pool(self) -> Optional[asyncpg.pool.Pool]:
+        """The pool of the database, which isn't there until it's connected."""
+        return self.database.pool
+
+    async def _timed(self, phase: str, aw: Awaitable) -> None:
+        """Awaits something as a phase of starting up."""
+        with self.startup.measure(phase):
+            await aw
+
+    async def login(self, *args, **kwargs) -> None:
+        """Connects to the database and serves metrics while logging in, since none of them wait on others."""
+        self.watchdog.start()
+
+        await asyncio.gather(
+            self._timed("login", super().login(*args, **kwargs)),
+            self._timed("database", self.database.connect()),
+            self._timed("metrics", self.metrics.start()),
+        )
 
     @staticmethod
-    async def on_ready() -> None:
+    def _warm_imports() -> None:
+        """Imports the modules commands import when they're first used, so nobody waits on them."""
+        start = time.perf_counter()
+
+        for name in WARM_IMPORTS:
+            importlib.import_module(name)
+
+        log.info(f"Warmed up imports in {time.perf_counter() - start:.3f}s.")
+
+    async def on_ready(self) -> None:
         """Updates the bot status when logged in successfully."""
+        self.renderer.start()
+
+        # Readying happens again after every reconnect, but starting up only happens once.
+        if not self.startup.finished:
+            self.startup.record("gateway", self.startup.last, time.perf_counter())
+            log.info(f"Started up:\n{self.startup.finish()}")
+
+            self.loop.run_in_executor(None, self._warm_imports)
+
         log.trace("Awaiting...")
 
     async def logout(self) -> None:
         """Subclassing the logout command to ensure connection(s) are closed properly."""
-        await asyncio.wait_for(self.http_session.close(), 30.0, loop=self.loop)
+        await asyncio.wait_for(self.http_client.close(), 30.0, loop=self.loop)
+        await asyncio.wait_for(self.renderer.close(), 30.0, loop=self.loop)
+        await asyncio.wait_for(self.database.close(), 30.0, loop=self.loop)
+        await asyncio.wait_for(self.metrics.close(), 30.0, loop=self.loop)
+        self.watchdog.stop()
 
         log.trace("Finished up closing task(s).")
 
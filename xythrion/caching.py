@@ -0,0 +1,285 @@
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Hashable, Mapping, Optional, Union
+
+log = logging.getLogger(__name__)
+
+MAX_AGE_PATTERN = re.compile(r"(?:^|,)\s*(s-maxage|max-age)\s*=\s*\"?(\d+)", re.IGNORECASE)
+NO_CACHE_PATTERN = re.compile(r"(?:^|,)\s*(no-store|no-cache|private)\b", re.IGNORECASE)
+
+# Every named cache, so owners can look at how well each one is doing.
+CACHES: Dict[str, Union["LRUCache", "DiskCache"]] = {}
+
+
+class LRUCache:
+    """
+    A bounded mapping that throws away the least recently used items when full.
+
+    Items count as one towards `maxsize` unless `weigh` is given, such as `len` to bound a cache by bytes.
+    Access is locked since caches are shared between the event loop and executor threads.
+    """
+
+    def __init__(self, name: str, maxsize: int, weigh: Optional[Callable[[Any], int]] = None) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.weigh = weigh
+
+        self.weight = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        CACHES[name] = self
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+    def _weigh(self, value: Any) -> int:
+        return self.weigh(value) if self.weigh is not None else 1
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Gets an item, marking it as the most recently used one."""
+        with self._lock:
+            try:
+                self._items.move_to_end(key)
+
+            except KeyError:
+                self.misses += 1
+                return default
+
+            self.hits += 1
+
+            return self._items[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Puts an item into the cache, evicting the least recently used items if there's no room."""
+        weight = self._weigh(value)
+
+        # Something that could never fit would just flush everything else out.
+        if weight > self.maxsize:
+            return
+
+        with self._lock:
+            if key in self._items:
+                self.weight -= self._weigh(self._items.pop(key))
+
+            self._items[key] = value
+            self.weight += weight
+
+            while self.weight > self.maxsize:
+                _, evicted = self._items.popitem(last=False)
+                self.weight -= self._weigh(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Removes every item without resetting the counters."""
+        with self._lock:
+            self._items.clear()
+            self.weight = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters describing how the cache has been used."""
+        lookups = self.hits + self.misses
+
+        return {
+            "name": self.name,
+            "size": f"{self.weight}/{self.maxsize}",
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit rate": f"{self.hits / lookups:.1%}" if lookups else "-",
+        }
+
+
+class TTLCache(LRUCache):
+    """
+    An LRU cache where every item also expires after its own time to live.
+
+    Expired items are only dropped when they're looked up or pushed out, which keeps lookups constant time.
+    """
+
+    def set(self, key: Hashable, value: Any, ttl: float = 0) -> None:
+        """Puts an item into the cache for `ttl` seconds."""
+        if ttl > 0:
+            super().set(key, (time.monotonic() + ttl, value))
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Gets an item if it hasn't expired, marking it as the most recently used one."""
+        entry = super().get(key)
+
+        if entry is None:
+            return default
+
+        expires, value = entry
+
+        if time.monotonic() < expires:
+            return value
+
+        with self._lock:
+            if self._items.get(key) is entry:
+                del self._items[key]
+                self.weight -= self._weigh(entry)
+                self.evictions += 1
+
+            # The lookup was counted as a hit, but nothing usable was found.
+            self.hits -= 1
+            self.misses += 1
+
+        return default
+
+    def _weigh(self, value: Any) -> int:
+        return self.weigh(value[1]) if self.weigh is not None else 1
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key, so only one of them does the work and all get its result.
+
+    The work is shielded from cancellation, so one caller giving up doesn't fail everyone else waiting.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, work: Callable[[], Awaitable[Any]]) -> Any:
+        """Awaits the call already running for a key, or starts `work` if there isn't one."""
+        future = self._calls.get(key)
+
+        if future is None:
+            future = self._calls[key] = asyncio.ensure_future(work())
+            future.add_done_callback(lambda done: self._finish(key, done))
+
+        return await asyncio.shield(future)
+
+    def _finish(self, key: Hashable, future: "asyncio.Future[Any]") -> None:
+        """Forgets a finished call, so the next call with its key does the work again."""
+        if self._calls.get(key) is future:
+            del self._calls[key]
+
+        # Every caller may have been cancelled, so the exception is retrieved here to not be reported as lost.
+        if not future.cancelled():
+            future.exception()
+
+
+def cache_control_ttl(headers: Mapping[str, str]) -> Optional[float]:
+    """How long a response may be cached for according to its Cache-Control header, if it says at all."""
+    cache_control = headers.get("Cache-Control")
+
+    if not cache_control:
+        return None
+
+    if NO_CACHE_PATTERN.search(cache_control):
+        return 0.0
+
+    ages = {name.lower(): int(age) for name, age in MAX_AGE_PATTERN.findall(cache_control)}
+
+    # Shared caches prefer s-maxage, which the bot is since every user sees the same response.
+    age = ages.get("s-maxage", ages.get("max-age"))
+
+    return float(age) if age is not None else None
+
+
+class DiskCache:
+    """
+    Bytes stored as files within a directory, which expire after a time to live.
+
+    Every method does blocking file IO, so they should be run in an executor from the event loop.
+    """
+
+    def __init__(self, name: str, directory: Union[str, Path], ttl: float, suffix: str = "") -> None:
+        self.name = name
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.suffix = suffix
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        CACHES[name] = self
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.suffix}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Reads the bytes stored under a key, deleting them instead if they have expired."""
+        path = self._path(key)
+
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                path.unlink()
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            data = path.read_bytes()
+
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        return data
+
+    def set(self, key: str, data: bytes) -> None:
+        """Writes bytes under a key, through a temporary file so readers never see half of them."""
+        path = self._path(key)
+        temporary = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+
+        try:
+            temporary.write_bytes(data)
+            os.replace(temporary, path)
+
+        except OSError as e:
+            log.warning(f"Could not write {path} to the {self.name} cache: {e}")
+            temporary.unlink(missing_ok=True)
+
+    def evict_expired(self) -> int:
+        """Deletes every expired file, returning how many were deleted."""
+        now = time.time()
+        count = 0
+
+        for path in self.directory.glob(f"*{self.suffix}"):
+            try:
+                if now - path.stat().st_mtime > self.ttl:
+                    path.unlink()
+                    count += 1
+
+            except FileNotFoundError:
+                continue
+
+        self.evictions += count
+
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters describing how the cache has been used."""
+        lookups = self.hits + self.misses
+
+        return {
+            "name": self.name,
+            "size": f"{sum(1 for _ in self.directory.glob(f'*{self.suffix}'))} files",
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit rate": f"{self.hits / lookups:.1%}" if lookups else "-",
+        }
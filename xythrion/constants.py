@@ -1,7 +1,18 @@
-from os import environ
+from os import cpu_count, environ
 from typing import NamedTuple
 
-__all__ = ("Config", "Postgresql", "WeatherAPIs")
+__all__ = (
+    "Caching",
+    "Config",
+    "HTTP",
+    "Inventories",
+    "Metrics",
+    "Postgresql",
+    "RateLimits",
+    "Rendering",
+    "Watchdog",
+    "WeatherAPIs",
+)
 
 
 class Config(NamedTuple):
@@ -9,12 +20,63 @@ class Config(NamedTuple):
     GITHUB_URL = environ.get("GITHUB_URL", "https://github.com/Xithrius/Xythrion")
 
 
+class Caching(NamedTuple):
+    EXPRESSION_CACHE_SIZE = int(environ.get("EXPRESSION_CACHE_SIZE", 256))
+    DOMAIN_CACHE_SIZE = int(environ.get("DOMAIN_CACHE_SIZE", 16))
+    RENDER_CACHE_BYTES = int(environ.get("RENDER_CACHE_BYTES", 32 * 1024 * 1024))
+    RENDER_CACHE_DIRECTORY = environ.get("RENDER_CACHE_DIRECTORY")
+    RENDER_CACHE_TTL = float(environ.get("RENDER_CACHE_TTL", 3 * 60 * 60))
+    WEATHER_CACHE_SIZE = int(environ.get("WEATHER_CACHE_SIZE", 128))
+    REDDIT_CACHE_SIZE = int(environ.get("REDDIT_CACHE_SIZE", 1024))
+
+
+class HTTP(NamedTuple):
+    CONNECT_TIMEOUT = float(environ.get("HTTP_CONNECT_TIMEOUT", 5))
+    READ_TIMEOUT = float(environ.get("HTTP_READ_TIMEOUT", 15))
+    MAX_CONNECTIONS = int(environ.get("HTTP_MAX_CONNECTIONS", 100))
+    MAX_CONNECTIONS_PER_HOST = int(environ.get("HTTP_MAX_CONNECTIONS_PER_HOST", 10))
+
+    RETRIES = int(environ.get("HTTP_RETRIES", 3))
+    BACKOFF_BASE = 0.5
+    MAX_BACKOFF = 10
+
+    # Retry-After asking for longer than this isn't waited on, since someone is waiting on the command.
+    MAX_RETRY_AFTER = 30
+
+    # Failures in a row before a host is cut off, and seconds before it's tried again.
+    BREAKER_THRESHOLD = int(environ.get("HTTP_BREAKER_THRESHOLD", 5))
+    BREAKER_RESET = float(environ.get("HTTP_BREAKER_RESET", 30))
+
+
+class Inventories(NamedTuple):
+    # Sphinx inventories are read from `<directory>/<name>.inv`, and linked to under their base URL.
+    DIRECTORY = environ.get("DOCUMENTATION_DIRECTORY", "inventories")
+
+    URLS = {
+        "python": "https://docs.python.org/3/",
+        "discord.py": "https://discordpy.readthedocs.io/en/latest/",
+        "numpy": "https://numpy.org/doc/stable/",
+        "matplotlib": "https://matplotlib.org/stable/",
+        "aiohttp": "https://docs.aiohttp.org/en/stable/",
+        "asyncpg": "https://magicstack.github.io/asyncpg/current/",
+    }
+
+
+class Metrics(NamedTuple):
+    # Metrics are served at `http://<host>:<port>/metrics`, which docker-compose exposes as port 5005.
+    HOST = environ.get("METRICS_HOST", "0.0.0.0")
+    PORT = int(environ.get("METRICS_PORT", 5000))
+
+
 class Postgresql(NamedTuple):
     USER = environ.get("POSTGRES_USER", "postgres")
     PASSWORD = environ.get("POSTGRES_PASSWORD")
     DATABASE = environ.get("POSTGRES_DB", "postgres")
     HOST = environ.get("POSTGRES_HOST", "localhost")
 
+    MIN_POOL_SIZE = int(environ.get("POSTGRES_MIN_POOL_SIZE", 2))
+    MAX_POOL_SIZE = int(environ.get("POSTGRES_MAX_POOL_SIZE", 10))
+
     asyncpg_config = {
         "user": USER,
         "password": PASSWORD,
@@ -23,6 +85,40 @@ class Postgresql(NamedTuple):
     }
 
 
+class RateLimits(NamedTuple):
+    # Each limit is (uses in a burst, seconds for all of them to refill).
+    GLOBAL = (int(environ.get("RATE_LIMIT_GLOBAL", 50)), 10)
+    GUILD = (int(environ.get("RATE_LIMIT_GUILD", 20)), 10)
+    USER = (int(environ.get("RATE_LIMIT_USER", 5)), 10)
+
+    # Limits for each user on a command and all of its subcommands, on top of the limits above.
+    COMMANDS = {
+        "graph": (2, 10),
+        "weather": (2, 30),
+        "choose": (5, 10),
+    }
+
+    SWEEP_INTERVAL = float(environ.get("RATE_LIMIT_SWEEP_INTERVAL", 60))
+
+
+class Rendering(NamedTuple):
+    WORKERS = int(environ.get("RENDER_WORKERS", cpu_count() or 1))
+    QUEUE_SIZE = int(environ.get("RENDER_QUEUE_SIZE", 32))
+    TIMEOUT = float(environ.get("RENDER_TIMEOUT", 15))
+
+
+class Watchdog(NamedTuple):
+    # Seconds between checking how late the event loop is, and how late it can be before it counts as blocked.
+    INTERVAL = float(environ.get("WATCHDOG_INTERVAL", 0.05))
+    THRESHOLD = float(environ.get("WATCHDOG_THRESHOLD", 0.1))
+
+    # At most one blocked loop is logged this often in seconds, and the rest are only counted.
+    LOG_INTERVAL = float(environ.get("WATCHDOG_LOG_INTERVAL", 60))
+
+    # How many of the latest lags quantiles are taken over.
+    WINDOW = int(environ.get("WATCHDOG_WINDOW", 1200))
+
+
 class WeatherAPIs(NamedTuple):
     EARTH = environ.get("OPENWEATHERMAP_TOKEN")
     MARS = environ.get("NASA_TOKEN")
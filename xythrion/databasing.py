@@ -1,21 +1,176 @@
 import asyncio
+import bisect
 import logging
-from typing import Optional
+import re
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
 
 import asyncpg
 from discord.ext.commands import Context
 
 from .constants import Postgresql
+from .metrics import header, histogram_samples, sample
 
 log = logging.getLogger(__name__)
 
+# Every statement the bot runs, by name. asyncpg prepares each one the first time a connection runs it and
+# keeps it prepared on that connection, so later runs only send the arguments.
+QUERIES = {
+    "blocklist.users": "SELECT user_id FROM Blocked_Users",
+    "blocklist.guilds": "SELECT guild_id FROM Blocked_Guilds",
+    "blocklist.block_user": "INSERT INTO Blocked_Users(user_id) VALUES ($1) ON CONFLICT DO NOTHING",
+    "blocklist.block_guild": "INSERT INTO Blocked_Guilds(guild_id) VALUES ($1) ON CONFLICT DO NOTHING",
+    "blocklist.unblock_user": "DELETE FROM Blocked_Users WHERE user_id = $1",
+    "blocklist.unblock_guild": "DELETE FROM Blocked_Guilds WHERE guild_id = $1",
+    "blocklist.notify": "SELECT pg_notify($1, $2)",
+    "notes.create": "INSERT INTO Notes(user_id, name) VALUES ($1, $2) ON CONFLICT DO NOTHING RETURNING id",
+    "notes.exists": "SELECT EXISTS (SELECT 1 FROM Notes WHERE user_id = $1 AND name = $2)",
+    "notes.delete": "DELETE FROM Notes WHERE user_id = $1 AND name = $2",
+    "notes.list": """
+        SELECT name, items FROM Notes
+        WHERE user_id = $1 AND name > $2
+        ORDER BY name LIMIT $3
+    """,
+    "notes.append": """
+        WITH note AS (
+            UPDATE Notes SET items = items + 1 WHERE user_id = $1 AND name = $2 RETURNING id, items
+        )
+        INSERT INTO Note_Items(note_id, position, content) SELECT id, items, $3 FROM note RETURNING position
+    """,
+    "notes.view": """
+        SELECT i.position, i.content, i.completed FROM Note_Items i
+        JOIN Notes n ON n.id = i.note_id
+        WHERE n.user_id = $1 AND n.name = $2 AND i.position > $3
+        ORDER BY i.position LIMIT $4
+    """,
+    "notes.complete": """
+        UPDATE Note_Items i SET completed = TRUE FROM Notes n
+        WHERE n.id = i.note_id AND n.user_id = $1 AND n.name = $2 AND i.position = $3
+    """,
+    "snippets.all": "SELECT id, name, content FROM Snippets",
+    "snippets.create": """
+        INSERT INTO Snippets(user_id, name, content) VALUES ($1, $2, $3)
+        ON CONFLICT DO NOTHING RETURNING id
+    """,
+    "snippets.delete": "DELETE FROM Snippets WHERE user_id = $1 AND name = $2 RETURNING id",
+    "snippets.get": "SELECT content FROM Snippets WHERE user_id = $1 AND name = $2",
+    "snippets.list": """
+        SELECT name FROM Snippets
+        WHERE user_id = $1 AND name > $2
+        ORDER BY name LIMIT $3
+    """,
+    "snippets.by_ids": "SELECT id, user_id, name, content FROM Snippets WHERE id = ANY($1::INT[])",
+    "migrations.create": """
+        CREATE TABLE IF NOT EXISTS Schema_Migrations(
+            version INT PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()
+        )
+    """,
+    "migrations.applied": "SELECT version FROM Schema_Migrations",
+    "migrations.record": "INSERT INTO Schema_Migrations(version, name) VALUES ($1, $2)",
+    "migrations.lock": "SELECT pg_advisory_lock($1)",
+    "migrations.unlock": "SELECT pg_advisory_unlock($1)",
+    "dates.create": "INSERT INTO Dates(t, id, name) VALUES ($1, $2, $3) ON CONFLICT DO NOTHING",
+    "dates.get": "SELECT t FROM Dates WHERE id = $1 AND name = $2 LIMIT 1",
+}
+
+# Upper bounds of the latency buckets of every statement, in seconds.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, float("inf"))
+
+# Changes to the blocklist are broadcast here, so every process running the bot stays in sync.
+BLOCKLIST_CHANNEL = "blocklist"
+
+BLOCKLIST_KINDS = ("user", "guild")
+
+# Seconds between attempts to listen again after losing the connection, doubling up to the maximum.
+RELISTEN_DELAY = 1
+MAX_RELISTEN_DELAY = 60
+
+# Migrations are named like `0001_what_it_does.sql`, and are applied in order of their version.
+MIGRATIONS_DIRECTORY = Path(__file__).parent.parent / "postgres" / "migrations"
+MIGRATION_PATTERN = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+# Held while migrating, so processes starting at the same time don't apply the same migration twice.
+MIGRATION_LOCK = 0x78797468
+
+
+class QueryStats:
+    """How many times a statement has run, how long it took, and how many rows it touched."""
+
+    __slots__ = ("name", "calls", "rows", "total", "buckets")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+        self.rows = 0
+        self.total = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+    def record(self, elapsed: float, rows: int) -> None:
+        """Counts one run of the statement."""
+        self.calls += 1
+        self.rows += rows
+        self.total += elapsed
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+
+    def quantile(self, q: float) -> float:
+        """The upper bound of the bucket holding the given quantile of latencies."""
+        rank = q * self.calls
+        count = 0
+
+        for bound, amount in zip(LATENCY_BUCKETS, self.buckets):
+            count += amount
+
+            if count >= rank:
+                return bound
+
+        return LATENCY_BUCKETS[-1]
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters describing how the statement has been used."""
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "rows": self.rows,
+            "mean": f"{self.total / self.calls * 1000:.2f}ms" if self.calls else "-",
+            "p50": f"<={self.quantile(0.5) * 1000:g}ms" if self.calls else "-",
+            "p99": f"<={self.quantile(0.99) * 1000:g}ms" if self.calls else "-",
+        }
+
+
+def _row_count(status: str) -> int:
+    """The amount of rows a command affected, from the status it gives back, like `INSERT 0 1`."""
+    count = status.rsplit(" ", 1)[-1]
+
+    return int(count) if count.isdigit() else 0
+
 
 class Database:
     """Utilities for the database, inheriting from setup."""
 
     def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
         self.loop = loop
-        self.pool = self.loop.run_until_complete(self.create_asyncpg_pool())
+
+        # The blocklist is checked on every command, so it's kept in memory instead of being queried.
+        self.blocklist: Dict[str, Set[int]] = {kind: set() for kind in BLOCKLIST_KINDS}
+        self.listener: Optional[asyncpg.Connection] = None
+        self.relistening: Optional[asyncio.Task] = None
+
+        # Changes made while the blocklist is being loaded, to be applied again on top of what was loaded.
+        self.changes_while_loading: Optional[List[Tuple[str, str, str]]] = None
+
+        self.query_stats: Dict[str, QueryStats] = {name: QueryStats(name) for name in QUERIES}
+
+        # Connections of the pool being used, and callers waiting for one to be free.
+        self.in_use = 0
+        self.waiting = 0
+
+        # Connecting happens while the bot logs in, and this is set once it's done, whether it worked or not.
+        self.pool: Optional[asyncpg.pool.Pool] = None
+        self.ready = asyncio.Event()
 
     def __str__(self) -> str:
         """The name of the host of the database."""
@@ -29,7 +184,12 @@ class Database:
     async def create_asyncpg_pool() -> Optional[asyncpg.pool.Pool]:
         """Attempting to connect to the database."""
         try:
-            return await asyncpg.create_pool(**Postgresql.asyncpg_config, command_timeout=60)
+            return await asyncpg.create_pool(
+                **Postgresql.asyncpg_config,
+                min_size=Postgresql.MIN_POOL_SIZE,
+                max_size=Postgresql.MAX_POOL_SIZE,
+                command_timeout=60,
+            )
 
         except Exception as e:
             log.error(
@@ -37,18 +197,314 @@ class Database:
                 exc_info=(type(e), e, e.__traceback__),
             )
 
+    async def connect(self) -> None:
+        """Creates the pool, then brings the database up to date and loads the blocklist."""
+        try:
+            self.pool = await self.create_asyncpg_pool()
+
+            if self.pool:
+                await self.migrate()
+                await self.load_blocklist()
+
+        except Exception as e:
+            log.error(
+                "Failed to bring the database up to date, continuing without it",
+                exc_info=(type(e), e, e.__traceback__),
+            )
+
+            if self.listener is not None:
+                self.listener.remove_termination_listener(self._on_listener_terminated)
+                self.listener.terminate()
+                self.listener = None
+
+            # Anything using the database turns off, instead of running against an outdated schema.
+            if self.pool is not None:
+                await self.pool.close()
+                self.pool = None
+
+        finally:
+            self.ready.set()
+
+    @staticmethod
+    def find_migrations() -> List[Tuple[int, str, Path]]:
+        """Every migration in the migrations directory, as (version, name, path) in order of version."""
+        # Applying nothing here would leave the schema outdated without anyone noticing.
+        if not MIGRATIONS_DIRECTORY.is_dir():
+            raise FileNotFoundError(f"Could not find the database migrations in {MIGRATIONS_DIRECTORY}.")
+
+        migrations = []
+
+        for path in MIGRATIONS_DIRECTORY.glob("*.sql"):
+            match = MIGRATION_PATTERN.match(path.name)
+
+            if match is None:
+                log.warning(f"Skipping {path.name}, migrations are named like 0001_what_it_does.sql.")
+                continue
+
+            migrations.append((int(match.group(1)), match.group(2), path))
+
+        return sorted(migrations)
+
+    async def migrate(self) -> None:
+        """Applies every migration that hasn't been applied yet, each one in its own transaction."""
+        async with self.connection() as conn:
+            await self.fetchval("migrations.lock", MIGRATION_LOCK, conn=conn)
+
+            try:
+                await self.execute("migrations.create", conn=conn)
+                applied = {row[0] for row in await self.fetch("migrations.applied", conn=conn)}
+
+                for version, name, path in self.find_migrations():
+                    if version in applied:
+                        continue
+
+                    async with conn.transaction():
+                        await conn.execute(path.read_text())
+                        await self.execute("migrations.record", version, name, conn=conn)
+
+                    log.info(f"Applied database migration {version} ({name}).")
+
+            finally:
+                await self.fetchval("migrations.unlock", MIGRATION_LOCK, conn=conn)
+
+    async def load_blocklist(self) -> None:
+        """Listens for changes to the blocklist, then loads all of it into memory."""
+        # Listening starts first, and changes heard while loading are recorded, so none of them are missed.
+        self.changes_while_loading = []
+
+        try:
+            self.listener = await asyncpg.connect(**Postgresql.asyncpg_config)
+            await self.listener.add_listener(BLOCKLIST_CHANNEL, self._on_blocklist_notification)
+            self.listener.add_termination_listener(self._on_listener_terminated)
+
+            async with self.connection() as conn:
+                blocklist = {
+                    kind: {row[0] for row in await self.fetch(f"blocklist.{kind}s", conn=conn)}
+                    for kind in BLOCKLIST_KINDS
+                }
+
+        finally:
+            changes, self.changes_while_loading = self.changes_while_loading, None
+
+        # Replaced instead of updated, since anything unblocked while not listening has to go too.
+        for kind, ids in blocklist.items():
+            self.blocklist[kind].intersection_update(ids)
+            self.blocklist[kind].update(ids)
+
+        # The snapshot could have been taken before some of these changes, so they're applied again in order.
+        for change in changes:
+            self._apply_blocklist_change(*change)
+
+        log.info(
+            f"Loaded {len(self.blocklist['user'])} blocked user(s) and "
+            f"{len(self.blocklist['guild'])} blocked guild(s)."
+        )
+
+    @asynccontextmanager
+    async def connection(
+        self, conn: Optional[asyncpg.Connection] = None
+    ) -> AsyncIterator[asyncpg.Connection]:
+        """Uses the connection given, or acquires one from the pool for as long as it's needed."""
+        if conn is not None:
+            yield conn
+
+        else:
+            self.waiting += 1
+
+            try:
+                conn = await self.pool.acquire()
+
+            finally:
+                self.waiting -= 1
+
+            self.in_use += 1
+
+            try:
+                yield conn
+
+            finally:
+                self.in_use -= 1
+                await self.pool.release(conn)
+
+    async def _run(self, method: str, name: str, args: tuple, conn: Optional[asyncpg.Connection]) -> Any:
+        """Runs a named statement, timing it and counting the rows it touched."""
+        async with self.connection(conn) as conn:
+            start = time.perf_counter()
+            result = await getattr(conn, method)(QUERIES[name], *args)
+            elapsed = time.perf_counter() - start
+
+        if method == "execute":
+            rows = _row_count(result)
+
+        elif method == "fetch":
+            rows = len(result)
+
+        else:
+            rows = int(result is not None)
+
+        self.query_stats[name].record(elapsed, rows)
+
+        return result
+
+    async def execute(self, name: str, *args, conn: Optional[asyncpg.Connection] = None) -> int:
+        """Runs a named statement, giving back how many rows it affected."""
+        return _row_count(await self._run("execute", name, args, conn))
+
+    async def fetch(
+        self, name: str, *args, conn: Optional[asyncpg.Connection] = None
+    ) -> List[asyncpg.Record]:
+        """Runs a named statement, giving back every row."""
+        return await self._run("fetch", name, args, conn)
+
+    async def fetchrow(
+        self, name: str, *args, conn: Optional[asyncpg.Connection] = None
+    ) -> Optional[asyncpg.Record]:
+        """Runs a named statement, giving back the first row if there is one."""
+        return await self._run("fetchrow", name, args, conn)
+
+    async def fetchval(self, name: str, *args, conn: Optional[asyncpg.Connection] = None) -> Any:
+        """Runs a named statement, giving back the first value of the first row."""
+        return await self._run("fetchval", name, args, conn)
+
+    async def exists(self, name: str, *args, conn: Optional[asyncpg.Connection] = None) -> bool:
+        """Runs a named `SELECT EXISTS` statement."""
+        return bool(await self._run("fetchval", name, args, conn))
+
+    def _on_blocklist_notification(
+        self, conn: asyncpg.Connection, pid: int, channel: str, payload: str
+    ) -> None:
+        """Applies a change to the blocklist broadcasted by any process, formatted as `kind:action:id`."""
+        self._apply_blocklist_change(*payload.split(":"))
+
+    def _on_listener_terminated(self, conn: asyncpg.Connection) -> None:
+        """Starts listening again when the connection listening for changes to the blocklist is lost."""
+        log.warning("Lost the connection listening for changes to the blocklist, reconnecting.")
+
+        self.listener = None
+        self.relistening = self.loop.create_task(self._relisten())
+
+    async def _relisten(self) -> None:
+        """Keeps trying to listen for changes to the blocklist again, reloading it once listening."""
+        delay = RELISTEN_DELAY
+
+        while True:
+            await asyncio.sleep(delay)
+
+            try:
+                await self.load_blocklist()
+
+            except Exception as e:
+                delay = min(delay * 2, MAX_RELISTEN_DELAY)
+
+                log.error(
+                    f"Failed to listen for changes to the blocklist, retrying in {delay}s.",
+                    exc_info=(type(e), e, e.__traceback__),
+                )
+
+                # Loading can fail after listening started, which would leave that connection open.
+                if self.listener is not None:
+                    self.listener.remove_termination_listener(self._on_listener_terminated)
+                    self.listener.terminate()
+                    self.listener = None
+
+            else:
+                self.relistening = None
+                return
+
+    def _apply_blocklist_change(self, kind: str, action: str, _id: str) -> None:
+        """Adds or removes a user/guild from the blocklist in memory."""
+        if self.changes_while_loading is not None:
+            self.changes_while_loading.append((kind, action, _id))
+
+        if action == "add":
+            self.blocklist[kind].add(int(_id))
+
+        else:
+            self.blocklist[kind].discard(int(_id))
+
+    def is_user_blocked(self, user_id: int) -> bool:
+        """Checks if a user is blocked, without touching the database."""
+        return user_id in self.blocklist["user"]
+
+    def is_guild_blocked(self, guild_id: Optional[int]) -> bool:
+        """Checks if a guild is blocked, without touching the database."""
+        return guild_id is not None and guild_id in self.blocklist["guild"]
+
     async def check_if_blocked(self, ctx: Context) -> bool:
         """Checks if user/guild is blocked."""
-        async with self.pool.acquire() as conn:
-            # Check if user is blocked.
-            user = await conn.fetch("SELECT * FROM Blocked_Users WHERE user_id = $1", ctx.author.id)
+        guild_id = getattr(ctx.guild, "id", None)
+
+        # If either the guild or the user is blocked, the check fails.
+        return not (self.is_user_blocked(ctx.author.id) or self.is_guild_blocked(guild_id))
+
+    async def _update_blocklist(self, kind: str, action: str, _id: int) -> None:
+        """Changes the blocklist in the database, memory, and every other process listening."""
+        statement = f"blocklist.{'block' if action == 'add' else 'unblock'}_{kind}"
+
+        async with self.connection() as conn:
+            async with conn.transaction():
+                await self.execute(statement, _id, conn=conn)
+                await self.fetchval(
+                    "blocklist.notify", BLOCKLIST_CHANNEL, f"{kind}:{action}:{_id}", conn=conn
+                )
+
+        self._apply_blocklist_change(kind, action, str(_id))
+
+    async def block_user(self, user_id: int) -> None:
+        """Removes bot usage privileges from a user."""
+        await self._update_blocklist("user", "add", user_id)
+
+    async def unblock_user(self, user_id: int) -> None:
+        """Restores bot usage privileges for a user."""
+        await self._update_blocklist("user", "remove", user_id)
+
+    async def block_guild(self, guild_id: int) -> None:
+        """Removes bot usage privileges from a guild."""
+        await self._update_blocklist("guild", "add", guild_id)
+
+    async def unblock_guild(self, guild_id: int) -> None:
+        """Restores bot usage privileges for a guild."""
+        await self._update_blocklist("guild", "remove", guild_id)
+
+    def metrics(self) -> Iterator[str]:
+        """Usage of the pool and of every statement, in the Prometheus text format."""
+        yield from header(
+            "xythrion_db_pool_connections", "Connections of the pool, by what they're doing.", "gauge"
+        )
+        yield sample("xythrion_db_pool_connections", self.in_use, {"state": "in_use"})
+        yield sample("xythrion_db_pool_connections", self.waiting, {"state": "waiting"})
+        yield from header("xythrion_db_pool_max_connections", "Connections the pool can open.", "gauge")
+        yield sample("xythrion_db_pool_max_connections", Postgresql.MAX_POOL_SIZE if self.pool else 0)
+
+        used = [stats for stats in self.query_stats.values() if stats.calls]
+
+        yield from header(
+            "xythrion_db_query_duration_seconds", "How long database statements took.", "histogram"
+        )
+        for stats in used:
+            yield from histogram_samples(
+                "xythrion_db_query_duration_seconds",
+                {"query": stats.name},
+                LATENCY_BUCKETS,
+                stats.buckets,
+                stats.total,
+            )
+
+        yield from header(
+            "xythrion_db_query_rows_total", "Rows database statements gave back or touched.", "counter"
+        )
+        for stats in used:
+            yield sample("xythrion_db_query_rows_total", stats.rows, {"query": stats.name})
 
-            if not len(user):
-                # If the user is not blocked, check if the guild is blocked.
-                guild = await conn.fetch("SELECT * FROM Blocked_Guilds WHERE guild_id = $1", ctx.guild.id)
+    async def close(self) -> None:
+        """Closes the connection listening for changes along with the pool."""
+        if self.relistening is not None:
+            self.relistening.cancel()
 
-                if not len(guild):
-                    return True
+        # Closing calls termination listeners too, which would only start listening again.
+        if self.listener is not None:
+            self.listener.remove_termination_listener(self._on_listener_terminated)
+            await self.listener.close()
 
-        # If none of the checks passed, either the guild or the user is blocked.
-        return False
+        if self.pool:
+            await self.pool.close()
@@ -1,5 +1,23 @@
+import hashlib
+from pathlib import Path
 from pkgutil import iter_modules
 
 EXTENSIONS = frozenset(
     extension.name for extension in iter_modules(("xythrion/extensions",), "xythrion.extensions.")
 )
+
+
+def extension_path(extension: str) -> Path:
+    """The directory of an extension package."""
+    return Path(*extension.split("."))
+
+
+def source_digest(extension: str) -> str:
+    """Hashes every source file of an extension package, which changes whenever any of them do."""
+    digest = hashlib.blake2b(digest_size=16)
+
+    for path in sorted(extension_path(extension).rglob("*.py")):
+        digest.update(str(path).encode())
+        digest.update(path.read_bytes())
+
+    return digest.hexdigest()
@@ -1,13 +1,17 @@
 from xythrion.bot import Xythrion
 from xythrion.extensions.administration.anti_command_spam import AntiCommandSpam
+from xythrion.extensions.administration.command_metrics import CommandMetrics
 from xythrion.extensions.administration.development import Development
 from xythrion.extensions.administration.manager import Manager
+from xythrion.extensions.administration.rate_limiting import RateLimiting
 from xythrion.extensions.administration.warnings import Warnings
 
 
 def setup(bot: Xythrion) -> None:
     """The necessary function for loading in extensions within this folder."""
     bot.add_cog(AntiCommandSpam(bot))
+    bot.add_cog(CommandMetrics(bot))
     bot.add_cog(Development(bot))
     bot.add_cog(Manager(bot))
+    bot.add_cog(RateLimiting(bot))
     bot.add_cog(Warnings(bot))
@@ -1,4 +1,7 @@
-import numpy as np
+from array import array
+from collections import OrderedDict
+from typing import Optional, Tuple
+
 from discord import Message
 from discord.ext.commands import Cog
 
@@ -8,6 +11,46 @@ from xythrion.bot import Xythrion
 MESSAGE_HISTORY_AMOUNT = 7
 MAX_AVERAGE_TIME_DIFFERENCE = 0.3
 
+# Windows of users idle for this long are dropped, as are the least recently active ones past the limit.
+IDLE_TIMEOUT = 60
+MAX_WINDOWS = 10_000
+
+
+class MessageWindow:
+    """The timestamps of the most recent messages of one user, in a fixed-size ring buffer."""
+
+    __slots__ = ("timestamps", "start", "count")
+
+    def __init__(self, size: int) -> None:
+        self.timestamps = array("d", bytes(8 * size))
+        self.start = 0
+        self.count = 0
+
+    @property
+    def newest(self) -> float:
+        """The timestamp of the most recent message."""
+        return self.timestamps[(self.start + self.count - 1) % len(self.timestamps)]
+
+    def add(self, timestamp: float) -> None:
+        """Adds a timestamp, overwriting the oldest one once the window is full."""
+        size = len(self.timestamps)
+
+        if self.count < size:
+            self.timestamps[(self.start + self.count) % size] = timestamp
+            self.count += 1
+
+        else:
+            self.timestamps[self.start] = timestamp
+            self.start = (self.start + 1) % size
+
+    def average_interval(self) -> Optional[float]:
+        """The average time between messages, only known once the window is full."""
+        if self.count < len(self.timestamps):
+            return None
+
+        # The intervals between consecutive messages add up to the time between the oldest and newest.
+        return (self.newest - self.timestamps[self.start]) / (self.count - 1)
+
 
 class AntiCommandSpam(Cog):
     """Preventing the bot from being abused."""
@@ -15,6 +58,19 @@ class AntiCommandSpam(Cog):
     def __init__(self, bot: Xythrion) -> None:
         self.bot = bot
 
+        # Ordered from least to most recently active, so idle windows are always at the front.
+        self.windows: "OrderedDict[Tuple[Optional[int], int], MessageWindow]" = OrderedDict()
+
+    def _evict(self, now: float) -> None:
+        """Drops windows of users that have gone idle, and the least recently active ones past the limit."""
+        while self.windows:
+            window = next(iter(self.windows.values()))
+
+            if len(self.windows) <= MAX_WINDOWS and now - window.newest < IDLE_TIMEOUT:
+                break
+
+            self.windows.popitem(last=False)
+
     @Cog.listener()
     async def on_message(self, message: Message) -> None:
         """
@@ -22,15 +78,25 @@ class AntiCommandSpam(Cog):
 
         Time is averaged to see if the user is spamming very quickly.
         """
-        messages = [
-            msg.created_at
-            for msg in await message.channel.history(limit=MESSAGE_HISTORY_AMOUNT)
-            if msg.author == message.author
-        ]
-
-        avg = sum(np.diff(messages)) / MESSAGE_HISTORY_AMOUNT
-
-        if avg < MAX_AVERAGE_TIME_DIFFERENCE:
-            if await self.bot.database.check_if_blocked(message.author.id):
-                async with self.bot.pool.acquire() as conn:
-                    await conn.execute("INSERT INTO Blocked_Users(user_id) VALUES ($1)", message.author.id)
+        if message.author.bot:
+            return
+
+        key = (getattr(message.guild, "id", None), message.author.id)
+        now = message.created_at.timestamp()
+
+        window = self.windows.get(key)
+
+        if window is None:
+            window = self.windows[key] = MessageWindow(MESSAGE_HISTORY_AMOUNT)
+
+        else:
+            self.windows.move_to_end(key)
+
+        window.add(now)
+        self._evict(now)
+
+        avg = window.average_interval()
+
+        if avg is not None and avg < MAX_AVERAGE_TIME_DIFFERENCE:
+            if not self.bot.database.is_user_blocked(message.author.id):
+                await self.bot.database.block_user(message.author.id)
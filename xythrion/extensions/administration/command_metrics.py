@@ -0,0 +1,43 @@
+import time
+
+from discord.ext.commands import Cog, CommandError, Context
+
+from xythrion.bot import Xythrion
+
+
+class CommandMetrics(Cog):
+    """Counting and timing every command for the metrics of the bot."""
+
+    def __init__(self, bot: Xythrion) -> None:
+        self.bot = bot
+
+    def _observe(self, ctx: Context, outcome: str) -> None:
+        """Records how long a command took, if it got far enough to be timed."""
+        started = getattr(ctx, "started_at", None)
+
+        if started is not None:
+            self.bot.metrics.commands.observe(
+                time.perf_counter() - started, ctx.command.qualified_name, outcome
+            )
+
+    @Cog.listener()
+    async def on_command(self, ctx: Context) -> None:
+        """Starts timing a command, before its checks and arguments."""
+        ctx.started_at = time.perf_counter()
+
+    @Cog.listener()
+    async def on_command_completion(self, ctx: Context) -> None:
+        """Records a command that succeeded."""
+        self._observe(ctx, "success")
+
+    @Cog.listener()
+    async def on_command_error(self, ctx: Context, e: CommandError) -> None:
+        """Records a command that failed, along with what it failed with."""
+        # Messages that aren't commands aren't counted, since anyone can make up names for them.
+        if ctx.command is None:
+            return
+
+        self.bot.metrics.command_errors.inc(
+            ctx.command.qualified_name, type(getattr(e, "original", e)).__name__
+        )
+        self._observe(ctx, "error")
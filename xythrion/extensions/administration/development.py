@@ -1,16 +1,28 @@
+import asyncio
+import threading
+import time
 from datetime import datetime
+from io import BytesIO
 from logging import getLogger
-from typing import Optional
+from typing import Dict, Iterable, Optional
 
-import humanize
+from discord import File, Message
 from discord.ext.commands import Cog, Context, ExtensionNotLoaded, command, is_owner
+from tabulate import tabulate
 
 from xythrion.bot import Xythrion
-from xythrion.extensions import EXTENSIONS
+from xythrion.caching import CACHES
+from xythrion.extensions import EXTENSIONS, source_digest
+from xythrion.profiling import INTERVAL, all_threads, sample_stacks, top_functions
 from xythrion.utils import DefaultEmbed, Extension
 
 log = getLogger(__name__)
 
+MAX_PROFILE_SECONDS = 60
+
+# As many functions as fit in an embed.
+MAX_PROFILE_ROWS = 20
+
 
 class Development(Cog, command_attrs=dict(hidden=True)):
     """Cog required for development and control."""
@@ -18,34 +30,165 @@ class Development(Cog, command_attrs=dict(hidden=True)):
     def __init__(self, bot: Xythrion) -> None:
         self.bot = bot
 
+        # Digests are kept by the bot, so they outlive this cog being reloaded along with its extension.
+        for extension in EXTENSIONS:
+            self.bot.extension_digests.setdefault(extension, source_digest(extension))
+
+    async def _digests(self, extensions: Iterable[str]) -> Dict[str, str]:
+        """Hashes the source of every extension at once in the executor."""
+        extensions = tuple(extensions)
+        digests = await asyncio.gather(
+            *(self.bot.loop.run_in_executor(None, source_digest, extension) for extension in extensions)
+        )
+
+        return dict(zip(extensions, digests))
+
+    def _reload_extension(self, extension: str) -> None:
+        """Reloads an extension, or loads it if it isn't loaded, keeping the old one if it fails."""
+        try:
+            self.bot.reload_extension(extension)
+
+        except ExtensionNotLoaded:
+            self.bot.load_extension(extension)
+
     @command(name="reload", aliases=("refresh", "r"))
     @is_owner()
-    async def reload(self, ctx: Context, *user_extensions: Optional[Extension]) -> None:
-        """Reloads either all extensions or specific ones given by the user."""
-        d = datetime.now()
+    async def reload(self, ctx: Context, *user_extensions: Optional[Extension]) -> Optional[Message]:
+        """Reloads extensions whose source changed, or specific ones given by the user even if unchanged."""
+        digests = await self._digests(set(user_extensions or EXTENSIONS))
 
-        for extension in set(user_extensions or EXTENSIONS):
-            try:
-                self.bot.reload_extension(extension)
+        extensions = sorted(
+            extension
+            for extension, digest in digests.items()
+            if user_extensions or digest != self.bot.extension_digests.get(extension)
+        )
+
+        if not extensions:
+            return await ctx.send(embed=DefaultEmbed(ctx, description="No extensions have changed."))
+
+        start = time.perf_counter()
+
+        rows = []
 
-            except ExtensionNotLoaded:
-                self.bot.load_extension(extension)
+        # Only hashing the sources above runs in parallel. Reloading stays one at a time on the loop, since
+        # it imports modules and adds cogs and commands to the bot, none of which is safe from other threads.
+        # One extension failing doesn't stop the rest, and keeps its old digest so it's retried next time.
+        for extension in extensions:
+            # Other events get handled between reloads, instead of waiting for all of them.
+            await asyncio.sleep(0)
+
+            extension_start = time.perf_counter()
+
+            try:
+                self._reload_extension(extension)
 
             except Exception as e:
-                return log.error(f"Reloading {extension} error.", exc_info=(type(e), e, e.__traceback__))
+                log.error(f"Reloading {extension} error.", exc_info=(type(e), e, e.__traceback__))
+                result = f"failed: {type(e.__cause__ or e).__name__}"
 
-        ms = humanize.naturaldelta(d - datetime.now(), minimum_unit="milliseconds")
+            else:
+                self.bot.extension_digests[extension] = digests[extension]
+                result = "reloaded"
 
-        if not user_extensions:
-            msg = (
-                f"Reloaded {len(self.bot.extensions)} extension(s) "
-                f"containing {len(self.bot.cogs)} cog(s) in in about {ms}."
-            )
-        else:
-            msg = f"Reloaded {len(user_extensions)} extension(s) in about {ms}."
+            elapsed = (time.perf_counter() - extension_start) * 1000
+            rows.append((extension.rsplit(".", 1)[-1], result, f"{elapsed:.1f}ms"))
+
+        reloaded = sum(result == "reloaded" for _, result, _ in rows)
+        msg = f"Reloaded {reloaded}/{len(rows)} extension(s) in {(time.perf_counter() - start) * 1000:.1f}ms."
 
         log.info(msg)
 
-        embed = DefaultEmbed(ctx, description=msg)
+        table = tabulate(rows, headers=("extension", "result", "time"), tablefmt="simple", stralign="right")
+
+        embed = DefaultEmbed(ctx, description=f"{msg}\n```py\n{table}```")
+
+        await ctx.send(embed=embed)
+
+    @command(name="profile")
+    @is_owner()
+    async def profile(self, ctx: Context, seconds: float = 10, top: int = 15) -> Optional[Message]:
+        """Samples what the loop, executor threads and render workers are doing for some seconds."""
+        if not 0 < seconds <= MAX_PROFILE_SECONDS:
+            embed = DefaultEmbed(ctx, description=f"Profiling can take up to {MAX_PROFILE_SECONDS} seconds.")
+            return await ctx.send(embed=embed)
+
+        # Commands run on the loop's thread, which is the one worth naming.
+        loop_thread = threading.get_ident()
+
+        def threads() -> Dict[int, str]:
+            return {**all_threads(), loop_thread: "event loop"}
+
+        (stacks, samples), worker_stacks = await asyncio.gather(
+            self.bot.loop.run_in_executor(None, sample_stacks, seconds, INTERVAL, threads),
+            self.bot.renderer.profile(seconds, INTERVAL),
+        )
+        stacks.update(worker_stacks)
+
+        rows = [
+            (function, f"{own / samples:.1%}", f"{total / samples:.1%}")
+            for function, own, total in top_functions(stacks, min(top, MAX_PROFILE_ROWS))
+        ]
+        table = tabulate(rows, headers=("function", "own", "total"), tablefmt="simple", stralign="right")
+
+        # The collapsed stacks can be made into a flame graph with flamegraph.pl or speedscope.
+        collapsed = "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+        file = File(BytesIO(collapsed.encode()), filename="profile.folded")
+
+        embed = DefaultEmbed(
+            ctx,
+            description=f"Share of {samples} sample(s) over {seconds:g}s.\n```py\n{table}```",
+        )
+
+        await ctx.send(embed=embed, file=file)
+
+    @command(name="lag")
+    @is_owner()
+    async def loop_lag(self, ctx: Context) -> None:
+        """Shows how late the event loop has been lately, and what last blocked it."""
+        watchdog = self.bot.watchdog
+        quantiles = watchdog.quantiles()
+
+        lines = [
+            " ".join(f"{name}: {lag * 1000:.1f}ms" for name, lag in quantiles.items()),
+            f"Over the latest {len(watchdog.lags)} check(s), every {watchdog.interval * 1000:g}ms.",
+            f"Blocked past {watchdog.threshold * 1000:g}ms {watchdog.stall_count} time(s).",
+        ]
+
+        stall = watchdog.last_stall
+
+        if stall is not None:
+            seen = datetime.fromtimestamp(stall.seen_at).strftime("%Y-%m-%d %H:%M:%S")
+            lines.append(f"Last blocked at {seen} by {stall.task}.")
+
+        await ctx.send(embed=DefaultEmbed(ctx, description="\n".join(lines)))
+
+    @command(name="caches")
+    @is_owner()
+    async def cache_stats(self, ctx: Context) -> None:
+        """Shows the hit/miss/eviction counters of every cache in the bot."""
+        if not CACHES:
+            embed = DefaultEmbed(ctx, description="No caches have been created yet.")
+            return await ctx.send(embed=embed)
+
+        rows = [cache.stats() for cache in CACHES.values()]
+        table = tabulate(rows, headers="keys", tablefmt="simple", numalign="left", stralign="right")
+
+        embed = DefaultEmbed(ctx, description=f"```py\n{table}```")
+
+        await ctx.send(embed=embed)
+
+    @command(name="queries")
+    @is_owner()
+    async def query_stats(self, ctx: Context) -> None:
+        """Shows how often every database statement has run, how long it took, and the rows it touched."""
+        rows = [stats.stats() for stats in self.bot.database.query_stats.values() if stats.calls]
+
+        if not rows:
+            embed = DefaultEmbed(ctx, description="No database statements have been run yet.")
+            return await ctx.send(embed=embed)
+
+        table = tabulate(rows, headers="keys", tablefmt="simple", numalign="left", stralign="right")
+
+        embed = DefaultEmbed(ctx, description=f"```py\n{table}```")
 
         await ctx.send(embed=embed)
@@ -16,13 +16,9 @@ class Manager(Cog, command_attrs=dict(hidden=True)):
     @is_owner()
     async def restore_guild_api_permissions(self, ctx: Context, guild_id: Optional[int] = None) -> None:
         """Restores bot usage privileges for a guild."""
-        async with self.bot.pool.acquire() as conn:
-            await conn.execute(
-                "DELETE FROM Blocked_Guilds WHERE guild_id = $1",
-                guild_id if guild_id else ctx.guild.id,
-            )
+        await self.bot.database.unblock_guild(guild_id if guild_id else ctx.guild.id)
 
-        guild = self.bot.get_guild(guild_id) if not guild_id else ctx.guild
+        guild = self.bot.get_guild(guild_id) if guild_id else ctx.guild
         embed = DefaultEmbed(
             ctx,
             description=f'Bot usage privileges restored for guild "{guild.name if guild else guild_id}".',
@@ -34,11 +30,7 @@ class Manager(Cog, command_attrs=dict(hidden=True)):
     @is_owner()
     async def restore_user_api_permissions(self, ctx: Context, user_id: Optional[int] = None) -> None:
         """Restores bot usage privileges for a user."""
-        async with self.bot.pool.acquire() as conn:
-            await conn.execute(
-                "DELETE FROM Blocked_Users WHERE user_id = $1",
-                user_id if user_id else ctx.author.id,
-            )
+        await self.bot.database.unblock_user(user_id if user_id else ctx.author.id)
 
         user = self.bot.get_user(user_id) if user_id else ctx.author
         embed = DefaultEmbed(
@@ -52,13 +44,9 @@ class Manager(Cog, command_attrs=dict(hidden=True)):
     @is_owner()
     async def remove_guild_api_permissions(self, ctx: Context, guild_id: Optional[int] = None) -> None:
         """Removes bot usage privileges for a guild."""
-        async with self.bot.pool.acquire() as conn:
-            await conn.execute(
-                "INSERT INTO Blocked_Guilds(guild_id) VALUES ($1)",
-                guild_id if guild_id else ctx.guild.id,
-            )
+        await self.bot.database.block_guild(guild_id if guild_id else ctx.guild.id)
 
-        guild = self.bot.get_guild(guild_id) if not guild_id else ctx.guild
+        guild = self.bot.get_guild(guild_id) if guild_id else ctx.guild
         embed = DefaultEmbed(
             ctx,
             description=f'Bot usage privileges removed from guild "{guild.name if guild else guild_id}".',
@@ -70,11 +58,7 @@ class Manager(Cog, command_attrs=dict(hidden=True)):
     @is_owner()
     async def remove_user_api_permissions(self, ctx: Context, user_id: Optional[int] = None) -> None:
         """Removes bot usage privileges for a user."""
-        async with self.bot.pool.acquire() as conn:
-            await conn.execute(
-                "INSERT INTO Blocked_Users(user_id) VALUES ($1)",
-                user_id if user_id else ctx.author.id,
-            )
+        await self.bot.database.block_user(user_id if user_id else ctx.author.id)
 
         user = self.bot.get_user(user_id) if user_id else ctx.author
         embed = DefaultEmbed(
@@ -87,11 +71,10 @@ class Manager(Cog, command_attrs=dict(hidden=True)):
     @command(aliases=("blocked", "amiblocked"))
     async def am_i_blocked(self, ctx: Context) -> None:
         """Checking if the guild that the user is in and/or if the user is blocked."""
-        async with self.bot.pool.acquire() as conn:
-            u = await conn.fetch("SELECT * FROM Blocked_Users WHERE user_id = $1", ctx.author.id)
-            g = await conn.fetch("SELECT * FROM Blocked_Guilds WHERE guild_id = $1", ctx.guild.id)
+        u = self.bot.database.is_user_blocked(ctx.author.id)
+        g = self.bot.database.is_guild_blocked(getattr(ctx.guild, "id", None))
 
-            blocked_string = f'`User:` **{"Yes." if u else "No."}**\n`Guild:` **{"Yes." if g else "No."}**'
+        blocked_string = f'`User:` **{"Yes." if u else "No."}**\n`Guild:` **{"Yes." if g else "No."}**'
 
         embed = DefaultEmbed(ctx, description=blocked_string)
 
@@ -0,0 +1,74 @@
+import asyncio
+import logging
+from typing import Hashable, List, Tuple
+
+from discord.ext.commands import Cog, Context
+
+from xythrion.bot import Xythrion
+from xythrion.constants import RateLimits
+from xythrion.utils.rate_limiting import RateLimit, RateLimited, RateLimiter
+
+log = logging.getLogger(__name__)
+
+GLOBAL_LIMIT = RateLimit(*RateLimits.GLOBAL)
+GUILD_LIMIT = RateLimit(*RateLimits.GUILD)
+USER_LIMIT = RateLimit(*RateLimits.USER)
+COMMAND_LIMITS = {name: RateLimit(*limit) for name, limit in RateLimits.COMMANDS.items()}
+
+
+class RateLimiting(Cog):
+    """Limiting how often commands can be used, globally and per guild, user and command."""
+
+    def __init__(self, bot: Xythrion) -> None:
+        self.bot = bot
+
+        self.limiter = RateLimiter()
+        self.sweeper = self.bot.loop.create_task(self.sweep())
+
+    def cog_unload(self) -> None:
+        """Stops sweeping idle buckets."""
+        self.sweeper.cancel()
+
+    async def sweep(self) -> None:
+        """Regularly drops buckets that haven't been used long enough to be full again."""
+        while True:
+            await asyncio.sleep(RateLimits.SWEEP_INTERVAL)
+
+            count = self.limiter.sweep()
+
+            if count:
+                log.debug(f"Swept {count} idle rate limit bucket(s).")
+
+    @staticmethod
+    def limits_for(ctx: Context) -> List[Tuple[Hashable, RateLimit]]:
+        """Every bucket a use of the command falls under."""
+        limits: List[Tuple[Hashable, RateLimit]] = [
+            ("global", GLOBAL_LIMIT),
+            (("user", ctx.author.id), USER_LIMIT),
+        ]
+
+        if ctx.guild is not None:
+            limits.append((("guild", ctx.guild.id), GUILD_LIMIT))
+
+        name = ctx.command.root_parent.name if ctx.command.root_parent else ctx.command.name
+
+        if name in COMMAND_LIMITS:
+            limits.append((("command", name, ctx.author.id), COMMAND_LIMITS[name]))
+
+        return limits
+
+    async def bot_check_once(self, ctx: Context) -> bool:
+        """
+        Refuses commands past their rate limits, before any of their arguments are converted.
+
+        This runs once per invocation, where a regular check would run again for the subcommand of a group.
+        """
+        if await self.bot.is_owner(ctx.author):
+            return True
+
+        retry_after = self.limiter.hit(self.limits_for(ctx))
+
+        if retry_after is not None:
+            raise RateLimited(f"You are being rate limited, try again in {retry_after:.1f}s", retry_after)
+
+        return True
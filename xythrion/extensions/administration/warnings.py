@@ -4,7 +4,10 @@ from discord.ext import commands
 from discord.ext.commands import Cog, Context
 
 from xythrion.bot import Xythrion
+from xythrion.http_client import HTTPError
+from xythrion.rendering import RenderError
 from xythrion.utils import DefaultEmbed
+from xythrion.utils.rate_limiting import RateLimited
 
 log = logging.getLogger(__name__)
 
@@ -44,6 +47,9 @@ class Warnings(Cog, command_attrs=dict(hidden=True)):
         elif isinstance(e, commands.CommandOnCooldown):
             embed.description = f"{e}."
 
+        elif isinstance(e, RateLimited):
+            embed.description = f"{e}."
+
         elif isinstance(e, commands.CheckFailure):
             embed.description = "You do not have enough permissions to run this command."
 
@@ -53,6 +59,12 @@ class Warnings(Cog, command_attrs=dict(hidden=True)):
         elif isinstance(e, commands.CommandNotFound):
             embed.description = "Unknown command."
 
+        elif isinstance(e, HTTPError):
+            embed.description = f"A request could not be completed: {e}."
+
+        elif isinstance(e, RenderError):
+            embed.description = f"Graph could not be rendered: {e}"
+
         else:
             embed.description = f"{type(e).__name__}: {e}"
 
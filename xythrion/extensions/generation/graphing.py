@@ -1,14 +1,29 @@
-import os
+import math
 import re
-from typing import List, Optional, Union
+from typing import List, Optional, TYPE_CHECKING, Tuple, Union
 
-from discord import Message
+from discord import Attachment, Message
 from discord.ext.commands import Cog, Context, Greedy, group
 
 from xythrion.bot import Xythrion
+from xythrion.rendering import GraphSpec, Subplot
 from xythrion.utils import DefaultEmbed, Graph, check_for_subcommands, remove_whitespace
+from xythrion.utils.DSL.errors import ParsingError, TokenizationError
+
+if TYPE_CHECKING:
+    import numpy as np
 
 ILLEGAL_CHARACTERS = re.compile(r"[!{}\[\]]+")
+POINT_PATTERN = re.compile(r"\((-?\d+(?:\.\d+)?),(-?\d+(?:\.\d+)?)\)")
+
+DEFAULT_DOMAIN = (-10, 10)
+
+MAX_INLINE_POINTS = 100
+
+# Width of a default matplotlib figure in pixels, which is as many points as a line can show.
+PIXEL_WIDTH = 640
+CHUNK_SIZE = 1024 * 1024
+MAX_ATTACHMENT_SIZE = 64 * 1024 * 1024
 
 
 class Graphing(Cog):
@@ -18,11 +33,15 @@ class Graphing(Cog):
         self.bot = bot
 
     @staticmethod
-    def create_graph(
-        domain_nums: Optional[List[Union[int, float]]], x: List[Union[int, float]], y: List[Union[int, float]]
-    ) -> Graph:
-        """Creates a graph object after getting values within a domain from an expression."""
-        pass
+    def create_graph(expression: str, domain_nums: Optional[List[Union[int, float]]]) -> GraphSpec:
+        """Creates a graph specification after getting values within a domain from an expression."""
+        # These import NumPy, so they're only imported once an expression is graphed.
+        from xythrion.utils.DSL.interpreter import compile_expression
+        from xythrion.utils.DSL.sampling import adaptive_sample
+
+        x, y, y_limits = adaptive_sample(compile_expression(expression), *(domain_nums or DEFAULT_DOMAIN))
+
+        return GraphSpec((Subplot(y, x=x, y_limits=y_limits),))
 
     @group(aliases=("plot",))
     async def graph(self, ctx: Context) -> None:
@@ -30,14 +49,65 @@ class Graphing(Cog):
         if ctx.invoked_subcommand is None:
             await check_for_subcommands(ctx)
 
+    async def _read_attachment(self, attachment: Attachment) -> Tuple["np.ndarray", "np.ndarray", int]:
+        """Streams a CSV/TSV attachment into arrays, downsampled to the width of the graph."""
+        from xythrion.utils.datasets import PointReader
+
+        reader = PointReader(PIXEL_WIDTH)
+
+        async with self.bot.http_client.stream(attachment.url) as resp:
+            async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                await self.bot.loop.run_in_executor(None, reader.feed, chunk)
+
+        x, y = await self.bot.loop.run_in_executor(None, reader.finish)
+
+        return x, y, reader.rows
+
     @graph.command()
-    async def points(self, ctx: Context, points: remove_whitespace) -> None:
+    async def points(self, ctx: Context, *, points: remove_whitespace = "") -> Optional[Message]:
         """
         Graphs points on a plot.
 
         Format: [(x0, y0), (x1, y1), (x2, y2),...] up to 100 points.
+        Alternatively, attach a CSV/TSV file with columns of x and y (or only y) of any length.
         """
-        ...
+        import numpy as np
+
+        from xythrion.utils.datasets import DatasetError
+
+        title = None
+
+        if ctx.message.attachments:
+            attachment = ctx.message.attachments[0]
+
+            if attachment.size > MAX_ATTACHMENT_SIZE:
+                embed = DefaultEmbed(
+                    ctx, desc=f"Attachments can be at most {MAX_ATTACHMENT_SIZE // 1024 // 1024}MB."
+                )
+                return await ctx.send(embed=embed)
+
+            try:
+                x, y, rows = await self._read_attachment(attachment)
+
+            except DatasetError as e:
+                embed = DefaultEmbed(ctx, desc=f"Could not read {attachment.filename}: {e}")
+                return await ctx.send(embed=embed)
+
+            title = f"{attachment.filename} ({rows} rows)"
+
+        else:
+            pairs = POINT_PATTERN.findall(points)
+
+            if not pairs or len(pairs) > MAX_INLINE_POINTS:
+                embed = DefaultEmbed(ctx, desc=f"Between 1 and {MAX_INLINE_POINTS} points can be given.")
+                return await ctx.send(embed=embed)
+
+            values = np.array(pairs, dtype=np.float64)
+            x, y = values[:, 0], values[:, 1]
+
+        graph = Graph(ctx, await self.bot.renderer.render(GraphSpec((Subplot(y, x=x, title=title),))))
+
+        await ctx.send(file=graph.embed.file, embed=graph.embed)
 
     @graph.command()
     async def expression(
@@ -46,7 +116,7 @@ class Graphing(Cog):
         """
         Takes a single variable math expression and plots it.
 
-        Supports one variable per expression (ex. x or y, not x and y), e, and pi.
+        Supports the variable x, e, pi, and functions such as sin(x) or sqrt(x).
         """
         if len(domain_numbers) not in (0, 2):
             return await ctx.send(
@@ -57,8 +127,23 @@ class Graphing(Cog):
             embed = DefaultEmbed(ctx, desc=f"Illegal character in expression: {illegal_char.group(0)}")
             return await ctx.send(embed=embed)
 
-        graph = await self.bot.loop.run_in_executor(None, self.create_graph, expression)
+        if domain_numbers and domain_numbers[0] >= domain_numbers[1]:
+            embed = DefaultEmbed(ctx, desc="The start of the domain must be less than the end of the domain.")
+            return await ctx.send(embed=embed)
 
-        await ctx.send(file=graph.embed.file, embed=graph.embed)
+        # A domain this wide can't be split into samples, since its width overflows.
+        if domain_numbers and not math.isfinite(domain_numbers[1] - domain_numbers[0]):
+            embed = DefaultEmbed(ctx, desc="The domain is too wide to be graphed.")
+            return await ctx.send(embed=embed)
+
+        # Sampling can take several passes over thousands of points, which would otherwise block the loop.
+        try:
+            spec = await self.bot.loop.run_in_executor(None, self.create_graph, expression, domain_numbers)
 
-        os.remove(graph.save_path)
+        except (TokenizationError, ParsingError) as e:
+            embed = DefaultEmbed(ctx, desc=f"Invalid expression: {e}")
+            return await ctx.send(embed=embed)
+
+        graph = Graph(ctx, await self.bot.renderer.render(spec))
+
+        await ctx.send(file=graph.embed.file, embed=graph.embed)
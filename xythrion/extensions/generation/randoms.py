@@ -1,6 +1,5 @@
 from random import choice, sample
 
-import numpy as np
 from discord.ext.commands import Cog, Context, command
 
 from xythrion.bot import Xythrion
@@ -17,7 +16,7 @@ class Randoms(Cog):
     async def dice(self, ctx: Context, rolls: int = 1) -> None:
         """Rolls a die anywhere between 1 and 100."""
         if 1 < rolls < 100:
-            s = round(np.sum(sample(range(1, 6), rolls)) / rolls, 3)
+            s = round(sum(sample(range(1, 6), rolls)) / rolls, 3)
             msg = f"Die was rolled {rolls} time(s). Average output: {s}"
         else:
             msg = "Integer gives for rolls is invalid."
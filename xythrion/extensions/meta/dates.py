@@ -1,5 +1,7 @@
 from datetime import datetime
+from typing import Optional
 
+from discord import Message
 from discord.ext.commands import Cog, Context, Greedy, command
 from humanize import naturaldate, precisedelta
 
@@ -18,15 +20,16 @@ class Dates(Cog):
         return await self.bot.database.check_if_blocked(ctx) and self.bot.database
 
     @command()
-    async def create_date(self, ctx: Context, name: str, dates: Greedy[int] = "now") -> None:
+    async def create_date(self, ctx: Context, name: str, dates: Greedy[int] = "now") -> Optional[Message]:
         """Creating a new data to track the time difference from."""
-        async with self.bot.pool.acquire() as conn:
-            await conn.execute(
-                """INSERT INTO Dates(t, id, name) Values($1, $2, $3)""",
-                datetime.now() if dates == "now" else datetime(*dates),
-                ctx.author.id,
-                name,
-            )
+        created = await self.bot.database.execute(
+            "dates.create", datetime.now() if dates == "now" else datetime(*dates), ctx.author.id, name
+        )
+
+        if not created:
+            embed = DefaultEmbed(ctx, description=f'You already have a date named "{name}".')
+
+            return await ctx.send(embed=embed)
 
         embed = DefaultEmbed(ctx, description=f'Date "{name}" has been put into the database.')
 
@@ -35,22 +38,19 @@ class Dates(Cog):
     @command(name="date")
     async def date_info(self, ctx: Context, name: str) -> None:
         """Getting the name of the date and the difference between now and then."""
-        async with self.bot.pool.acquire() as conn:
-            d = await conn.fetch("SELECT t FROM Dates WHERE name = $1 AND id = $2", name, ctx.author.id)
+        t = await self.bot.database.fetchval("dates.get", ctx.author.id, name)
 
-        if len(d):
-            delta = precisedelta(
-                datetime.now() - d[0]["t"], minimum_unit="days", format="%0.4f", suppress=["months"]
-            )
+        if t is not None:
+            delta = precisedelta(datetime.now() - t, minimum_unit="days", format="%0.4f", suppress=["months"])
 
-            if datetime.now() > d[0]["t"]:
+            if datetime.now() > t:
                 embed = DefaultEmbed(
                     ctx,
-                    description=f'{delta} have passed since {naturaldate(d[0]["t"])}, the start of "{name}".',
+                    description=f'{delta} have passed since {naturaldate(t)}, the start of "{name}".',
                 )
 
             else:
-                embed = DefaultEmbed(ctx, description=f'{naturaldate(d[0]["t"])} is in {delta}.')
+                embed = DefaultEmbed(ctx, description=f"{naturaldate(t)} is in {delta}.")
 
             await ctx.send(embed=embed)
 
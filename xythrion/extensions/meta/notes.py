@@ -1,9 +1,43 @@
-from typing import Optional
+from typing import Any, Callable, List, Optional, Tuple
 
+from discord import Message
 from discord.ext.commands import Cog, Context, group
 
 from xythrion.bot import Xythrion
-from xythrion.utils import check_for_subcommands
+from xythrion.utils import DefaultEmbed, check_for_subcommands, shorten
+
+# Pages are read from where the last one ended, so reading any page costs the same no matter how far in it is.
+PAGE_SIZE = 20
+
+# A page ends early when its items wouldn't fit in an embed, and an item always fits on a page by itself.
+MAX_DESCRIPTION_LENGTH = 2048
+MAX_ITEM_LENGTH = 1500
+MAX_NAME_LENGTH = 100
+
+
+def fit_page(lines: List[Tuple[str, Any]], full: bool, hint: Callable[[Any], str]) -> str:
+    """
+    Joins as many lines as fit in an embed description, each paired with what the next page starts after.
+
+    If any lines were left out, or the page was full, it ends with how to get the next page.
+    """
+    shown = []
+    length = 0
+
+    for line, after in lines:
+        if shown and length + len(line) + 1 + len(hint(after)) > MAX_DESCRIPTION_LENGTH:
+            break
+
+        shown.append(line)
+        length += len(line) + 1
+        last = after
+
+    description = "\n".join(shown)
+
+    if len(shown) < len(lines) or full:
+        description += hint(last)
+
+    return description
 
 
 class Notes(Cog):
@@ -12,32 +46,127 @@ class Notes(Cog):
     def __init__(self, bot: Xythrion) -> None:
         self.bot = bot
 
+    async def cog_check(self, ctx: Context) -> bool:
+        """Checks if the user and/or guild has permissions for this command."""
+        return await self.bot.database.check_if_blocked(ctx) and self.bot.database
+
     @group()
     async def note(self, ctx: Context) -> None:
         """Group command for organizing notes."""
         if ctx.invoked_subcommand is None:
             await check_for_subcommands(ctx)
 
-    @note.command()
-    async def _list(self, ctx: Context) -> None:
-        pass
+    @note.command(name="list")
+    async def _list(self, ctx: Context, after: str = "") -> Optional[Message]:
+        """Lists the names of your notes, starting after the name given."""
+        rows = await self.bot.database.fetch("notes.list", ctx.author.id, after, PAGE_SIZE)
+
+        if not rows:
+            embed = DefaultEmbed(ctx, description="No more notes." if after else "You have no notes.")
+            return await ctx.send(embed=embed)
+
+        description = fit_page(
+            [
+                (f'**{shorten(row["name"], MAX_NAME_LENGTH)}**: {row["items"]} item(s)', row["name"])
+                for row in rows
+            ],
+            len(rows) == PAGE_SIZE,
+            lambda last: f'\n\nFor more, use `note list "{last}"`.',
+        )
+
+        embed = DefaultEmbed(ctx, title="**Your notes.**", description=description)
+
+        await ctx.send(embed=embed)
+
+    @note.command(name="view")
+    async def _view(self, ctx: Context, name: str, after: int = 0) -> Optional[Message]:
+        """Shows the items of a note, starting after the item number given."""
+        rows = await self.bot.database.fetch("notes.view", ctx.author.id, name, after, PAGE_SIZE)
+
+        if not rows:
+            if await self.bot.database.exists("notes.exists", ctx.author.id, name):
+                description = f'No more items in note "{name}".' if after else f'Note "{name}" is empty.'
+
+            else:
+                description = f'Could not find a note named "{name}".'
+
+            return await ctx.send(embed=DefaultEmbed(ctx, description=description))
 
-    @note.command()
-    async def _view(self, ctx: Context, name: str) -> None:
-        pass
+        lines = []
 
-    @note.command()
-    async def _add(self, ctx: Context, name: str, content: Optional[str] = None) -> None:
-        pass
+        for row in rows:
+            # Items added before their length was limited are cut down, so one still fits on a page.
+            content = shorten(row["content"], MAX_ITEM_LENGTH)
+            content = f"~~{content}~~" if row["completed"] else content
+            lines.append((f'`{row["position"]}.` {content}', row["position"]))
 
-    @note.command()
+        description = fit_page(
+            lines, len(rows) == PAGE_SIZE, lambda last: f'\n\nFor more, use `note view "{name}" {last}`.'
+        )
+
+        embed = DefaultEmbed(ctx, title=f'**Note "{name}".**', description=description)
+
+        await ctx.send(embed=embed)
+
+    @note.command(name="add")
+    async def _add(self, ctx: Context, name: str, *, content: Optional[str] = None) -> Optional[Message]:
+        """Creates a new note, optionally with its first item."""
+        if len(name) > MAX_NAME_LENGTH:
+            embed = DefaultEmbed(ctx, description=f"Names can be at most {MAX_NAME_LENGTH} characters long.")
+            return await ctx.send(embed=embed)
+
+        if content and len(content) > MAX_ITEM_LENGTH:
+            embed = DefaultEmbed(ctx, description=f"Items can be at most {MAX_ITEM_LENGTH} characters long.")
+            return await ctx.send(embed=embed)
+
+        if await self.bot.database.fetchval("notes.create", ctx.author.id, name) is None:
+            embed = DefaultEmbed(ctx, description=f'You already have a note named "{name}".')
+            return await ctx.send(embed=embed)
+
+        if content:
+            await self.bot.database.fetchval("notes.append", ctx.author.id, name, content)
+
+        embed = DefaultEmbed(ctx, description=f'Note "{name}" has been created.')
+
+        await ctx.send(embed=embed)
+
+    @note.command(name="remove")
     async def _remove(self, ctx: Context, name: str) -> None:
-        pass
+        """Removes a note along with all of its items."""
+        removed = await self.bot.database.execute("notes.delete", ctx.author.id, name)
+
+        description = (
+            f'Note "{name}" has been removed.' if removed else f'Could not find a note named "{name}".'
+        )
+
+        await ctx.send(embed=DefaultEmbed(ctx, description=description))
+
+    @note.command(name="append")
+    async def _append(self, ctx: Context, name: str, *, content: str) -> Optional[Message]:
+        """Adds an item to the end of a note."""
+        if len(content) > MAX_ITEM_LENGTH:
+            description = f"Items can be at most {MAX_ITEM_LENGTH} characters long."
+            return await ctx.send(embed=DefaultEmbed(ctx, description=description))
+
+        position = await self.bot.database.fetchval("notes.append", ctx.author.id, name, content)
+
+        if position is None:
+            description = f'Could not find a note named "{name}".'
+
+        else:
+            description = f'Added item {position} to note "{name}".'
+
+        await ctx.send(embed=DefaultEmbed(ctx, description=description))
+
+    @note.command(name="complete")
+    async def _complete(self, ctx: Context, name: str, part: int) -> None:
+        """Marks an item of a note as completed, by its number."""
+        completed = await self.bot.database.execute("notes.complete", ctx.author.id, name, part)
+
+        if completed:
+            description = f'Completed item {part} of note "{name}".'
 
-    @note.command()
-    async def _append(self, ctx: Context, name: str, content: str) -> None:
-        pass
+        else:
+            description = f'Could not find item {part} in a note named "{name}".'
 
-    @note.command()
-    async def _complete(self, ctx: Context, name: str, part: str) -> None:
-        pass
+        await ctx.send(embed=DefaultEmbed(ctx, description=description))
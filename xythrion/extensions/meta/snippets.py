@@ -1,10 +1,19 @@
-from typing import Optional
+import logging
+from functools import partial
+from typing import List, Optional, Tuple
 
-from discord import Member
+from asyncpg import Record
+from discord import Member, Message
 from discord.ext.commands import Cog, Context, group
 
 from xythrion.bot import Xythrion
-from xythrion.utils import check_for_subcommands
+from xythrion.utils import DefaultEmbed, check_for_subcommands, shorten
+from xythrion.utils.searching import TrigramIndex
+
+log = logging.getLogger(__name__)
+
+PAGE_SIZE = 20
+MAX_RESULTS = 10
 
 
 class Snippets(Cog):
@@ -13,20 +22,146 @@ class Snippets(Cog):
     def __init__(self, bot: Xythrion) -> None:
         self.bot = bot
 
+        # Every snippet's name and start of its content, so searching never scores every row.
+        self.index = TrigramIndex()
+
+        # Snippets added or removed while the index is being built are applied to it once it's done.
+        self.pending: Optional[List[Tuple[int, Optional[str]]]] = []
+
+        self.bot.loop.create_task(self.load_index())
+
+    async def cog_check(self, ctx: Context) -> bool:
+        """Checks if the user and/or guild has permissions for this command."""
+        return await self.bot.database.check_if_blocked(ctx) and self.bot.database
+
+    async def load_index(self) -> None:
+        """Indexes every snippet in an executor, then swaps the new index in."""
+
+        def build(rows: List[Record]) -> TrigramIndex:
+            index = TrigramIndex()
+
+            for row in rows:
+                index.add(row["id"], f'{row["name"]} {row["content"]}')
+
+            return index
+
+        # The database connects while the bot logs in, so it might not be there yet.
+        await self.bot.database.ready.wait()
+
+        try:
+            if self.bot.database:
+                rows = await self.bot.database.fetch("snippets.all")
+                self.index = await self.bot.loop.run_in_executor(None, build, rows)
+
+        finally:
+            pending, self.pending = self.pending, None
+
+            for _id, text in pending:
+                self._update_index(_id, text)
+
+        log.info(f"Indexed {len(self.index)} snippet(s).")
+
+    def _update_index(self, _id: int, text: Optional[str]) -> None:
+        """Indexes a snippet, or removes it from the index when there's no text."""
+        if self.pending is not None:
+            self.pending.append((_id, text))
+
+        elif text is None:
+            self.index.remove(_id)
+
+        else:
+            self.index.add(_id, text)
+
     @group()
     async def snippet(self, ctx: Context) -> None:
         """Group command for code snippets."""
         if ctx.invoked_subcommand is None:
             await check_for_subcommands(ctx)
 
-    @snippet.command()
-    async def _list(self, ctx: Context, user: Optional[Member]) -> None:
-        pass
+    @snippet.command(name="list")
+    async def _list(self, ctx: Context, user: Optional[Member] = None, after: str = "") -> Optional[Message]:
+        """Lists the names of the snippets of a user, starting after the name given."""
+        user = user or ctx.author
+
+        rows = await self.bot.database.fetch("snippets.list", user.id, after, PAGE_SIZE)
+
+        if not rows:
+            description = "No more snippets." if after else f"{user.display_name} has no snippets."
+            return await ctx.send(embed=DefaultEmbed(ctx, description=description))
+
+        lines = "\n".join(f'**{row["name"]}**' for row in rows)
 
-    @snippet.command()
-    async def _add(self, ctx: Context, name: str, content: str) -> None:
-        pass
+        if len(rows) == PAGE_SIZE:
+            lines += f'\n\nFor more, use `snippet list {user.id} {rows[-1]["name"]}`.'
 
-    @snippet.command()
+        embed = DefaultEmbed(ctx, title=f"**Snippets of {user.display_name}.**", description=lines)
+
+        await ctx.send(embed=embed)
+
+    @snippet.command(name="view")
+    async def _view(self, ctx: Context, name: str, user: Optional[Member] = None) -> None:
+        """Shows a snippet of a user."""
+        user = user or ctx.author
+
+        content = await self.bot.database.fetchval("snippets.get", user.id, name)
+
+        if content is None:
+            embed = DefaultEmbed(ctx, description=f'{user.display_name} has no snippet named "{name}".')
+
+        else:
+            embed = DefaultEmbed(ctx, title=f'**Snippet "{name}".**', description=content)
+
+        await ctx.send(embed=embed)
+
+    @snippet.command(name="add")
+    async def _add(self, ctx: Context, name: str, *, content: str) -> None:
+        """Stores a snippet under a name."""
+        _id = await self.bot.database.fetchval("snippets.create", ctx.author.id, name, content)
+
+        if _id is None:
+            description = f'You already have a snippet named "{name}".'
+
+        else:
+            self._update_index(_id, f"{name} {content}")
+            description = f'Snippet "{name}" has been stored.'
+
+        await ctx.send(embed=DefaultEmbed(ctx, description=description))
+
+    @snippet.command(name="remove")
     async def _remove(self, ctx: Context, name: str) -> None:
-        pass
+        """Removes one of your snippets."""
+        _id = await self.bot.database.fetchval("snippets.delete", ctx.author.id, name)
+
+        if _id is None:
+            description = f'Could not find a snippet named "{name}".'
+
+        else:
+            self._update_index(_id, None)
+            description = f'Snippet "{name}" has been removed.'
+
+        await ctx.send(embed=DefaultEmbed(ctx, description=description))
+
+    @snippet.command(name="search")
+    async def _search(self, ctx: Context, *, query: str) -> Optional[Message]:
+        """Searches the names and contents of every snippet, allowing for typos."""
+        # A search over a large index can take tens of milliseconds, which is too long to block the loop.
+        matches = await self.bot.loop.run_in_executor(
+            None, partial(self.index.search, query, limit=MAX_RESULTS)
+        )
+
+        if not matches:
+            return await ctx.send(embed=DefaultEmbed(ctx, description=f'No snippets match "{query}".'))
+
+        rows = await self.bot.database.fetch("snippets.by_ids", [_id for _id, _ in matches])
+        rows = {row["id"]: row for row in rows}
+
+        lines = "\n".join(
+            f'`{score}%` **{rows[_id]["name"]}** by <@{rows[_id]["user_id"]}>: '
+            f'{shorten(" ".join(rows[_id]["content"].split()), 50)}'
+            for _id, score in matches
+            if _id in rows
+        )
+
+        embed = DefaultEmbed(ctx, title=f'**Snippets matching "{query}".**', description=lines)
+
+        await ctx.send(embed=embed)
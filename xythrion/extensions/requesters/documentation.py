@@ -1,6 +1,19 @@
-from discord.ext.commands import Cog, Context, command
+import logging
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from discord import Message
+from discord.ext.commands import Cog, Context, command, is_owner
 
 from xythrion.bot import Xythrion
+from xythrion.constants import Inventories
+from xythrion.utils import DefaultEmbed
+from xythrion.utils.inventories import Inventory, InventoryEntry, InventoryError
+
+log = logging.getLogger(__name__)
+
+MAX_RESULTS = 5
 
 
 class Documentation(Cog):
@@ -9,7 +22,88 @@ class Documentation(Cog):
     def __init__(self, bot: Xythrion) -> None:
         self.bot = bot
 
+        # Every lookup is answered from these, without going to the web.
+        self.inventories: Dict[str, Inventory] = {}
+
+        self.bot.loop.create_task(self.load_inventories())
+
+    def cog_unload(self) -> None:
+        """Unmaps every inventory."""
+        for inventory in self.inventories.values():
+            inventory.close()
+
+    async def _load(self, name: str, path: Path) -> Inventory:
+        """Reads an inventory in an executor, since decompressing and sorting it blocks."""
+        return await self.bot.loop.run_in_executor(None, Inventory.load, name, path, Inventories.URLS[name])
+
+    async def load_inventories(self) -> None:
+        """Loads every inventory there's a file for, skipping the rest."""
+        for name in Inventories.URLS:
+            path = Path(Inventories.DIRECTORY, f"{name}.inv")
+
+            if not path.exists():
+                log.warning(f"No inventory for {name} at {path}, its documentation won't be searchable.")
+                continue
+
+            try:
+                self.inventories[name] = await self._load(name, path)
+
+            except (InventoryError, OSError, zlib.error) as e:
+                log.error(f"Could not load the inventory of {name}: {e}")
+
+        log.info(f"Loaded {sum(map(len, self.inventories.values()))} documented object(s).")
+
+    def lookup(self, query: str) -> List[InventoryEntry]:
+        """Exact matches of a query, otherwise names starting with it, otherwise names close to it."""
+        for search in (Inventory.exact, Inventory.prefix):
+            entries = [entry for inventory in self.inventories.values() for entry in search(inventory, query)]
+
+            if entries:
+                return entries[:MAX_RESULTS]
+
+        matches = [match for inventory in self.inventories.values() for match in inventory.fuzzy(query)]
+        matches.sort(key=lambda match: -match[1])
+
+        return [entry for entry, _ in matches[:MAX_RESULTS]]
+
     @command(aliases=("docs", "documentation"))
-    async def fetch_documentation(self, ctx: Context, query: str) -> None:
+    async def fetch_documentation(self, ctx: Context, query: str) -> Optional[Message]:
         """Gets documentation of specific items for Python."""
-        pass
+        entries = self.lookup(query)
+
+        if not entries:
+            return await ctx.send(
+                embed=DefaultEmbed(ctx, description=f'No documentation found for "{query}".')
+            )
+
+        lines = "\n".join(f"[`{entry.display}`]({entry.url}) ({entry.role})" for entry in entries)
+
+        embed = DefaultEmbed(ctx, title=f'**Documentation for "{query}".**', description=lines)
+
+        await ctx.send(embed=embed)
+
+    @command(name="swap_inventory", hidden=True)
+    @is_owner()
+    async def swap_inventory(self, ctx: Context, name: str, path: Optional[str] = None) -> Optional[Message]:
+        """Replaces an inventory with a new file without restarting, defaulting to its usual file."""
+        if name not in Inventories.URLS:
+            embed = DefaultEmbed(
+                ctx, description=f"Unknown inventory, options are: {', '.join(Inventories.URLS)}."
+            )
+            return await ctx.send(embed=embed)
+
+        try:
+            inventory = await self._load(name, Path(path or Path(Inventories.DIRECTORY, f"{name}.inv")))
+
+        except (InventoryError, OSError, zlib.error) as e:
+            return await ctx.send(embed=DefaultEmbed(ctx, description=f"Could not load the inventory: {e}"))
+
+        # Lookups never wait on anything, so nothing can still be reading the old inventory once it's swapped.
+        old, self.inventories[name] = self.inventories.get(name), inventory
+
+        if old is not None:
+            old.close()
+
+        embed = DefaultEmbed(ctx, description=f"Swapped in {len(inventory)} object(s) for {name}.")
+
+        await ctx.send(embed=embed)
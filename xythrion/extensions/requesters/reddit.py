@@ -1,9 +1,47 @@
-from discord import Message
+import asyncio
+import logging
+import re
+from functools import partial
+from typing import Any, Dict, List, Optional, Set
+
+from discord import Message, TextChannel
 from discord.ext.commands import Cog
 
 from xythrion.bot import Xythrion
+from xythrion.caching import SingleFlight, TTLCache
+from xythrion.constants import Caching
+from xythrion.http_client import HTTPError
 from xythrion.utils import DefaultEmbed, markdown_link
 
+log = logging.getLogger(__name__)
+
+# Full links to posts (on any of Reddit's subdomains) and short redd.it links, capturing the ID of the post.
+POST_PATTERN = re.compile(
+    r"https?://(?:[a-z]+\.)?reddit\.com/r/\w+/comments/(?P<id>[a-z0-9]+)"
+    r"|https?://redd\.it/(?P<short_id>[a-z0-9]+)",
+    re.IGNORECASE,
+)
+POST_URL = "https://www.reddit.com/by_id/t3_{0}.json"
+
+MAX_POSTS_PER_MESSAGE = 3
+
+# Votes keep changing, so posts are only cached for a few minutes.
+POST_TTL = 5 * 60
+
+# A post already unfurled in a channel isn't unfurled there again for this long.
+DEDUP_WINDOW = 60
+
+MAX_CONCURRENT_FETCHES = 4
+
+
+def find_post_ids(content: str) -> List[str]:
+    """Every unique post ID linked to in a message, in the order they appear."""
+    ids = dict.fromkeys(
+        (match.group("id") or match.group("short_id")).lower() for match in POST_PATTERN.finditer(content)
+    )
+
+    return list(ids)[:MAX_POSTS_PER_MESSAGE]
+
 
 class Reddit(Cog):
     """Gives information about posts from Reddit."""
@@ -11,27 +49,81 @@ class Reddit(Cog):
     def __init__(self, bot: Xythrion) -> None:
         self.bot = bot
 
+        self.posts = TTLCache("reddit posts", Caching.REDDIT_CACHE_SIZE)
+        self.unfurled = TTLCache("reddit unfurls", Caching.REDDIT_CACHE_SIZE)
+
+        self.requests = SingleFlight()
+        self.semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+
+        self._tasks: Set[asyncio.Task] = set()
+
+    def cog_unload(self) -> None:
+        """Cancels unfurls still waiting on Reddit."""
+        for task in self._tasks:
+            task.cancel()
+
+    async def _fetch(self, post_id: str) -> Optional[Dict[str, Any]]:
+        """Gets the data of a post from Reddit, with only a few requests running at a time."""
+        async with self.semaphore:
+            data = await self.bot.http_client.get_json(POST_URL.format(post_id))
+
+        children = data["data"]["children"]
+        post = children[0]["data"] if children else None
+
+        self.posts.set(post_id, post, POST_TTL)
+
+        return post
+
+    async def _unfurl_later(self, channel: TextChannel, post_id: str) -> None:
+        """Fetches a post that wasn't cached, then unfurls it."""
+        try:
+            post = await self.requests.do(post_id, partial(self._fetch, post_id))
+
+        except (HTTPError, KeyError, IndexError, TypeError) as e:
+            log.warning(f"Could not get Reddit post {post_id}: {e}")
+            return
+
+        await self._send(channel, post)
+
+    async def _send(self, channel: TextChannel, post: Optional[Dict[str, Any]]) -> None:
+        """Sends an embed with information on a post."""
+        if post is None or (post["over_18"] and not channel.is_nsfw()):
+            return
+
+        d = {
+            "Title": post["title"],
+            "Subreddit": markdown_link(post["subreddit"], f'https://www.reddit.com/r/{post["subreddit"]}'),
+            "Upvotes": post["ups"],
+            "Upvotes/downvotes": f'{post["upvote_ratio"] * 100}%',
+            "Image url": markdown_link("Link", post["url"]),
+        }
+        formatted = "\n".join(f"**{k}**: {v}" for k, v in d.items())
+        embed = DefaultEmbed(self.bot, description=formatted)
+
+        await channel.send(embed=embed)
+
     @Cog.listener()
     async def on_message(self, message: Message) -> None:
         """Scans for Reddit posts and provides information on them."""
-        if "https://www.reddit.com/r/" in message.content:
-            url = f'{message.content.rsplit("/", maxsplit=1)[0]}.json'
-            async with self.bot.http_session.get(url) as resp:
-                assert resp.status == 200
-                d = await resp.json()
-                d = d[0]["data"]["children"][0]["data"]
-
-            if d["over_18"] and not message.channel.is_nsfw():
-                return
-
-            d = {
-                "Title": d["title"],
-                "Subreddit": markdown_link(d["subreddit"], f'https://www.reddit.com/r/{d["subreddit"]}'),
-                "Upvotes": d["ups"],
-                "Upvotes/downvotes": f'{d["upvote_ratio"] * 100}%',
-                "Image url": markdown_link("Link", d["url"]),
-            }
-            formatted = "\n".join(f"**{k}**: {v}" for k, v in d.items())
-            embed = DefaultEmbed(self.bot, description=formatted)
-
-            await message.channel.send(embed=embed)
+        if message.author.bot:
+            return
+
+        for post_id in find_post_ids(message.content):
+            key = (message.channel.id, post_id)
+
+            if self.unfurled.get(key):
+                continue
+
+            self.unfurled.set(key, True, DEDUP_WINDOW)
+
+            # Cached posts are sent right away, anything else is fetched without holding up the handler.
+            post = self.posts.get(post_id, False)
+
+            if post is not False:
+                await self._send(message.channel, post)
+                continue
+
+            task = self.bot.loop.create_task(self._unfurl_later(message.channel, post_id))
+
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
@@ -16,8 +16,7 @@ class Tinyy(Cog):
     @command(aliases=("shorten_url", "shortener", "tinyy"))
     async def url_shortener(self, ctx: Context, url: str) -> None:
         """Shortening a URL provided by the user."""
-        async with self.bot.http_session.post(URL, json={"url": url}, headers=HEADERS) as resp:
-            data = await resp.json()
+        data = (await self.bot.http_client.post(URL, json={"url": url}, headers=HEADERS)).json()
 
         embed = DefaultEmbed(ctx, desc=f'```{URL}/{data["code"]}```')
 
@@ -1,20 +1,64 @@
-import functools
-import os
-from datetime import datetime
-from typing import Any, List, Tuple
+import time
+from datetime import datetime, timezone
+from functools import partial, reduce
+from operator import getitem
+from typing import Any, Callable, Hashable, List, Sequence, TYPE_CHECKING, Tuple
 
-import matplotlib.pyplot as plt
-import numpy as np
 from discord.ext.commands import Cog, Context, group
 from tabulate import tabulate
 
 from xythrion.bot import Xythrion
-from xythrion.constants import WeatherAPIs
-from xythrion.utils import Graph, c2f, check_for_subcommands, http_get, k2c, k2f
+from xythrion.caching import SingleFlight, TTLCache, cache_control_ttl
+from xythrion.constants import Caching, WeatherAPIs
+from xythrion.rendering import GraphSpec, Subplot
+from xythrion.utils import Graph, check_for_subcommands
+
+if TYPE_CHECKING:
+    import numpy as np
 
 EARTH_URL = "https://api.openweathermap.org/data/2.5/forecast?zip={0},{1}&appid={2}"
 MARS_URL = f"https://api.nasa.gov/insight_weather/?api_key={WeatherAPIs.MARS}&feedtype=json&ver=1.0"
 
+# OpenWeatherMap forecasts are made every 3 hours, and the InSight feed gets a new sol about once a day.
+FORECAST_INTERVAL = 3 * 60 * 60
+SOL_SECONDS = 88775
+
+# Responses are never kept for less than this, even when the next update is overdue.
+MIN_TTL = 10 * 60
+
+
+def column(entries: Sequence[Any], *keys: str) -> "np.ndarray":
+    """Reads one value out of every entry of an API response straight into an array."""
+    import numpy as np
+
+    return np.fromiter(
+        (reduce(getitem, keys, entry) for entry in entries), dtype=np.float64, count=len(entries)
+    )
+
+
+def forecast_ttl(data: Any) -> float:
+    """Seconds until the first forecast of OpenWeatherMap is in the past, and a new one replaces it."""
+    try:
+        ttl = data["list"][0]["dt"] - time.time()
+
+    except (KeyError, IndexError, TypeError):
+        return MIN_TTL
+
+    return min(max(ttl, MIN_TTL), FORECAST_INTERVAL)
+
+
+def sol_ttl(data: Any) -> float:
+    """Seconds until the sol after the newest one in the InSight feed is over, and it can show up."""
+    try:
+        last = datetime.strptime(data[data["sol_keys"][-1]]["Last_UTC"], "%Y-%m-%dT%H:%M:%SZ")
+
+    except (KeyError, IndexError, TypeError, ValueError):
+        return MIN_TTL
+
+    ttl = last.replace(tzinfo=timezone.utc).timestamp() + SOL_SECONDS - time.time()
+
+    return min(max(ttl, MIN_TTL), SOL_SECONDS)
+
 
 class Weather(Cog):
     """Weather for different planets."""
@@ -22,6 +66,30 @@ class Weather(Cog):
     def __init__(self, bot: Xythrion) -> None:
         self.bot = bot
 
+        # Everyone asking for the same place shares one response, and one request while it's being fetched.
+        self.cache = TTLCache("weather", Caching.WEATHER_CACHE_SIZE)
+        self.requests = SingleFlight()
+
+    async def _get(self, key: Hashable, url: str, ttl: Callable[[Any], float]) -> Any:
+        """Gets JSON from a weather API, unless it's cached or already being requested."""
+        data = self.cache.get(key)
+
+        if data is not None:
+            return data
+
+        return await self.requests.do(key, partial(self._fetch, key, url, ttl))
+
+    async def _fetch(self, key: Hashable, url: str, ttl: Callable[[Any], float]) -> Any:
+        """Requests JSON from a weather API, caching it for as long as upstream says or it stays current."""
+        resp = await self.bot.http_client.get(url)
+
+        data = resp.json()
+        max_age = cache_control_ttl(resp.headers)
+
+        self.cache.set(key, data, ttl(data) if max_age is None else max_age)
+
+        return data
+
     @group()
     async def weather(self, ctx: Context) -> None:
         """Getting Weather for different planets."""
@@ -31,85 +99,88 @@ class Weather(Cog):
     @weather.command()
     async def earth(self, ctx: Context, zip_code: int, country_code: str = "US") -> None:
         """Getting weather for the planet of Earth."""
-        _json = await http_get(ctx, EARTH_URL.format(zip_code, country_code.upper(), WeatherAPIs.EARTH))
-
-        lst, dates = [], []
-        for i in _json["list"]:
-            lst.append(
-                [
-                    k2f(i["main"]["temp"]),
-                    k2c(i["main"]["temp"]),
-                    i["main"]["humidity"],
-                    i["wind"]["speed"],
-                ]
-            )
-            dates.append(datetime.fromtimestamp(i["dt"]).strftime("%a: %H%p").lower().title())
+        from xythrion.utils.unit_conversion import k2c, k2f
+
+        country_code = country_code.upper()
+
+        _json = await self._get(
+            ("earth", zip_code, country_code),
+            EARTH_URL.format(zip_code, country_code, WeatherAPIs.EARTH),
+            forecast_ttl,
+        )
+
+        forecasts = _json["list"]
+        kelvin = column(forecasts, "main", "temp")
+
+        columns = (
+            k2f(kelvin),
+            k2c(kelvin),
+            column(forecasts, "main", "humidity"),
+            column(forecasts, "wind", "speed"),
+        )
+        dates = [datetime.fromtimestamp(i["dt"]).strftime("%a: %H%p").lower().title() for i in forecasts]
 
         titles = ["°F", "°C", "Humidity (%)", "Wind (m/s)"]
 
-        func = functools.partial(self._create_weather_graph_and_table, ctx, lst, titles, dates, "Time")
-        _graph, _table = await self.bot.loop.run_in_executor(None, func)
+        spec, _table = self._create_weather_spec_and_table(columns, titles, dates, "Time")
+        _graph = Graph(ctx, await self.bot.renderer.render(spec))
 
         _graph.embed.title = "**Weather on Earth.**"
 
         await ctx.send(file=_graph.embed.file, embed=_graph.embed, content=_table)
 
-        os.remove(_graph.save_path)
-
     @weather.command()
     async def mars(self, ctx: Context) -> None:
         """Getting weather for the planet of Mars."""
-        _json = await http_get(ctx, MARS_URL)
-        sols = _json["sol_keys"]
-        lst = []
-        titles = ["°F", "°C", "Pressure (Pa)", "Wind (m/s)"]
+        from xythrion.utils.unit_conversion import c2f
 
-        for sol in sols:
-            try:
-                i = _json[sol]
-                c = i["AT"]["av"]
-                lst.append([c2f(c), c, i["PRE"]["av"], i["HWS"]["av"]])
+        _json = await self._get(("mars",), MARS_URL, sol_ttl)
+        titles = ["°F", "°C", "Pressure (Pa)", "Wind (m/s)"]
 
-            except KeyError:
+        # Only the sols up to the first one missing any of the measurements are shown.
+        sols = []
+        for sol in _json["sol_keys"]:
+            if not all(key in _json.get(sol, ()) for key in ("AT", "PRE", "HWS")):
                 break
 
-        func = functools.partial(self._create_weather_graph_and_table, ctx, lst, titles, sols, "Sol")
-        _graph, _table = await self.bot.loop.run_in_executor(None, func)
+            sols.append(sol)
+
+        entries = [_json[sol] for sol in sols]
+        celsius = column(entries, "AT", "av")
+
+        columns = (c2f(celsius), celsius, column(entries, "PRE", "av"), column(entries, "HWS", "av"))
+
+        spec, _table = self._create_weather_spec_and_table(columns, titles, sols, "Sol")
+        _graph = Graph(ctx, await self.bot.renderer.render(spec))
 
         _graph.embed.title = f"**Weather on Mars sols {sols[0]}-{sols[-1]}.**"
 
         await ctx.send(file=_graph.embed.file, embed=_graph.embed, content=_table)
 
-        os.remove(_graph.save_path)
-
-    def _create_weather_graph_and_table(
+    def _create_weather_spec_and_table(
         self,
-        ctx: Context,
-        data_lst: List[List[float]],
+        columns: Sequence["np.ndarray"],
         titles: List[str],
         days: List[str],
         day_title: str,
-    ) -> Tuple[Graph, str]:
+    ) -> Tuple[GraphSpec, str]:
         """Manipulating JSON data from weather APIs."""
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(nrows=2, ncols=2)
-        axes = [ax1, ax2, ax3, ax4]
-
-        lst = np.array(data_lst)
-
-        lst = [lst[:, i] for i in range(lst.shape[1])]
-
-        for i, (ax, title) in enumerate(zip(axes, titles)):
-            ax.plot(lst[i])
-            ax.set_title(title)
-            ax.set_xticklabels(days, rotation=30)
+        subplots = tuple(
+            Subplot(values, title=title, x_labels=tuple(days), label_rotation=30)
+            for values, title in zip(columns, titles)
+        )
 
-        return Graph(ctx, fig=fig, ax=axes), self._create_table(days, day_title, titles, data_lst)
+        return GraphSpec(subplots, nrows=2, ncols=2), self._create_table(days, day_title, titles, columns)
 
     @staticmethod
-    def _create_table(days: List[str], day_title: str, titles: List[str], lst: List[Any]) -> str:
+    def _create_table(
+        days: List[str], day_title: str, titles: List[str], columns: Sequence["np.ndarray"]
+    ) -> str:
         """Creates a table from the tabulate module."""
+        import numpy as np
+
         table = tabulate(
-            [[days[i]] + x for i, x in enumerate(lst)],
+            [[day, *row] for day, row in zip(days, np.column_stack(columns).tolist())],
             [day_title, *titles],
             tablefmt="simple",
             showindex=False,
@@ -0,0 +1,273 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, Mapping, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .constants import HTTP
+from .metrics import Histogram
+
+log = logging.getLogger(__name__)
+
+# Requests that can be sent twice without doing anything twice, which are the only ones retried on errors.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# 429 means upstream is alive and pushing back, so it's retried without counting against its circuit.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class HTTPError(Exception):
+    """Custom exception when a request fails, after retrying if it could be retried."""
+
+    def __init__(self, message: str, status: Optional[int] = None, *args) -> None:
+        super().__init__(message, *args)
+
+        self.status = status
+
+
+class CircuitOpenError(HTTPError):
+    """Custom exception when a host has failed too often recently, so requests to it aren't even sent."""
+
+
+class Response(NamedTuple):
+    """A response that has been read completely, so its connection is already back in the pool."""
+
+    status: int
+    headers: Mapping[str, str]
+    body: bytes
+
+    def json(self) -> Any:
+        """Decodes the body as JSON."""
+        return json.loads(self.body)
+
+    def text(self) -> str:
+        """Decodes the body as text."""
+        return self.body.decode(errors="replace")
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a host after repeated failures, until it has had time to recover.
+
+    Once the reset timeout has passed, one request is let through to test the host. Its success closes the
+    circuit again, otherwise it stays open for another timeout.
+    """
+
+    def __init__(
+        self, threshold: int = HTTP.BREAKER_THRESHOLD, reset_timeout: float = HTTP.BREAKER_RESET
+    ) -> None:
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        """Either closed, open, or half-open when a request may test the host."""
+        if self.opened_at is None:
+            return "closed"
+
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self) -> bool:
+        """If a request can be sent right now."""
+        state = self.state
+
+        if state == "half-open":
+            # Only this request tests the host, the rest wait another timeout unless it succeeds.
+            self.opened_at = time.monotonic()
+            return True
+
+        return state == "closed"
+
+    def record_success(self) -> None:
+        """Closes the circuit."""
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        """Counts a failure, opening the circuit when there have been too many in a row."""
+        self.failures += 1
+
+        if self.opened_at is not None or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a request through again."""
+        if self.opened_at is None:
+            return 0.0
+
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+
+def retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds to wait according to a Retry-After header, which is either seconds or an HTTP date."""
+    value = headers.get("Retry-After")
+
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+
+    except (TypeError, ValueError):
+        return None
+
+
+class HTTPClient:
+    """
+    The one session every outbound request goes through.
+
+    Connections are pooled with a limit per host, every request has connect and read timeouts, requests that
+    fail in a way worth retrying are retried with jittered backoff, and hosts that keep failing are cut off
+    by a circuit breaker so they fail fast.
+    """
+
+    def __init__(self) -> None:
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=HTTP.MAX_CONNECTIONS, limit_per_host=HTTP.MAX_CONNECTIONS_PER_HOST, ttl_dns_cache=300
+            ),
+            timeout=aiohttp.ClientTimeout(
+                total=None, connect=HTTP.CONNECT_TIMEOUT, sock_read=HTTP.READ_TIMEOUT
+            ),
+        )
+
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+        # Every attempt is timed, including ones that failed, until the whole response has been read.
+        self.latency = Histogram(
+            "xythrion_http_request_duration_seconds",
+            "How long requests took, by the host they went to.",
+            ("host",),
+        )
+
+    async def close(self) -> None:
+        """Closes the session along with every pooled connection."""
+        await self.session.close()
+
+    def _breaker(self, url: str) -> CircuitBreaker:
+        """The circuit breaker of the host of a URL, making one for it if it's the first request there."""
+        host = urlsplit(url).netloc
+
+        if host not in self.breakers:
+            self.breakers[host] = CircuitBreaker()
+
+        return self.breakers[host]
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        """Exponential backoff with full jitter, so clients that failed together don't retry together."""
+        return random.uniform(0, min(HTTP.MAX_BACKOFF, HTTP.BACKOFF_BASE * 2 ** attempt))
+
+    def _check(self, url: str, breaker: CircuitBreaker) -> None:
+        """Raises if the circuit of a host is open."""
+        if not breaker.allow():
+            raise CircuitOpenError(
+                f"{urlsplit(url).netloc} is failing, not trying again for {breaker.retry_after():.0f}s"
+            )
+
+    async def request(self, method: str, url: str, retries: int = HTTP.RETRIES, **kwargs) -> Response:
+        """Sends a request, reading all of the response and raising HTTPError if it isn't successful."""
+        method = method.upper()
+        breaker = self._breaker(url)
+
+        for attempt in range(retries + 1):
+            self._check(url, breaker)
+
+            delay: Optional[float] = None
+            start = time.perf_counter()
+
+            try:
+                async with self.session.request(method, url, **kwargs) as resp:
+                    body = await resp.read()
+                    response = Response(resp.status, resp.headers, body)
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.latency.observe(time.perf_counter() - start, urlsplit(url).netloc)
+                breaker.record_failure()
+
+                if method not in IDEMPOTENT_METHODS or attempt == retries:
+                    raise HTTPError(f"Request to {urlsplit(url).netloc} failed: {type(e).__name__}")
+
+            else:
+                self.latency.observe(time.perf_counter() - start, urlsplit(url).netloc)
+
+                if response.status < 500:
+                    breaker.record_success()
+
+                else:
+                    breaker.record_failure()
+
+                if response.status < 400:
+                    return response
+
+                # Anything but a 429 may have been partially handled, so only idempotent requests are resent.
+                retryable = response.status in RETRY_STATUSES and (
+                    response.status == 429 or method in IDEMPOTENT_METHODS
+                )
+
+                delay = retry_after(response.headers)
+                too_long = delay is not None and delay > HTTP.MAX_RETRY_AFTER
+
+                if not retryable or too_long or attempt == retries:
+                    raise HTTPError(
+                        f"{urlsplit(url).netloc} responded with {response.status}", response.status
+                    )
+
+            await asyncio.sleep(self._backoff(attempt) if delay is None else delay)
+
+            log.debug(f"Retrying {method} {url} (attempt {attempt + 2} of {retries + 1}).")
+
+    async def get(self, url: str, **kwargs) -> Response:
+        """Sends a GET request."""
+        return await self.request("GET", url, **kwargs)
+
+    async def get_json(self, url: str, **kwargs) -> Any:
+        """Sends a GET request, decoding the response as JSON."""
+        return (await self.get(url, **kwargs)).json()
+
+    async def post(self, url: str, **kwargs) -> Response:
+        """Sends a POST request."""
+        return await self.request("POST", url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, url: str, **kwargs) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Sends a GET request and gives back the response before reading its body, for large downloads.
+
+        It's never retried, since part of the body may have already been used.
+        """
+        breaker = self._breaker(url)
+        self._check(url, breaker)
+
+        try:
+            async with self.session.get(url, **kwargs) as resp:
+                if resp.status >= 500:
+                    breaker.record_failure()
+
+                else:
+                    breaker.record_success()
+
+                if resp.status >= 400:
+                    raise HTTPError(f"{urlsplit(url).netloc} responded with {resp.status}", resp.status)
+
+                yield resp
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            breaker.record_failure()
+
+            raise HTTPError(f"Request to {urlsplit(url).netloc} failed: {type(e).__name__}")
@@ -0,0 +1,180 @@
+import asyncio
+import bisect
+import logging
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from aiohttp import web
+
+from .constants import Metrics
+
+log = logging.getLogger(__name__)
+
+# Upper bounds of the latency buckets of commands and requests, in seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf"))
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    """Escapes a label value for the text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def sample(name: str, value: float, labels: Optional[Dict[str, str]] = None) -> str:
+    """One line of the text format, like `name{label="value"} 1.0`."""
+    if labels:
+        pairs = ",".join(f'{label}="{_escape(str(v))}"' for label, v in labels.items())
+        name = f"{name}{{{pairs}}}"
+
+    return f"{name} {value}"
+
+
+def header(name: str, documentation: str, kind: str) -> Iterator[str]:
+    """The help and type lines coming before the samples of a metric."""
+    yield f"# HELP {name} {documentation}"
+    yield f"# TYPE {name} {kind}"
+
+
+def histogram_samples(
+    name: str, labels: Dict[str, str], bounds: Sequence[float], counts: Sequence[int], total: float
+) -> Iterator[str]:
+    """The samples of one histogram, from how many observations fell in each bucket and their sum."""
+    cumulative = 0
+
+    for bound, count in zip(bounds, counts):
+        cumulative += count
+        yield sample(
+            f"{name}_bucket", cumulative, {**labels, "le": "+Inf" if bound == float("inf") else f"{bound:g}"}
+        )
+
+    yield sample(f"{name}_sum", total, labels)
+    yield sample(f"{name}_count", cumulative, labels)
+
+
+class Counter:
+    """A value that only goes up, for every combination of labels."""
+
+    def __init__(self, name: str, documentation: str, labels: Labels = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Adds to the value of some labels."""
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def expose(self) -> Iterator[str]:
+        """The counter in the text format."""
+        yield from header(self.name, self.documentation, "counter")
+
+        for labels, value in self.values.items():
+            yield sample(self.name, value, dict(zip(self.labels, labels)))
+
+
+class Histogram:
+    """How many observations fell under each bucket, along with their sum, for every combination of labels."""
+
+    def __init__(
+        self, name: str, documentation: str, labels: Labels = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(buckets)
+
+        # The counts of each bucket, followed by the sum of every observation.
+        self.series: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Counts one observation under some labels."""
+        series = self.series.get(labels)
+
+        if series is None:
+            series = self.series[labels] = [0] * len(self.buckets) + [0.0]
+
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def expose(self) -> Iterator[str]:
+        """The histogram in the text format."""
+        yield from header(self.name, self.documentation, "histogram")
+
+        for labels, series in self.series.items():
+            yield from histogram_samples(
+                self.name, dict(zip(self.labels, labels)), self.buckets, series[:-1], series[-1]
+            )
+
+
+class MetricsServer:
+    """
+    Serves metrics in the Prometheus text format from the event loop of the bot.
+
+    Counters and histograms are updated as things happen, and anything that's a current level, like how many
+    connections are in use, is read by collectors when the metrics are scraped.
+    """
+
+    def __init__(
+        self, loop: asyncio.AbstractEventLoop, host: str = Metrics.HOST, port: int = Metrics.PORT
+    ) -> None:
+        self.loop = loop
+        self.host = host
+        self.port = port
+
+        self.commands = Histogram(
+            "xythrion_command_duration_seconds", "How long commands took to run.", ("command", "outcome")
+        )
+        self.command_errors = Counter(
+            "xythrion_command_errors_total", "Errors raised by commands, by type.", ("command", "error")
+        )
+
+        # Each collector gives back lines of the text format, and is called on every scrape.
+        self.collectors: List[Callable[[], Iterable[str]]] = [
+            self.commands.expose,
+            self.command_errors.expose,
+        ]
+
+        self._runner: Optional[web.AppRunner] = None
+
+    def add_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        """Adds something to call for more metrics on every scrape."""
+        self.collectors.append(collector)
+
+    def expose(self) -> str:
+        """Every metric in the text format."""
+        lines = []
+
+        for collector in self.collectors:
+            try:
+                lines.extend(collector())
+
+            except Exception as e:
+                log.error("Failed to collect metrics.", exc_info=(type(e), e, e.__traceback__))
+
+        return "\n".join(lines) + "\n"
+
+    async def _handle(self, _: web.Request) -> web.Response:
+        """Responds to a scrape."""
+        return web.Response(text=self.expose(), content_type="text/plain", charset="utf-8")
+
+    async def start(self) -> None:
+        """Starts serving metrics, logging instead of raising if the port can't be used."""
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+
+        try:
+            await web.TCPSite(self._runner, self.host, self.port).start()
+
+        except OSError as e:
+            log.error(f"Could not serve metrics on {self.host}:{self.port}: {e}")
+            return
+
+        log.info(f"Serving metrics on {self.host}:{self.port}.")
+
+    async def close(self) -> None:
+        """Stops serving metrics."""
+        if self._runner is not None:
+            await self._runner.cleanup()
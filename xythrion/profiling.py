@@ -0,0 +1,117 @@
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Seconds between samples, which keeps sampling to a couple percent of a core.
+INTERVAL = 0.01
+
+# Leaves of stacks where a thread is waiting for work rather than doing any, which are the loop selecting,
+# an executor thread waiting for a job, and a render worker waiting for a graph.
+IDLE_LEAVES = frozenset({("selectors.py", "select"), ("thread.py", "_worker"), ("connection.py", "_recv")})
+
+_labels: Dict[CodeType, str] = {}
+
+
+def _label(code: CodeType) -> str:
+    """How a function shows up in a stack, like `render (xythrion/rendering.py:95)`."""
+    label = _labels.get(code)
+
+    if label is None:
+        path = Path(code.co_filename)
+        where = f"{path.parent.name}/{path.name}" if path.parent.name else path.name
+
+        label = _labels[code] = f"{code.co_name} ({where}:{code.co_firstlineno})"
+
+    return label
+
+
+def _codes(frame: Optional[FrameType]) -> Tuple[CodeType, ...]:
+    """The code of every frame of a stack, from the innermost one out."""
+    codes = []
+
+    while frame is not None:
+        codes.append(frame.f_code)
+        frame = frame.f_back
+
+    return tuple(codes)
+
+
+def _is_idle(code: CodeType) -> bool:
+    """If the innermost code of a stack is a thread waiting for work."""
+    return (Path(code.co_filename).name, code.co_name) in IDLE_LEAVES
+
+
+def collapse(thread: str, codes: Tuple[CodeType, ...]) -> str:
+    """A stack as a line of the collapsed format, from the thread down to the innermost frame."""
+    if codes and _is_idle(codes[0]):
+        return f"{thread};<idle>"
+
+    return ";".join((thread, *map(_label, reversed(codes))))
+
+
+def sample_stacks(
+    seconds: float, interval: float, threads: Callable[[], Dict[int, str]]
+) -> Tuple["Counter[str]", int]:
+    """
+    Samples the stacks of threads every interval for a while, from whichever thread calls this.
+
+    Gives back how many times each stack was seen along with how many samples were taken. Idle stacks are
+    counted as just the thread and `<idle>`, so they don't crowd out everything else.
+    """
+    # Stacks are only made into text once sampling is done, which keeps each sample cheap.
+    counts: "Counter[Tuple[str, Tuple[CodeType, ...]]]" = Counter()
+    samples = 0
+
+    own = threading.get_ident()
+    deadline = time.perf_counter() + seconds
+
+    while time.perf_counter() < deadline:
+        frames = sys._current_frames()
+
+        for ident, name in threads().items():
+            if ident != own and ident in frames:
+                counts[name, _codes(frames[ident])] += 1
+
+        samples += 1
+        time.sleep(interval)
+
+    stacks: "Counter[str]" = Counter()
+
+    for (name, codes), count in counts.items():
+        stacks[collapse(name, codes)] += count
+
+    return stacks, samples
+
+
+def all_threads() -> Dict[int, str]:
+    """Every thread of the process, by its identifier."""
+    return {thread.ident: thread.name for thread in threading.enumerate() if thread.ident is not None}
+
+
+def top_functions(stacks: "Counter[str]", limit: int) -> List[Tuple[str, int, int]]:
+    """
+    The functions that were running the most in stacks, as (function, own samples, total samples).
+
+    Own samples are the ones where the function was the innermost frame, which is what they're ordered by, and
+    total ones are where it was anywhere in the stack. Idle samples aren't counted.
+    """
+    own: "Counter[str]" = Counter()
+    total: "Counter[str]" = Counter()
+
+    for stack, count in stacks.items():
+        # The first label of a stack is its thread, which isn't a function.
+        _, *functions = stack.split(";")
+
+        if not functions or functions[-1] == "<idle>":
+            continue
+
+        own[functions[-1]] += count
+
+        for function in set(functions):
+            total[function] += count
+
+    return [(function, count, total[function]) for function, count in own.most_common(limit)]
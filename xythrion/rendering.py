@@ -0,0 +1,444 @@
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from multiprocessing.connection import Connection
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .caching import DiskCache, LRUCache
+from .constants import Caching, Rendering
+from .metrics import header, sample
+from .profiling import sample_stacks
+
+log = logging.getLogger(__name__)
+
+# Workers are spawned rather than forked, so they never inherit the event loop or any threads.
+CONTEXT = multiprocessing.get_context("spawn")
+
+MAX_TICK_LABELS = 8
+
+# Starting a worker imports matplotlib and can build its font cache, which isn't counted against renders.
+WARM_UP_TIMEOUT = 120
+RESPAWN_DELAY = 5
+
+# Seconds a worker has to send back its stacks after it's done sampling them.
+PROFILE_GRACE = 10
+
+# Part of every cache key, so changing how graphs look never serves renders made before the change.
+STYLE = ("dark_background", MAX_TICK_LABELS)
+
+
+class Subplot(NamedTuple):
+    """One set of axes within a graph."""
+
+    y: Sequence[float]
+    x: Optional[Sequence[float]] = None
+    title: Optional[str] = None
+    x_labels: Optional[Tuple[str, ...]] = None
+    label_rotation: int = 0
+    y_limits: Optional[Tuple[float, float]] = None
+
+
+class GraphSpec(NamedTuple):
+    """Everything a worker needs to render a graph, which has to be picklable."""
+
+    subplots: Tuple[Subplot, ...]
+    nrows: int = 1
+    ncols: int = 1
+
+
+class RenderError(Exception):
+    """Custom exception when a worker fails to render a graph."""
+
+    def __init__(self, message: str, *args) -> None:
+        super().__init__(message, *args)
+
+
+class RenderTimeoutError(RenderError):
+    """Custom exception when a render takes too long and its worker is killed."""
+
+
+class RenderQueueFullError(RenderError):
+    """Custom exception when too many graphs are waiting to be rendered."""
+
+
+def spec_digest(spec: GraphSpec) -> str:
+    """Hashes everything that changes how a graph looks, including the raw bytes of its data."""
+    # Imported on the first render rather than when the bot starts.
+    import numpy as np
+
+    digest = hashlib.blake2b(repr((STYLE, spec.nrows, spec.ncols)).encode(), digest_size=20)
+
+    for subplot in spec.subplots:
+        for values in (subplot.x, subplot.y):
+            if values is None:
+                digest.update(b"\x00")
+                continue
+
+            array = np.ascontiguousarray(values, dtype=np.float64)
+            digest.update(repr(array.shape).encode())
+            digest.update(array)
+
+        options = (subplot.title, subplot.x_labels, subplot.label_rotation, subplot.y_limits)
+        digest.update(repr(options).encode())
+
+    return digest.hexdigest()
+
+
+def _warm_up() -> None:
+    """Loads matplotlib and the style of the graphs once per worker, instead of once per render."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    plt.style.use("dark_background")
+
+
+def render(spec: GraphSpec, buffer: Optional[BytesIO] = None) -> bytes:
+    """Renders a graph into PNG bytes."""
+    import matplotlib.pyplot as plt
+
+    buffer = buffer or BytesIO()
+
+    fig, axes = plt.subplots(nrows=spec.nrows, ncols=spec.ncols, squeeze=False)
+
+    try:
+        for ax, subplot in zip(axes.flat, spec.subplots):
+            ax.grid(True, linestyle="-.", linewidth=0.5)
+
+            if subplot.x is None:
+                ax.plot(subplot.y)
+
+            else:
+                ax.plot(subplot.x, subplot.y)
+
+            if subplot.title:
+                ax.set_title(subplot.title)
+
+            if subplot.y_limits:
+                ax.set_ylim(*subplot.y_limits)
+
+            if subplot.x_labels:
+                step = max(1, len(subplot.x_labels) // MAX_TICK_LABELS)
+                ticks = range(0, len(subplot.x_labels), step)
+
+                ax.set_xticks(ticks)
+                ax.set_xticklabels(
+                    [subplot.x_labels[i] for i in ticks], rotation=subplot.label_rotation, ha="right"
+                )
+
+        fig.tight_layout(pad=0.4, w_pad=0.5, h_pad=1.0)
+
+        buffer.seek(0)
+        buffer.truncate()
+        fig.savefig(buffer, format="png")
+
+    finally:
+        plt.close(fig)
+
+    return buffer.getvalue()
+
+
+def _profile(connection: Connection, thread: int) -> None:
+    """Samples the stacks of a worker's rendering thread whenever asked to, for as long as asked."""
+    name = multiprocessing.current_process().name
+
+    while True:
+        try:
+            seconds, interval = connection.recv()
+
+        except (EOFError, OSError):
+            return
+
+        connection.send(sample_stacks(seconds, interval, lambda: {thread: name}))
+
+
+def _work(connection: Connection, profile_connection: Connection) -> None:
+    """The loop of a worker process, rendering one graph at a time until it's told to stop."""
+    # Profiling happens on a thread of its own, so a worker can be profiled while it's rendering.
+    threading.Thread(target=_profile, args=(profile_connection, threading.get_ident()), daemon=True).start()
+
+    _warm_up()
+    connection.send(True)
+
+    # Each worker only renders one graph at a time, so a single buffer is reused for every render.
+    buffer = BytesIO()
+
+    while True:
+        try:
+            spec = connection.recv()
+
+        except (EOFError, KeyboardInterrupt):
+            return
+
+        if spec is None:
+            return
+
+        try:
+            connection.send((True, render(spec, buffer)))
+
+        except Exception as e:
+            connection.send((False, f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    """A worker process along with the parent's ends of its pipes, one for rendering and one for profiling."""
+
+    def __init__(self, index: int) -> None:
+        self.connection, child = CONTEXT.Pipe()
+        self.profile_connection, profile_child = CONTEXT.Pipe()
+
+        self.process = CONTEXT.Process(
+            target=_work, args=(child, profile_child), name=f"render-worker-{index}", daemon=True
+        )
+        self.process.start()
+
+        child.close()
+        profile_child.close()
+
+    def profile(self, seconds: float, interval: float) -> Tuple["Counter[str]", int]:
+        """Samples the stacks of the worker, which blocks for as long as it's sampling."""
+        self.profile_connection.send((seconds, interval))
+
+        if not self.profile_connection.poll(seconds + PROFILE_GRACE):
+            raise RenderTimeoutError(f"{self.process.name} didn't send back its profile.")
+
+        return self.profile_connection.recv()
+
+    def kill(self) -> None:
+        """Stops the process without waiting for whatever it's doing to finish."""
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+        self.profile_connection.close()
+
+
+class RenderService:
+    """
+    Renders graphs in a pool of worker processes, so matplotlib never runs on the bot's process.
+
+    Finished renders are cached by the hash of their spec, in memory and optionally on disk.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        workers: int = Rendering.WORKERS,
+        queue_size: int = Rendering.QUEUE_SIZE,
+        timeout: float = Rendering.TIMEOUT,
+    ) -> None:
+        self.loop = loop
+        self.workers = workers
+        self.timeout = timeout
+
+        self.queue: "asyncio.Queue[Tuple[GraphSpec, asyncio.Future]]" = asyncio.Queue(maxsize=queue_size)
+
+        # Pipes are blocking, so every worker gets a thread to wait on it with.
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="render")
+
+        self.memory_cache = LRUCache("renders", Caching.RENDER_CACHE_BYTES, weigh=len)
+
+        # The bot's own directory can be mounted read-only, so renders are only kept on disk when asked for.
+        self.disk_cache = (
+            DiskCache("renders on disk", Caching.RENDER_CACHE_DIRECTORY, Caching.RENDER_CACHE_TTL, ".png")
+            if Caching.RENDER_CACHE_DIRECTORY
+            else None
+        )
+
+        self._tasks: List[asyncio.Task] = []
+
+        # The worker each consumer is currently using, by its index.
+        self.live_workers: Dict[int, _Worker] = {}
+
+    def __bool__(self) -> bool:
+        """If the workers have been started."""
+        return bool(self._tasks)
+
+    @property
+    def queue_depth(self) -> int:
+        """How many graphs are waiting for a worker."""
+        return self.queue.qsize()
+
+    async def profile(self, seconds: float, interval: float) -> "Counter[str]":
+        """Samples the stacks of every worker at once, skipping any that die or restart in the meantime."""
+        results = await asyncio.gather(
+            *(
+                self.loop.run_in_executor(None, worker.profile, seconds, interval)
+                for worker in self.live_workers.values()
+            ),
+            return_exceptions=True,
+        )
+
+        stacks: "Counter[str]" = Counter()
+
+        for result in results:
+            if isinstance(result, Exception):
+                log.warning(f"Could not profile a render worker: {result}")
+                continue
+
+            stacks.update(result[0])
+
+        return stacks
+
+    def metrics(self) -> Iterator[str]:
+        """How full the queue of graphs is, in the Prometheus text format."""
+        yield from header("xythrion_render_queue_depth", "Graphs waiting for a render worker.", "gauge")
+        yield sample("xythrion_render_queue_depth", self.queue_depth)
+        yield from header(
+            "xythrion_render_queue_capacity", "Graphs that can wait before more are refused.", "gauge"
+        )
+        yield sample("xythrion_render_queue_capacity", self.queue.maxsize)
+
+    def start(self) -> None:
+        """Starts the worker processes, doing nothing if they're already running."""
+        if self._tasks:
+            return
+
+        for index in range(self.workers):
+            self._tasks.append(self.loop.create_task(self._consume(index)))
+
+        if self.disk_cache is not None:
+            self._tasks.append(self.loop.create_task(self._evict_expired()))
+
+        log.info(f"Started {self.workers} render worker(s).")
+
+    async def close(self) -> None:
+        """Stops every worker process."""
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        self._tasks.clear()
+        self.executor.shutdown(wait=False)
+
+    async def render(self, spec: GraphSpec) -> bytes:
+        """Gives back the PNG bytes of a graph, only rendering it if it isn't cached."""
+        key = spec_digest(spec)
+
+        image = self.memory_cache.get(key)
+
+        if image is not None:
+            return image
+
+        if self.disk_cache is not None:
+            image = await self.loop.run_in_executor(None, self.disk_cache.get, key)
+
+            if image is not None:
+                self.memory_cache.set(key, image)
+                return image
+
+        image = await self._render(spec)
+
+        self.memory_cache.set(key, image)
+
+        # Writing to disk isn't waited on, so a failure is logged once it's done instead of being lost.
+        if self.disk_cache is not None:
+            write = self.loop.run_in_executor(None, self.disk_cache.set, key, image)
+            write.add_done_callback(self._on_disk_cache_written)
+
+        return image
+
+    def _on_disk_cache_written(self, write: "asyncio.Future[None]") -> None:
+        """Logs a render that couldn't be written to the disk cache."""
+        if not write.cancelled() and (e := write.exception()) is not None:
+            log.error("Failed to write a render to the disk cache.", exc_info=(type(e), e, e.__traceback__))
+
+    async def _render(self, spec: GraphSpec) -> bytes:
+        """Queues up a graph to be rendered by a worker."""
+        self.start()
+
+        future = self.loop.create_future()
+
+        try:
+            self.queue.put_nowait((spec, future))
+
+        except asyncio.QueueFull:
+            raise RenderQueueFullError("Too many graphs are being rendered right now, try again later.")
+
+        return await future
+
+    async def _consume(self, index: int) -> None:
+        """Feeds graphs from the queue to a worker, replacing the worker if it hangs or dies."""
+        worker = await self._spawn(index)
+
+        try:
+            while True:
+                spec, future = await self.queue.get()
+
+                try:
+                    if future.cancelled():
+                        continue
+
+                    image = await self._run(worker, spec)
+
+                except (RenderTimeoutError, EOFError, OSError) as e:
+                    log.warning(f"Restarting render worker {index}: {e}")
+                    worker.kill()
+                    worker = await self._spawn(index)
+
+                    if not future.done():
+                        future.set_exception(e if isinstance(e, RenderError) else RenderError(str(e)))
+
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+
+                else:
+                    if not future.done():
+                        future.set_result(image)
+
+                finally:
+                    self.queue.task_done()
+
+        finally:
+            self.live_workers.pop(index, None)
+            worker.kill()
+
+    async def _evict_expired(self) -> None:
+        """Regularly deletes renders on disk that have outlived their time to live."""
+        while True:
+            count = await self.loop.run_in_executor(None, self.disk_cache.evict_expired)
+
+            if count:
+                log.info(f"Evicted {count} expired render(s) from {self.disk_cache.directory}.")
+
+            await asyncio.sleep(self.disk_cache.ttl)
+
+    async def _spawn(self, index: int) -> _Worker:
+        """Starts a worker, waiting until it has finished warming up and retrying if it never does."""
+        while True:
+            worker = _Worker(index)
+
+            try:
+                if await self.loop.run_in_executor(self.executor, worker.connection.poll, WARM_UP_TIMEOUT):
+                    await self.loop.run_in_executor(self.executor, worker.connection.recv)
+                    self.live_workers[index] = worker
+                    return worker
+
+            except (EOFError, OSError):
+                pass
+
+            worker.kill()
+
+            log.error(f"Render worker {index} failed to start, retrying in {RESPAWN_DELAY} seconds.")
+            await asyncio.sleep(RESPAWN_DELAY)
+
+    async def _run(self, worker: _Worker, spec: GraphSpec) -> bytes:
+        """Sends a graph to a worker and waits for it, up to the timeout."""
+        await self.loop.run_in_executor(self.executor, worker.connection.send, spec)
+
+        if not await self.loop.run_in_executor(self.executor, worker.connection.poll, self.timeout):
+            raise RenderTimeoutError(f"Rendering took longer than {self.timeout} seconds.")
+
+        ok, result = await self.loop.run_in_executor(self.executor, worker.connection.recv)
+
+        if not ok:
+            raise RenderError(result)
+
+        return result
@@ -0,0 +1,46 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple
+
+
+class StartupTimer:
+    """Times each phase of starting up, from the package being imported until the bot is ready."""
+
+    def __init__(self, started: float) -> None:
+        self.started = started
+        self.finished = False
+
+        # Phases can overlap, so each is kept as (when it started relative to the start, how long it took).
+        self.phases: Dict[str, Tuple[float, float]] = {}
+
+    @property
+    def last(self) -> float:
+        """When the latest phase to finish finished, as a time from the performance counter."""
+        return self.started + max((start + took for start, took in self.phases.values()), default=0.0)
+
+    def record(self, phase: str, start: float, end: float) -> None:
+        """Records a phase that happened between two times from the performance counter."""
+        self.phases[phase] = (start - self.started, end - start)
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        """Records a phase as whatever happens within the block."""
+        start = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            self.record(phase, start, time.perf_counter())
+
+    def finish(self) -> str:
+        """Stops timing, giving back a report of every phase in the order they started."""
+        self.finished = True
+
+        width = max(map(len, self.phases), default=0)
+        lines = [
+            f"{phase:<{width}}  at {start:7.3f}s  took {took:7.3f}s"
+            for phase, (start, took) in sorted(self.phases.items(), key=lambda item: item[1][0])
+        ]
+
+        return "\n".join((*lines, f"Ready {self.last - self.started:.3f}s after starting."))
@@ -1,5 +1,18 @@
+from typing import Optional
+
+
 class TokenizationError(Exception):
     """Custom exception when failing parses."""
 
+    def __init__(self, message: str, column: Optional[int] = None, *args) -> None:
+        super().__init__(message, *args)
+
+        # One-based column within the original expression where tokenizing stopped.
+        self.column = column
+
+
+class ParsingError(Exception):
+    """Custom exception when tokens do not form a valid expression."""
+
     def __init__(self, message: str, *args) -> None:
         super().__init__(message, *args)
@@ -1,6 +1,303 @@
-from typing import List, Union
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
 
+import numpy as np
 
-def calculate(numbers: List[Union[int, float]]) -> Union[int, float]:
-    """Calculate output of expression with an integer/float."""
-    pass
+from xythrion.caching import LRUCache
+from xythrion.constants import Caching
+from .errors import ParsingError
+from .tokenizer import parse
+
+Token = Tuple[str, str]
+
+CONSTANTS: Dict[str, float] = {"e": np.e, "pi": np.pi}
+
+FUNCTIONS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "asin": np.arcsin,
+    "acos": np.arccos,
+    "atan": np.arctan,
+    "sinh": np.sinh,
+    "cosh": np.cosh,
+    "tanh": np.tanh,
+    "exp": np.exp,
+    "log": np.log,
+    "ln": np.log,
+    "log2": np.log2,
+    "log10": np.log10,
+    "sqrt": np.sqrt,
+    "abs": np.abs,
+}
+
+OPERATORS: Dict[str, Callable[[np.ndarray, np.ndarray], np.ndarray]] = {
+    "ADD": np.add,
+    "SUBTRACT": np.subtract,
+    "MULTIPLY": np.multiply,
+    "DIVIDE": np.true_divide,
+    "EXPONENTIAL": np.power,
+}
+
+# Tokens that can start a factor, which is what allows implicit multiplication such as `2x` or `(x+1)(x-1)`.
+FACTOR_STARTS = frozenset(("NUMBER", "VARIABLE", "OPEN_PAREN"))
+
+
+class Number(NamedTuple):
+    """A constant number, including named constants like pi."""
+
+    value: float
+
+
+class Variable(NamedTuple):
+    """The single variable of the expression, which is replaced by the domain."""
+
+    name: str
+
+
+class Negate(NamedTuple):
+    """Unary minus."""
+
+    operand: "Node"
+
+
+class BinaryOperation(NamedTuple):
+    """An operator applied to two nodes."""
+
+    operator: str
+    left: "Node"
+    right: "Node"
+
+
+class Chain(NamedTuple):
+    """
+    Operators of the same precedence applied from left to right, such as `a - b + c`.
+
+    Kept flat instead of nesting a node per operator, so long sums and products don't grow the tree deeper.
+    """
+
+    first: "Node"
+    rest: Tuple[Tuple[str, "Node"], ...]
+
+
+class Call(NamedTuple):
+    """A whitelisted function applied to a node."""
+
+    function: str
+    argument: "Node"
+
+
+Node = Union[Number, Variable, Negate, BinaryOperation, Chain, Call]
+
+# The only variable an expression can have, which is replaced by the domain.
+VARIABLE = "x"
+
+# Parsing and evaluating both recurse into parentheses, exponents and signs within each other, so how many
+# levels of them an expression can have is kept well below Python's recursion limit.
+MAX_NESTING = 50
+
+# Trees keyed by their token stream, so `x^2` and `x ^ 2` share an entry.
+EXPRESSION_CACHE = LRUCache("expressions", Caching.EXPRESSION_CACHE_SIZE)
+
+# Sample arrays keyed by (start, stop, count), made read-only since they're shared between graphs.
+DOMAIN_CACHE = LRUCache("domains", Caching.DOMAIN_CACHE_SIZE)
+
+
+class Parser:
+    """Recursive descent parser turning a token stream into a tree of nodes."""
+
+    def __init__(self, tokens: List[Token]) -> None:
+        self.tokens = tokens
+        self.position = 0
+        self.nesting = 0
+
+    def peek(self) -> Optional[str]:
+        """The type of the current token, if there are any left."""
+        return self.tokens[self.position][0] if self.position < len(self.tokens) else None
+
+    def advance(self, expected: Optional[str] = None) -> Token:
+        """Consumes the current token, making sure it is of the expected type if one is given."""
+        if self.position >= len(self.tokens):
+            raise ParsingError("Expression ended unexpectedly.")
+
+        token = self.tokens[self.position]
+
+        if expected is not None and token[0] != expected:
+            raise ParsingError(f'Expected {expected.lower().replace("_", " ")} but got "{token[1]}".')
+
+        self.position += 1
+
+        return token
+
+    def build(self) -> Node:
+        """Parses every token, failing if any of them are left over."""
+        if not self.tokens:
+            raise ParsingError("Expression is empty.")
+
+        node = self.expression()
+
+        if self.position != len(self.tokens):
+            raise ParsingError(f'Unexpected "{self.tokens[self.position][1]}" in expression.')
+
+        return node
+
+    def expression(self) -> Node:
+        """Parses `expression := term (("+" | "-") term)*`."""
+        node = self.term()
+        rest = []
+
+        while self.peek() in ("ADD", "SUBTRACT"):
+            operator, _ = self.advance()
+            rest.append((operator, self.term()))
+
+        return Chain(node, tuple(rest)) if rest else node
+
+    def term(self) -> Node:
+        """Parses `term := unary (("*" | "/") unary | power)*`, a bare power being implicit multiplication."""
+        node = self.unary()
+        rest = []
+
+        while True:
+            kind = self.peek()
+
+            if kind in ("MULTIPLY", "DIVIDE"):
+                self.advance()
+                rest.append((kind, self.unary()))
+
+            # Two numbers in a row, like `3 4`, are more likely a typo than a product, so they stop the term.
+            elif kind in FACTOR_STARTS and not (kind == "NUMBER" == self.tokens[self.position - 1][0]):
+                rest.append(("MULTIPLY", self.power()))
+
+            else:
+                return Chain(node, tuple(rest)) if rest else node
+
+    def unary(self) -> Node:
+        """Parses `unary := "-" unary | "+" unary | power`."""
+        # Every way of nesting an expression goes through here, so this is where nesting is limited.
+        self.nesting += 1
+
+        if self.nesting > MAX_NESTING:
+            raise ParsingError(f"Expression is nested too deeply, it can be at most {MAX_NESTING} levels.")
+
+        try:
+            kind = self.peek()
+
+            if kind == "SUBTRACT":
+                self.advance()
+                return Negate(self.unary())
+
+            if kind == "ADD":
+                self.advance()
+                return self.unary()
+
+            return self.power()
+
+        finally:
+            self.nesting -= 1
+
+    def power(self) -> Node:
+        """Parses `power := atom ("^" unary)?`, which binds tighter than negation so `-x^2` is `-(x^2)`."""
+        node = self.atom()
+
+        if self.peek() == "EXPONENTIAL":
+            self.advance()
+            node = BinaryOperation("EXPONENTIAL", node, self.unary())
+
+        return node
+
+    def atom(self) -> Node:
+        """Parses `atom := NUMBER | VARIABLE | function "(" expression ")" | "(" expression ")"`."""
+        kind, value = self.advance()
+
+        if kind == "NUMBER":
+            return Number(float(value))
+
+        if kind == "OPEN_PAREN":
+            node = self.expression()
+            self.advance("CLOSE_PAREN")
+            return node
+
+        if kind == "VARIABLE":
+            if value in FUNCTIONS:
+                if self.peek() != "OPEN_PAREN":
+                    raise ParsingError(f'Function "{value}" must be followed by parentheses.')
+
+                return Call(value, self.atom())
+
+            if value in CONSTANTS:
+                return Number(CONSTANTS[value])
+
+            if value != VARIABLE:
+                raise ParsingError(f"Unknown name {value!r}.")
+
+            return Variable(value)
+
+        raise ParsingError(f'Unexpected "{value}" in expression.')
+
+
+def build_tree(tokens: List[Token]) -> Node:
+    """Builds a tree of nodes out of tokens from the tokenizer."""
+    return Parser(tokens).build()
+
+
+def compile_expression(expression: str) -> Node:
+    """Tokenizes and parses an expression, reusing the tree of any expression with the same tokens."""
+    tokens = tuple(parse(expression))
+
+    tree = EXPRESSION_CACHE.get(tokens)
+
+    if tree is None:
+        tree = build_tree(list(tokens))
+        EXPRESSION_CACHE.set(tokens, tree)
+
+    return tree
+
+
+def sample_domain(start: float, stop: float, count: int) -> np.ndarray:
+    """Evenly spaced numbers over a domain, shared between every expression plotted over it."""
+    key = (float(start), float(stop), count)
+
+    numbers = DOMAIN_CACHE.get(key)
+
+    if numbers is None:
+        numbers = np.linspace(start, stop, count)
+        numbers.flags.writeable = False
+        DOMAIN_CACHE.set(key, numbers)
+
+    return numbers
+
+
+def evaluate(node: Node, numbers: np.ndarray) -> Union[np.ndarray, float]:
+    """Walks the tree once, with every node operating on the whole domain at the same time."""
+    if isinstance(node, Number):
+        return node.value
+
+    if isinstance(node, Variable):
+        return numbers
+
+    if isinstance(node, Negate):
+        return np.negative(evaluate(node.operand, numbers))
+
+    if isinstance(node, Call):
+        return FUNCTIONS[node.function](evaluate(node.argument, numbers))
+
+    if isinstance(node, Chain):
+        result = evaluate(node.first, numbers)
+
+        for operator, operand in node.rest:
+            result = OPERATORS[operator](result, evaluate(operand, numbers))
+
+        return result
+
+    return OPERATORS[node.operator](evaluate(node.left, numbers), evaluate(node.right, numbers))
+
+
+def calculate(expression: Union[str, Node], numbers: np.ndarray) -> np.ndarray:
+    """Calculate output of expression with an array of integers/floats."""
+    tree = compile_expression(expression) if isinstance(expression, str) else expression
+    numbers = np.asarray(numbers, dtype=np.float64)
+
+    # Poles and out of domain inputs become inf/nan, which matplotlib leaves as gaps.
+    with np.errstate(all="ignore"):
+        result = evaluate(tree, numbers)
+
+    return np.broadcast_to(np.asarray(result, dtype=np.float64), numbers.shape)
@@ -0,0 +1,122 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .interpreter import Node, calculate, sample_domain
+
+INITIAL_POINTS = 257
+MAX_POINTS = 4096
+MAX_PASSES = 12
+
+# How far a point may stray from the line through its neighbours, as a fraction of the visible height.
+TOLERANCE = 0.002
+
+# Intervals are never split below this fraction of the domain, which stops poles from eating the budget.
+MIN_WIDTH = 1e-9
+
+# Percentiles of the values used as the visible height, so poles don't squash the rest of the graph.
+VISIBLE_PERCENTILES = (1, 99)
+OUTLIER_RATIO = 1.5
+MARGIN = 0.1
+
+
+def visible_range(y: np.ndarray) -> Optional[Tuple[float, float]]:
+    """The range of values worth showing, ignoring values that shoot off towards poles."""
+    finite = y[np.isfinite(y)]
+
+    if not finite.size:
+        return None
+
+    low, high = np.percentile(finite, VISIBLE_PERCENTILES)
+
+    # Only values shooting off far beyond the rest are left out, anything else is shown in full.
+    if finite.max() - finite.min() <= (high - low) * OUTLIER_RATIO:
+        low, high = finite.min(), finite.max()
+    margin = (high - low) * MARGIN or max(abs(low), 1.0) * MARGIN
+
+    return float(low - margin), float(high + margin)
+
+
+def _interval_scores(x: np.ndarray, y: np.ndarray, height: float) -> np.ndarray:
+    """Scores every interval by how badly it needs splitting, with zero meaning it's fine as is."""
+    scores = np.zeros(len(x) - 1)
+
+    finite = np.isfinite(y)
+
+    # An interval where the function becomes undefined (or infinite) is split to find the edge.
+    scores[finite[:-1] != finite[1:]] = np.inf
+
+    # Curvature: how far each interior point is from the straight line between its neighbours.
+    x0, x1, x2 = x[:-2], x[1:-1], x[2:]
+    y0, y1, y2 = y[:-2], y[1:-1], y[2:]
+
+    with np.errstate(all="ignore"):
+        deviation = np.abs(y1 - (y0 + (y2 - y0) * (x1 - x0) / (x2 - x0))) / height
+
+    deviation[~(np.isfinite(y0) & np.isfinite(y1) & np.isfinite(y2))] = 0
+    deviation[deviation <= TOLERANCE] = 0
+
+    scores[:-1] = np.maximum(scores[:-1], deviation)
+    scores[1:] = np.maximum(scores[1:], deviation)
+
+    # Intervals that are already tiny stay as they are, even if they still look bad.
+    scores[np.diff(x) <= (x[-1] - x[0]) * MIN_WIDTH] = 0
+
+    return scores
+
+
+def _break_discontinuities(
+    x: np.ndarray, y: np.ndarray, limits: Tuple[float, float]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Puts NaN between points that jump from one side of the visible range to the other, such as at poles."""
+    low, high = limits
+    above, below = y > high, y < low
+
+    jumps = np.flatnonzero((above[:-1] & below[1:]) | (below[:-1] & above[1:]))
+
+    if not jumps.size:
+        return x, y
+
+    return np.insert(x, jumps + 1, np.nan), np.insert(y, jumps + 1, np.nan)
+
+
+def adaptive_sample(
+    tree: Node, start: float, stop: float, max_points: int = MAX_POINTS
+) -> Tuple[np.ndarray, np.ndarray, Optional[Tuple[float, float]]]:
+    """
+    Samples an expression, spending more points where it curves or jumps and fewer where it's flat.
+
+    Every pass evaluates all of the new points in one go. Gives back x, y and the range of y worth showing.
+    """
+    x = sample_domain(start, stop, INITIAL_POINTS)
+    y = calculate(tree, x)
+
+    limits = visible_range(y)
+    height = (limits[1] - limits[0]) if limits else 1.0
+
+    for _ in range(MAX_PASSES):
+        budget = max_points - len(x)
+
+        if budget <= 0:
+            break
+
+        scores = _interval_scores(x, y, height)
+        intervals = np.flatnonzero(scores)
+
+        if not intervals.size:
+            break
+
+        # When over budget, only the worst intervals are split.
+        if intervals.size > budget:
+            intervals = intervals[np.argpartition(scores[intervals], -budget)[-budget:]]
+            intervals.sort()
+
+        midpoints = (x[intervals] + x[intervals + 1]) / 2
+
+        x = np.insert(x, intervals + 1, midpoints)
+        y = np.insert(y, intervals + 1, calculate(tree, midpoints))
+
+    if limits is not None:
+        x, y = _break_discontinuities(x, y, limits)
+
+    return x, y, limits
@@ -6,35 +6,49 @@ from .errors import TokenizationError
 
 TOKEN_TYPES = OrderedDict(
     (
-        ("OPEN_PAREN", r"^\(|\["),
-        ("CLOSE_PAREN", r"^\)|\]"),
-        ("ADD", r"^\+"),
-        ("SUBTRACT", r"^-"),
-        ("MULTIPLY", r"^\*"),
-        ("DIVIDE", r"^\/"),
-        ("EXPONENTIAL", r"^\^"),
-        ("NUMBER", r"^-?\d+\.?\d*"),
-        ("VARIABLE", r"^[a-zA-Z_]+"),
+        ("OPEN_PAREN", r"[(\[]"),
+        ("CLOSE_PAREN", r"[)\]]"),
+        ("ADD", r"\+"),
+        ("SUBTRACT", r"-"),
+        ("MULTIPLY", r"\*"),
+        ("DIVIDE", r"\/"),
+        ("EXPONENTIAL", r"\^"),
+        ("NUMBER", r"\d+\.?\d*|\.\d+"),
+        # Names of functions ending in digits are matched whole, while `x2` stays `x` times 2.
+        ("VARIABLE", r"log(?:2|10)|[a-zA-Z_]+"),
     )
 )
 
+# Whitespace is skipped between tokens instead of being stripped from the whole expression beforehand.
+SKIP = "SKIP"
+
+# Every token type is merged into one alternation, so the first group to match wins like the ordering above.
+TOKEN_PATTERN = re.compile(
+    "|".join((f"(?P<{SKIP}>\\s+)", *(f"(?P<{name}>{pattern})" for name, pattern in TOKEN_TYPES.items())))
+)
+
 
 def parse(expression: str) -> List[Tuple[str, str]]:
     """Parsing the given expression into tokens."""
-    ex = re.sub(re.compile(r"\s+"), "", expression)
-
     tokens = []
 
-    while ex:
-        for name, pattern in TOKEN_TYPES.items():
-            m = re.match(pattern, ex)
-            if m is not None:
-                tokens.append((name, m.group(0)))
-                index = len(m.group(0))
-                ex = ex[index:]
-                break
-
-        else:
-            raise TokenizationError("Input string could be not tokenized correctly.")
+    match = TOKEN_PATTERN.match
+    position, end = 0, len(expression)
+
+    while position < end:
+        m = match(expression, position)
+
+        if m is None:
+            raise TokenizationError(
+                f"Input string could not be tokenized at column {position + 1}: {expression[position]!r}.",
+                position + 1,
+            )
+
+        name = m.lastgroup
+
+        if name != SKIP:
+            tokens.append((name, m.group()))
+
+        position = m.end()
 
     return tokens
@@ -1,7 +1,17 @@
+from importlib import import_module
+from typing import Any
+
 from .converters import Extension, remove_whitespace
 from .graphs import Graph
 from .shortcuts import DefaultEmbed, check_for_subcommands, gen_filename, http_get, markdown_link, shorten
-from .unit_conversion import c2f, c2k, k2c, k2f
+
+# Names from modules that import NumPy, which are only imported once something uses them.
+LAZY_NAMES = {
+    "c2f": "unit_conversion",
+    "c2k": "unit_conversion",
+    "k2c": "unit_conversion",
+    "k2f": "unit_conversion",
+}
 
 __all__ = (
     "c2f",
@@ -18,3 +28,11 @@ __all__ = (
     "remove_whitespace",
     "Extension",
 )
+
+
+def __getattr__(name: str) -> Any:
+    """Imports the module of a lazy name the first time it's used."""
+    if name not in LAZY_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    return getattr(import_module(f".{LAZY_NAMES[name]}", __name__), name)
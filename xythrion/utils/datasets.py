@@ -0,0 +1,173 @@
+import re
+from typing import Optional
+
+import numpy as np
+
+from .downsampling import Points, lttb, min_max_buckets
+
+DELIMITERS = (b"\t", b",", b";")
+
+# Runs of lines with nothing but whitespace on them, which aren't rows.
+BLANK_LINES = re.compile(rb"\n(?:[ \t]*\n)+")
+
+# A line is held on to until its end comes in, so a file without line breaks can't grow it without a limit.
+MAX_LINE_LENGTH = 4096
+
+
+class DatasetError(Exception):
+    """Custom exception when a dataset can't be read."""
+
+    def __init__(self, message: str, *args) -> None:
+        super().__init__(message, *args)
+
+
+class PointReader:
+    """
+    Reads CSV/TSV points from chunks of bytes into arrays, downsampling as it goes.
+
+    One column is read as y values in order, two or more as x and y. Memory stays around the size of a chunk
+    no matter how many rows there are, since every chunk is reduced before the next one comes in.
+    """
+
+    def __init__(self, width: int) -> None:
+        self.width = width
+        self.rows = 0
+
+        self._remainder = b""
+        self._delimiter: Optional[bytes] = None
+        self._columns = 0
+        self._fields: Optional[int] = None
+
+        self._x = np.empty(0)
+        self._y = np.empty(0)
+
+    def _detect(self, line: bytes) -> bool:
+        """Works out the delimiter and columns from a line, giving back if the line holds data."""
+        self._delimiter = next((d for d in DELIMITERS if d in line), b" ")
+
+        fields = line.replace(self._delimiter, b" ").split()
+        self._columns = min(len(fields), 2)
+
+        try:
+            [float(field) for field in fields[: self._columns]]
+
+        except ValueError:
+            return False
+
+        return True
+
+    def feed(self, chunk: bytes) -> None:
+        """Parses every complete line of a chunk, holding on to whatever line was cut off at the end."""
+        data = self._remainder + chunk
+        end = data.rfind(b"\n") + 1
+
+        self._remainder = data[end:]
+
+        if len(self._remainder) > MAX_LINE_LENGTH:
+            raise DatasetError(f"A row is longer than {MAX_LINE_LENGTH} characters.")
+
+        self._parse(data[:end])
+
+    def _count_fields(self, data: bytes, rows: int) -> np.ndarray:
+        """The amount of fields on each line, including empty ones between two delimiters."""
+        buffer = np.frombuffer(data, dtype=np.uint8)
+        lines = np.cumsum(buffer == ord("\n"))
+
+        if self._delimiter != b" ":
+            return np.bincount(lines[buffer == ord(self._delimiter)], minlength=rows) + 1
+
+        # Runs of whitespace are a single delimiter, so fields are counted by where they start instead.
+        separators = np.isin(buffer, np.frombuffer(b" \t\n", dtype=np.uint8))
+        starts = ~separators & np.concatenate(([True], separators[:-1]))
+
+        return np.bincount(lines[starts], minlength=rows)
+
+    def _parse(self, data: bytes) -> None:
+        """Turns complete lines into values, checking every row has the same amount of them."""
+        data = BLANK_LINES.sub(b"\n", data.replace(b"\r", b"").strip())
+
+        if not data:
+            return
+
+        if self._delimiter is None:
+            first, _, rest = data.partition(b"\n")
+
+            # Headers are skipped, but the first line is kept if it already holds numbers.
+            if self._detect(first):
+                rest = data
+
+            if self._columns == 0:
+                raise DatasetError("The first line of the file has no columns.")
+
+            data = rest.strip()
+
+            if not data:
+                return
+
+        rows = data.count(b"\n") + 1
+        counts = self._count_fields(data, rows)
+
+        # Every row needs as many fields as the first, otherwise values would silently pair up across rows.
+        if self._fields is None:
+            self._fields = int(counts[0])
+
+        if self._fields < self._columns:
+            raise DatasetError(f"The first row has {self._fields} column(s) instead of {self._columns}.")
+
+        uneven = np.flatnonzero(counts != self._fields)
+
+        if uneven.size:
+            row = uneven[0]
+            raise DatasetError(
+                f"Row {self.rows + row + 1} has {counts[row]} column(s) instead of {self._fields}, "
+                "rows can't have missing or extra values."
+            )
+
+        text = data.replace(self._delimiter, b" ").decode("ascii", errors="replace")
+
+        error = DatasetError(
+            f"Could not read rows {self.rows + 1}-{self.rows + rows}, every column needs a number in it."
+        )
+
+        fields = text.split()
+
+        # Empty fields between delimiters disappear when split, leaving fewer values than there should be.
+        if len(fields) != rows * self._fields:
+            raise error
+
+        try:
+            values = np.array(fields, dtype=np.float64)
+
+        except ValueError:
+            raise error
+
+        values = values.reshape(rows, self._fields)
+
+        if self._columns == 1:
+            y = values[:, 0]
+            x = np.arange(self.rows, self.rows + rows, dtype=np.float64)
+
+        else:
+            x, y = values[:, 0], values[:, 1]
+
+        self.rows += rows
+
+        finite = np.isfinite(x) & np.isfinite(y)
+        x, y = min_max_buckets(x[finite], y[finite], self.width)
+
+        self._x = np.concatenate((self._x, x))
+        self._y = np.concatenate((self._y, y))
+
+        # What's been kept so far is reduced again if it outgrows a few times the width.
+        if self._x.size > self.width * 8:
+            self._x, self._y = min_max_buckets(self._x, self._y, self.width * 2)
+
+    def finish(self) -> Points:
+        """Parses the last line and downsamples everything down to the width."""
+        self._parse(self._remainder)
+        self._remainder = b""
+
+        if not self._x.size:
+            raise DatasetError("The file has no points in it.")
+
+        return lttb(self._x, self._y, self.width)
@@ -0,0 +1,66 @@
+from typing import Tuple
+
+import numpy as np
+
+Points = Tuple[np.ndarray, np.ndarray]
+
+
+def min_max_buckets(x: np.ndarray, y: np.ndarray, buckets: int) -> Points:
+    """
+    Keeps only the lowest and highest point of each bucket of consecutive points.
+
+    Peaks survive, which matters when many points share a pixel, and it's cheap enough to run per chunk.
+    """
+    n = len(y)
+
+    if n <= buckets * 2:
+        return x, y
+
+    # Rounding the bucket size up can leave fewer buckets needed, which keeps padding out of whole buckets.
+    size = -(-n // buckets)
+    buckets = -(-n // size)
+    padding = size * buckets - n
+
+    lows = np.concatenate((y, np.full(padding, np.inf))).reshape(buckets, size).argmin(axis=1)
+    highs = np.concatenate((y, np.full(padding, -np.inf))).reshape(buckets, size).argmax(axis=1)
+
+    offsets = np.arange(buckets) * size
+    indices = np.unique(np.concatenate((lows + offsets, highs + offsets)))
+
+    return x[indices], y[indices]
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> Points:
+    """
+    Downsamples points with Largest-Triangle-Three-Buckets, keeping the shape of the line.
+
+    The first and last points are kept, and every bucket between them keeps the point making the largest
+    triangle with the previously kept point and the average of the next bucket.
+    """
+    n = len(y)
+
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    every = (n - 2) / (threshold - 2)
+    edges = np.append(np.floor(np.arange(threshold - 2) * every).astype(np.int64) + 1, n - 1)
+
+    sampled = np.empty(threshold, dtype=np.int64)
+    sampled[0], sampled[-1] = 0, n - 1
+
+    a = 0
+
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        following = slice(end, edges[i + 2] if i + 2 < len(edges) else n)
+
+        average_x, average_y = x[following].mean(), y[following].mean()
+
+        areas = np.abs(
+            (x[a] - average_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (average_y - y[a])
+        )
+
+        a = start + int(areas.argmax())
+        sampled[i + 1] = a
+
+    return x[sampled], y[sampled]
@@ -0,0 +1,185 @@
+import mmap
+import re
+import tempfile
+import zlib
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Tuple, Union
+
+from .searching import MAX_INDEXED_CHARS, best_matches, pick_candidates, trigrams
+
+# Each line of a Sphinx inventory is `name domain:role priority uri display name`.
+ENTRY_PATTERN = re.compile(rb"(?x)(.+?)\s+(\S+)\s+(-?\d+)\s+?(\S*)\s+(.*)")
+
+HEADER_LINES = 4
+
+
+class InventoryError(Exception):
+    """Custom exception when an inventory can't be read."""
+
+    def __init__(self, message: str, *args) -> None:
+        super().__init__(message, *args)
+
+
+class InventoryEntry(NamedTuple):
+    """One documented object."""
+
+    name: str
+    role: str
+    url: str
+    display: str
+
+
+def _read_entries(path: Path) -> Iterator[Tuple[bytes, ...]]:
+    """Decompresses the lines of an inventory as they're read, giving back (name, role, uri, display)."""
+    with path.open("rb") as f:
+        header = [f.readline() for _ in range(HEADER_LINES)]
+
+        if not header[0].startswith(b"# Sphinx inventory version 2") or b"zlib" not in header[3]:
+            raise InventoryError(f"{path.name} is not a version 2 Sphinx inventory.")
+
+        decompressor = zlib.decompressobj()
+        remainder = b""
+
+        while True:
+            chunk = f.read(64 * 1024)
+            data = remainder + (decompressor.decompress(chunk) if chunk else decompressor.flush())
+
+            *lines, remainder = data.split(b"\n")
+
+            for line in lines:
+                match = ENTRY_PATTERN.match(line.rstrip())
+
+                if match is None:
+                    continue
+
+                name, role, _, uri, display = match.groups()
+
+                if uri.endswith(b"$"):
+                    uri = uri[:-1] + name
+
+                yield name, role, uri, name if display == b"-" else display
+
+            if not chunk:
+                break
+
+
+class Inventory:
+    """
+    The objects of one Sphinx inventory, sorted by name in a memory-mapped file.
+
+    Exact and prefix lookups binary search the names in the mapped file, using an array of where each entry
+    starts. Fuzzy lookups narrow names down by their trigrams, kept as an array of entry numbers per trigram,
+    then read the names of the candidates back out of the mapped file to score them.
+    """
+
+    def __init__(
+        self, name: str, base_url: str, data: mmap.mmap, offsets: array, postings: Dict[str, array]
+    ) -> None:
+        self.name = name
+        self.base_url = base_url
+        self.data = data
+        self.offsets = offsets
+        self.postings = postings
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    @classmethod
+    def load(cls, name: str, path: Union[str, Path], base_url: str) -> "Inventory":
+        """Reads an inventory file, which blocks and should be run in an executor."""
+        entries = sorted(
+            (entry[0].lower(), *entry) for entry in _read_entries(Path(path)) if b"\t" not in b"".join(entry)
+        )
+
+        if not entries:
+            raise InventoryError(f"{Path(path).name} has no entries.")
+
+        offsets = array("Q")
+        postings: Dict[str, array] = {}
+
+        # The mapping is backed by an unnamed file, so the kernel can page it out instead of holding onto it.
+        with tempfile.TemporaryFile() as f:
+            for i, entry in enumerate(entries):
+                offsets.append(f.tell())
+                f.write(b"\t".join(entry) + b"\n")
+
+                for trigram in trigrams(entry[0].decode()[:MAX_INDEXED_CHARS]):
+                    postings.setdefault(trigram, array("I")).append(i)
+
+            f.flush()
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return cls(name, base_url, data, offsets, postings)
+
+    def close(self) -> None:
+        """Unmaps the entries."""
+        self.data.close()
+
+    def _key(self, i: int) -> bytes:
+        """The lowercased name of an entry."""
+        start = self.offsets[i]
+        end = self.data.find(b"\t", start)
+
+        return self.data[start:end]
+
+    def entry(self, i: int) -> InventoryEntry:
+        """Reads an entry out of the mapped file."""
+        start = self.offsets[i]
+        end = self.data.find(b"\n", start)
+
+        line = self.data[start:end].decode()
+
+        _, name, role, uri, display = line.split("\t")
+
+        return InventoryEntry(name, role, f"{self.base_url}{uri}", display)
+
+    def _bisect(self, key: bytes) -> int:
+        """The index of the first entry with a name not below the key."""
+        low, high = 0, len(self.offsets)
+
+        while low < high:
+            middle = (low + high) // 2
+
+            if self._key(middle) < key:
+                low = middle + 1
+
+            else:
+                high = middle
+
+        return low
+
+    def exact(self, name: str) -> List[InventoryEntry]:
+        """Every entry with exactly this name, ignoring case."""
+        key = name.encode().lower()
+        entries = []
+
+        i = self._bisect(key)
+
+        while i < len(self.offsets) and self._key(i) == key:
+            entries.append(self.entry(i))
+            i += 1
+
+        return entries
+
+    def prefix(self, prefix: str, limit: int = 10) -> List[InventoryEntry]:
+        """Entries with names starting with the prefix, ignoring case, in order of name."""
+        key = prefix.encode().lower()
+        entries = []
+
+        i = self._bisect(key)
+
+        while i < len(self.offsets) and len(entries) < limit and self._key(i).startswith(key):
+            entries.append(self.entry(i))
+            i += 1
+
+        return entries
+
+    def fuzzy(self, query: str, limit: int = 10, cutoff: int = 50) -> List[Tuple[InventoryEntry, int]]:
+        """Entries with names close to the query, allowing for typos, along with how close out of 100."""
+        query = query.lower()
+
+        found = [self.postings[trigram] for trigram in trigrams(query) if trigram in self.postings]
+        names = ((i, self._key(i).decode()[:MAX_INDEXED_CHARS]) for i in pick_candidates(found, len(self)))
+
+        return [(self.entry(i), score) for i, score in best_matches(query, names, limit, cutoff)]
@@ -0,0 +1,102 @@
+import time
+from typing import Callable, Dict, Hashable, Iterable, NamedTuple, Optional, Tuple
+
+from discord.ext.commands import CheckFailure
+
+
+class RateLimit(NamedTuple):
+    """Allows `capacity` uses in a burst, refilling all of them over `per` seconds."""
+
+    capacity: int
+    per: float
+
+    @property
+    def rate(self) -> float:
+        """How many uses are refilled every second."""
+        return self.capacity / self.per
+
+
+class RateLimited(CheckFailure):
+    """Custom exception when a command is used more often than its rate limits allow."""
+
+    def __init__(self, message: str, retry_after: float, *args) -> None:
+        super().__init__(message, *args)
+
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Tokens of a single key, refilled lazily whenever the bucket is looked at."""
+
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float) -> None:
+        self.tokens = tokens
+        self.updated = updated
+
+    def refill(self, limit: RateLimit, now: float) -> float:
+        """Adds the tokens gained since the last update, giving back how many there are."""
+        self.tokens = min(limit.capacity, self.tokens + (now - self.updated) * limit.rate)
+        self.updated = now
+
+        return self.tokens
+
+
+class RateLimiter:
+    """
+    Token buckets at several levels, where one use has to be allowed by every level it falls under.
+
+    Buckets only exist for keys that have been used recently, since a bucket that has refilled completely
+    is the same as having no bucket at all.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self.buckets: Dict[Hashable, Tuple[RateLimit, TokenBucket]] = {}
+
+    def hit(self, keys: Iterable[Tuple[Hashable, RateLimit]]) -> Optional[float]:
+        """
+        Takes a token from the bucket of every key, only if all of them have one to give.
+
+        Gives back how long to wait until every bucket has a token, or None if the use was allowed.
+        """
+        now = self.clock()
+        buckets = []
+        retry_after = 0.0
+
+        for key, limit in keys:
+            entry = self.buckets.get(key)
+
+            if entry is None or entry[0] != limit:
+                entry = self.buckets[key] = (limit, TokenBucket(limit.capacity, now))
+
+            tokens = entry[1].refill(limit, now)
+
+            if tokens < 1:
+                retry_after = max(retry_after, (1 - tokens) / limit.rate)
+
+            buckets.append(entry[1])
+
+        # Nothing is taken when any level refuses, so a refused use doesn't eat into the other levels.
+        if retry_after:
+            return retry_after
+
+        for bucket in buckets:
+            bucket.tokens -= 1
+
+        return None
+
+    def sweep(self) -> int:
+        """Drops every bucket that has refilled completely since it was last used, giving back how many."""
+        now = self.clock()
+
+        idle = [
+            key
+            for key, (limit, bucket) in self.buckets.items()
+            if bucket.tokens + (now - bucket.updated) * limit.rate >= limit.capacity
+        ]
+
+        for key in idle:
+            del self.buckets[key]
+
+        return len(idle)
@@ -0,0 +1,112 @@
+import threading
+from collections import Counter
+from typing import Collection, Dict, Hashable, Iterable, List, Set, Tuple
+
+from fuzzywuzzy import fuzz
+
+# Only the start of long texts is indexed and scored, which is where names and descriptions of code are.
+MAX_INDEXED_CHARS = 256
+
+# Trigrams found in more than this fraction of texts barely narrow anything down, so they're skipped.
+COMMON_FRACTION = 0.2
+
+# How many of the rarest trigrams of a query are looked up, and how many candidates are fuzzy scored.
+MAX_QUERY_TRIGRAMS = 12
+MAX_CANDIDATES = 50
+
+
+def trigrams(text: str) -> Set[str]:
+    """Every three character sequence of a text, padded so short words still have some."""
+    text = f"  {' '.join(text.lower().split())} "
+
+    return {"".join(trigram) for trigram in zip(text, text[1:], text[2:])}
+
+
+def pick_candidates(found: List[Collection[Hashable]], total: int) -> List[Hashable]:
+    """Keys sharing the most trigrams with a query, given the keys of each trigram of it that was found."""
+    found = sorted(found, key=len)
+
+    limit = max(1, int(total * COMMON_FRACTION))
+
+    # If every trigram is common, the rarest ones are still better than nothing.
+    rare = [keys for keys in found if len(keys) <= limit] or found[:1]
+
+    counts: Counter = Counter()
+
+    for keys in rare[:MAX_QUERY_TRIGRAMS]:
+        counts.update(keys)
+
+    return [key for key, _ in counts.most_common(MAX_CANDIDATES)]
+
+
+def best_matches(
+    query: str, texts: Iterable[Tuple[Hashable, str]], limit: int, cutoff: int
+) -> List[Tuple[Hashable, int]]:
+    """Fuzzy scores lowercased texts against a lowercased query, giving back the best as (key, score)."""
+    # Partial matching scores how well the query matches any part of a text, which suits searching.
+    scored = ((key, fuzz.partial_ratio(query, text)) for key, text in texts)
+
+    return sorted((match for match in scored if match[1] >= cutoff), key=lambda match: -match[1])[:limit]
+
+
+class TrigramIndex:
+    """
+    An inverted index from trigrams to the texts containing them, narrowing down what's fuzzy scored.
+
+    Adding and removing texts only touches the trigrams of that text, so the index never has to be rebuilt.
+    Access is locked so searches can run in an executor, with fuzzy scoring done outside of the lock.
+    """
+
+    def __init__(self) -> None:
+        self.texts: Dict[Hashable, str] = {}
+        self.postings: Dict[str, Set[Hashable]] = {}
+
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def add(self, key: Hashable, text: str) -> None:
+        """Indexes a text under a key, replacing whatever was indexed under it before."""
+        # Texts are kept lowercased, since searching isn't case sensitive.
+        text = text[:MAX_INDEXED_CHARS].lower()
+
+        with self._lock:
+            self._remove(key)
+            self.texts[key] = text
+
+            for trigram in trigrams(text):
+                self.postings.setdefault(trigram, set()).add(key)
+
+    def remove(self, key: Hashable) -> None:
+        """Removes the text under a key, if there is one."""
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: Hashable) -> None:
+        text = self.texts.pop(key, None)
+
+        if text is None:
+            return
+
+        for trigram in trigrams(text):
+            keys = self.postings[trigram]
+            keys.discard(key)
+
+            if not keys:
+                del self.postings[trigram]
+
+    def candidates(self, query: str) -> List[Hashable]:
+        """Keys sharing the most trigrams with the query, looking only at the rarest trigrams of it."""
+        found = [self.postings[trigram] for trigram in trigrams(query) if trigram in self.postings]
+
+        return pick_candidates(found, len(self.texts))
+
+    def search(self, query: str, limit: int = 10, cutoff: int = 50) -> List[Tuple[Hashable, int]]:
+        """The best matches of a query as (key, score out of 100), only fuzzy scoring the candidates."""
+        query = query.lower()
+
+        with self._lock:
+            texts = [(key, self.texts[key]) for key in self.candidates(query)]
+
+        return best_matches(query, texts, limit, cutoff)
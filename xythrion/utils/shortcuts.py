@@ -1,6 +1,7 @@
-import os
 import typing as t
 from datetime import datetime
+from io import BytesIO
+from uuid import uuid4
 
 from discord import Embed, File
 from discord.ext.commands import Context
@@ -10,8 +11,8 @@ from xythrion.bot import Xythrion
 
 
 def gen_filename() -> str:
-    """Generates a filename from the current date."""
-    return str(datetime.timestamp(datetime.now())).replace(".", "")
+    """Generates a filename that won't collide with any other, even when created at the same time."""
+    return uuid4().hex
 
 
 def markdown_link(s: str, link: str) -> str:
@@ -51,10 +52,7 @@ async def check_for_subcommands(ctx: Context) -> None:
 
 async def http_get(ctx: Context, url: str) -> t.Any:
     """Small snippet to get json from a url."""
-    async with ctx.bot.http_session.get(url) as resp:
-        assert resp.status == 200, resp.raise_for_status()
-
-    return await resp.json()
+    return await ctx.bot.http_client.get_json(url)
 
 
 class DefaultEmbed(Embed):
@@ -69,8 +67,13 @@ class DefaultEmbed(Embed):
 
         if "embed_attachment" in kwargs.keys():
             v = kwargs["embed_attachment"]
-            f = str(v).split(os.sep)[-1]
-            self.file = File(v, filename=f)
+
+            # Bytes are wrapped without being copied, and buffers are sent from the start.
+            fp = BytesIO(v) if isinstance(v, (bytes, bytearray)) else v
+            fp.seek(0)
+
+            f = f"{gen_filename()}.png"
+            self.file = File(fp, filename=f)
 
             self.set_image(url=f"attachment://{f}")
 
@@ -1,18 +1,33 @@
-def k2f(k: float, r: int = 2) -> float:
+from typing import Union
+
+import numpy as np
+
+# Conversions work on single values and on whole arrays of them at once, rounding everything in one go.
+Temperature = Union[float, np.ndarray]
+
+
+def _round(values: np.ndarray, r: int) -> Temperature:
+    """Rounds every value, giving back a float if there was only one."""
+    rounded = np.round(values, r)
+
+    return float(rounded) if rounded.ndim == 0 else rounded
+
+
+def k2f(k: Temperature, r: int = 2) -> Temperature:
     """Kelvin to Fahrenheit."""
-    return round(((k - 273.15) * (9 / 5)) + 32, r)
+    return _round((np.asarray(k, dtype=np.float64) - 273.15) * (9 / 5) + 32, r)
 
 
-def k2c(k: float, r: int = 2) -> float:
+def k2c(k: Temperature, r: int = 2) -> Temperature:
     """Kelvin to Celsius."""
-    return round(k - 273.15, r)
+    return _round(np.asarray(k, dtype=np.float64) - 273.15, r)
 
 
-def c2k(c: float, r: int = 2) -> float:
+def c2k(c: Temperature, r: int = 2) -> Temperature:
     """Celsius to Kelvin."""
-    return round(c + 273.15, r)
+    return _round(np.asarray(c, dtype=np.float64) + 273.15, r)
 
 
-def c2f(c: float, r: int = 2) -> float:
+def c2f(c: Temperature, r: int = 2) -> Temperature:
     """Celsius to Fahrenheit."""
-    return round((c * 1.8) + 32, r)
+    return _round(np.asarray(c, dtype=np.float64) * 1.8 + 32, r)
@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Deque, Dict, Iterator, NamedTuple, Optional
+
+from .constants import Watchdog
+from .metrics import Counter, Histogram, header, sample
+
+log = logging.getLogger(__name__)
+
+# Upper bounds of the buckets of how late the loop was to run something, in seconds.
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, float("inf"))
+
+
+class Stall(NamedTuple):
+    """What the loop was doing when it was caught blocked."""
+
+    task: str
+    stack: str
+    seen_at: float
+
+
+def _describe(task: Optional[asyncio.Task]) -> str:
+    """The name of a task and the coroutine it's running, or what's running when it isn't a task."""
+    if task is None:
+        return "a callback outside of any task"
+
+    coro = task.get_coro()
+
+    return f"{task.get_name()} ({getattr(coro, '__qualname__', coro)})"
+
+
+class LoopWatchdog:
+    """
+    Watches for the event loop being blocked, from a thread of its own.
+
+    The thread keeps asking the loop to run a callback, and how long each one waits is the lag of the loop.
+    When one waits past the threshold, the loop is still blocked by whatever is running, so that's when the
+    current task and the stack of the loop's thread are taken, to be logged once the loop is running again.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        interval: float = Watchdog.INTERVAL,
+        threshold: float = Watchdog.THRESHOLD,
+        log_interval: float = Watchdog.LOG_INTERVAL,
+        window: int = Watchdog.WINDOW,
+    ) -> None:
+        self.loop = loop
+        self.interval = interval
+        self.threshold = threshold
+        self.log_interval = log_interval
+
+        # The latest lags, for quantiles over the last little while instead of since starting.
+        self.lags: Deque[float] = deque(maxlen=window)
+
+        self.lag = Histogram(
+            "xythrion_event_loop_lag_seconds",
+            "How late the event loop was to run a callback.",
+            buckets=LAG_BUCKETS,
+        )
+        self.stalls = Counter(
+            "xythrion_event_loop_stalls_total", "Times the event loop was blocked too long."
+        )
+        self.stalls.inc(amount=0)
+        self.last_stall: Optional[Stall] = None
+
+        # When the callback in flight was scheduled, and what was caught blocking it, if anything.
+        self._posted: Optional[float] = None
+        self._caught: Optional[Stall] = None
+
+        self._last_logged = 0.0
+        self._unlogged = 0
+
+        self._loop_thread: Optional[int] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Starts watching, which has to be called from the thread running the loop."""
+        if self._thread is not None:
+            return
+
+        self._loop_thread = threading.get_ident()
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops watching."""
+        self._stopped.set()
+
+    def _beat(self) -> None:
+        """Runs on the loop, recording how long it waited to."""
+        lag = time.perf_counter() - self._posted
+
+        self.lags.append(lag)
+        self.lag.observe(lag)
+
+        self._posted = None
+
+    def _watch(self) -> None:
+        """Schedules a callback on the loop whenever the last one has run, checking on it in the meantime."""
+        while not self._stopped.wait(self.interval):
+            if self._posted is None:
+                if self._caught is not None:
+                    self._report(self._caught, self.lags[-1])
+                    self._caught = None
+
+                self._posted = time.perf_counter()
+
+                try:
+                    self.loop.call_soon_threadsafe(self._beat)
+
+                except RuntimeError:
+                    # The loop has been closed, so there's nothing left to watch.
+                    return
+
+            elif self._caught is None and time.perf_counter() - self._posted >= self.threshold:
+                self._caught = self._catch()
+
+    def _catch(self) -> Stall:
+        """Takes the current task and the stack of the loop's thread, while the loop is blocked."""
+        frame = sys._current_frames().get(self._loop_thread)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+
+        return Stall(_describe(asyncio.current_task(self.loop)), stack, time.time())
+
+    def _report(self, stall: Stall, lag: float) -> None:
+        """Logs a stall, unless one was logged too recently, in which case it's only counted."""
+        self.stalls.inc()
+        self.last_stall = stall
+
+        now = time.perf_counter()
+
+        if now - self._last_logged < self.log_interval:
+            self._unlogged += 1
+            return
+
+        unlogged = f" ({self._unlogged} more since the last one logged)" if self._unlogged else ""
+
+        log.warning(
+            f"Event loop was blocked for {lag * 1000:.0f}ms by {stall.task}{unlogged}, "
+            f"which was here:\n{stall.stack}"
+        )
+
+        self._last_logged = now
+        self._unlogged = 0
+
+    @property
+    def stall_count(self) -> int:
+        """How many times the loop has been blocked past the threshold."""
+        return int(self.stalls.values[()])
+
+    def quantiles(self) -> Dict[str, float]:
+        """The median, 99th percentile and maximum of the latest lags, in seconds."""
+        lags = sorted(self.lags)
+
+        if not lags:
+            return {"p50": 0.0, "p99": 0.0, "max": 0.0}
+
+        return {
+            "p50": lags[len(lags) // 2],
+            "p99": lags[min(len(lags) - 1, int(len(lags) * 0.99))],
+            "max": lags[-1],
+        }
+
+    def metrics(self) -> Iterator[str]:
+        """Lag and stalls of the loop, in the Prometheus text format."""
+        yield from self.lag.expose()
+        yield from self.stalls.expose()
+
+        yield from header("xythrion_event_loop_lag_recent_seconds", "Quantiles of the latest lags.", "gauge")
+        for quantile, lag in self.quantiles().items():
+            yield sample("xythrion_event_loop_lag_recent_seconds", lag, {"quantile": quantile})